@@ -0,0 +1,326 @@
+"""
+Misst die Download- und Verschiebe-Pfade gegen einen lokalen Ersatz-Plex-Server.
+
+Szenarien:
+    single      Eine Datei über download_file()
+    show        Eine Staffel über download_episodes(), inkl. Verschieben im Hintergrund
+    move        Fertige Dateien einzeln mit move_to_media_server() verschieben
+    move-batch  Fertige Dateien gebündelt mit move_files_to_media_server() verschieben
+
+Jedes Szenario läuft in einem eigenen Prozess, damit CPU-Zeit und Spitzen-RSS nur dieses
+Szenario erfassen (CPU inkl. Kindprozessen wie rclone). Der Server läuft ebenfalls in
+einem eigenen Prozess (benchmarks/fake_plex.py). Die Ergebnisse werden als JSON
+gespeichert und können mit einem früheren Lauf verglichen werden.
+
+Aufruf (aus dem Projektverzeichnis):
+    python benchmarks/download_paths.py
+    python benchmarks/download_paths.py --size-mb 1024 --segments 4 --latency-ms 30 --bandwidth "50 MB/s"
+    python benchmarks/download_paths.py --compare benchmarks/results/download-paths-20261016-220000.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARK_DIR.parent / "src"))
+sys.path.insert(0, str(BENCHMARK_DIR))
+
+from fake_plex import TOKEN, part_key, start_fake_plex, stop_fake_plex  # noqa: E402
+
+SCENARIOS = ("single", "show", "move", "move-batch")
+RESULTS_DIR = BENCHMARK_DIR / "results"
+SHOW_TITLE = "Benchmark Show"
+
+# Kennzahlen für --compare: (Schlüssel, Bezeichnung, True wenn größer besser ist)
+COMPARED_METRICS = (
+    ("throughput", "MB/s", True),
+    ("cpu_per_gb", "CPU-s/GB", False),
+    ("peak_rss_mb", "RSS MB", False),
+    ("ttfb_ms", "TTFB ms", False),
+)
+
+
+# --- Kindprozess: ein Szenario messen ---------------------------------------------------------
+
+def _quiet() -> None:
+    """Schaltet alle Ausgaben ab, Fortschrittsanzeigen würden die Messung verfälschen."""
+    from rich import get_console
+
+    get_console().quiet = True
+    for name, module in list(sys.modules.items()):
+        if name.startswith("plex_downloader") and hasattr(module, "console"):
+            module.console.quiet = True
+
+
+def _peak_rss() -> int:
+    """Gibt den Spitzen-RSS dieses Prozesses in Bytes zurück (Linux meldet KB, macOS Bytes)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _cpu_time() -> float:
+    """CPU-Zeit dieses Prozesses und beendeter Kindprozesse (z.B. rclone)."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def _create_files(directory: Path, count: int, size: int) -> list:
+    """Erstellt fertige Episoden-Dateien zum Verschieben."""
+    directory.mkdir(parents=True, exist_ok=True)
+    block = os.urandom(min(size, 8 * 1024 * 1024)) or b"\0"
+    files = []
+    for number in range(1, count + 1):
+        path = directory / f"{SHOW_TITLE} - S01E{number:02d} - Episode {number}.mkv"
+        with open(path, "wb") as file:
+            remaining = size
+            while remaining > 0:
+                file.write(block[:remaining])
+                remaining -= len(block)
+        files.append(path)
+    return files
+
+
+def _episodes(count: int, size: int) -> list:
+    """Gibt Episoden-Objekte mit den Attributen zurück, die der Downloader von plexapi liest."""
+    return [
+        SimpleNamespace(
+            title=f"Episode {number}", seasonNumber=1, index=number,
+            media=[SimpleNamespace(parts=[SimpleNamespace(key=part_key(number), size=size, container="mkv")])],
+        )
+        for number in range(1, count + 1)
+    ]
+
+
+def run_scenario(scenario: str, params: dict) -> dict:
+    """Führt ein Szenario im aktuellen Prozess aus und gibt die Messwerte zurück."""
+    from plex_downloader.modules import downloader, metrics, rclone_mover, worker_pool
+
+    work_dir = Path(params["work_dir"])
+    download_dir = work_dir / "download"
+    media_dir = params["media_server_path"] or str(work_dir / "media")
+    events = work_dir / "events.jsonl"
+    download_dir.mkdir(parents=True, exist_ok=True)
+
+    downloader.configure_downloads({
+        "download_path": str(download_dir),
+        "min_free_space": 0,
+        "transfer_mode": params["transfer_mode"],
+    }, segments=params["segments"], concurrency=params["concurrency"])
+    # Time-to-first-Byte kommt aus dem Ereignisprotokoll der Messwerte
+    metrics.configure_metrics({"metrics_events": str(events)})
+    _quiet()
+
+    media_server_path = media_dir if ":" in media_dir else Path(media_dir)
+    size = params["size"] if scenario == "single" else params["episode_size"]
+    count = 1 if scenario == "single" else params["episodes"]
+    if scenario in ("move", "move-batch"):
+        files = _create_files(download_dir / SHOW_TITLE, count, size)
+
+    cpu_start = _cpu_time()
+    wall_start = time.perf_counter()
+    if scenario == "single":
+        url = f"{params['base_url']}{part_key(1)}?download=1&X-Plex-Token={TOKEN}"
+        filepath = download_dir / "single.mkv"
+        succeeded = int(downloader.download_file(
+            url, filepath, download_dir / "single.mkv.temp", filepath.name,
+            part_key=part_key(1), expected_size=size,
+        ))
+    elif scenario == "show":
+        plex = SimpleNamespace(url=lambda key: params["base_url"] + key, _token=TOKEN)
+        succeeded, _ = worker_pool.download_episodes(
+            _episodes(count, size), SimpleNamespace(title=SHOW_TITLE), plex, download_dir,
+            media_server_path=media_server_path, concurrency=params["concurrency"],
+        )
+    elif scenario == "move":
+        destination = downloader.show_media_path(media_server_path, SimpleNamespace(title=SHOW_TITLE))
+        succeeded = sum(rclone_mover.move_to_media_server(path, destination, quiet=True) for path in files)
+    else:
+        destination = downloader.show_media_path(media_server_path, SimpleNamespace(title=SHOW_TITLE))
+        succeeded = sum(rclone_mover.move_files_to_media_server(files, destination).values())
+    wall = time.perf_counter() - wall_start
+    cpu = _cpu_time() - cpu_start
+
+    if succeeded != count:
+        raise RuntimeError(f"Szenario '{scenario}': nur {succeeded} von {count} Dateien erfolgreich")
+
+    ttfbs = []
+    if events.exists():
+        with open(events) as f:
+            ttfbs = [event["ttfb"] for event in map(json.loads, f) if event["phase"] == "download" and "ttfb" in event]
+    total = size * count
+    return {
+        "files": count,
+        "bytes": total,
+        "wall": wall,
+        "cpu": cpu,
+        "throughput": total / wall / 1000 ** 2,
+        "cpu_per_gb": cpu / (total / 1000 ** 3) if total else None,
+        "peak_rss_mb": _peak_rss() / 1024 ** 2,
+        "ttfb_ms": sum(ttfbs) / len(ttfbs) * 1000 if ttfbs else None,
+    }
+
+
+# --- Elternprozess: Server starten, Szenarien ausführen, Ergebnisse speichern -----------------
+
+def _run_child(scenario: str, params: dict) -> dict:
+    """Führt ein Szenario in einem frischen Prozess aus."""
+    result = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--child", scenario, "--params", json.dumps(params)],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Szenario '{scenario}' fehlgeschlagen:\n{result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(scenario: str, args, bandwidth) -> dict:
+    """Misst ein Szenario args.runs Mal und gibt den schnellsten Lauf zurück."""
+    size = args.size_mb * 1000 ** 2
+    episode_size = args.episode_size_mb * 1000 ** 2
+    process = None
+    if scenario in ("single", "show"):
+        process, base_url = start_fake_plex(size if scenario == "single" else episode_size,
+                                            args.latency_ms / 1000, bandwidth)
+    else:
+        base_url = None
+    runs = []
+    try:
+        for _ in range(args.runs):
+            with tempfile.TemporaryDirectory() as work_dir:
+                params = {
+                    "work_dir": work_dir,
+                    "base_url": base_url,
+                    "media_server_path": args.media_server_path,
+                    "size": size,
+                    "episode_size": episode_size,
+                    "episodes": args.episodes,
+                    "segments": args.segments,
+                    "concurrency": args.concurrency,
+                    "transfer_mode": args.transfer_mode,
+                }
+                runs.append(_run_child(scenario, params))
+    finally:
+        if process is not None:
+            stop_fake_plex(process)
+    return min(runs, key=lambda result: result["wall"])
+
+
+def _revision() -> str:
+    """Gibt den aktuellen git-Stand zurück (leer, wenn kein git verfügbar ist)."""
+    try:
+        result = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=BENCHMARK_DIR,
+                                capture_output=True, text=True)
+    except FileNotFoundError:
+        return ""
+    return result.stdout.strip()
+
+
+def _format(value, digits: int = 1) -> str:
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def print_results(results: dict) -> None:
+    print(f"{'Szenario':<11} {'Dateien':>7} {'MB':>8} {'MB/s':>8} {'CPU-s':>7} {'CPU-s/GB':>9} "
+          f"{'RSS MB':>7} {'TTFB ms':>8}")
+    for scenario, result in results.items():
+        print(f"{scenario:<11} {result['files']:>7} {result['bytes'] / 1000 ** 2:>8.0f} "
+              f"{result['throughput']:>8.0f} {result['cpu']:>7.2f} {_format(result['cpu_per_gb'], 3):>9} "
+              f"{result['peak_rss_mb']:>7.0f} {_format(result['ttfb_ms']):>8}")
+
+
+def print_comparison(results: dict, settings: dict, previous: dict) -> None:
+    """Zeigt die Veränderung gegenüber einem früheren Lauf in Prozent."""
+    print(f"\nVergleich mit {previous.get('revision') or '?'} vom {previous.get('created', '?')}:")
+    if previous.get("settings") != settings:
+        print("Hinweis: Die Einstellungen der Läufe unterscheiden sich.")
+    for scenario, result in results.items():
+        old = previous.get("results", {}).get(scenario)
+        if old is None:
+            continue
+        changes = []
+        for key, label, higher_is_better in COMPARED_METRICS:
+            if result.get(key) is None or not old.get(key):
+                continue
+            change = result[key] / old[key] - 1
+            better = change > 0 if higher_is_better else change < 0
+            changes.append(f"{label} {change:+.1%}{' ✓' if better and abs(change) >= 0.05 else ''}")
+        print(f"{scenario:<11} " + ", ".join(changes))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Kommagetrennte Szenarien")
+    parser.add_argument("--size-mb", type=int, default=512, help="Dateigröße im Szenario 'single' in MB")
+    parser.add_argument("--episodes", type=int, default=8, help="Anzahl Episoden in den Staffel-Szenarien")
+    parser.add_argument("--episode-size-mb", type=int, default=64, help="Größe einer Episode in MB")
+    parser.add_argument("--segments", type=int, default=1, help="Parallele Verbindungen pro Datei")
+    parser.add_argument("--concurrency", type=int, default=2, help="Gleichzeitige Episoden-Downloads")
+    parser.add_argument("--transfer-mode", default="simple", choices=("simple", "threaded"))
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latenz des Servers vor jeder Antwort")
+    parser.add_argument("--bandwidth", help="Bandbreite pro Verbindung, z.B. '50 MB/s' (Standard: unbegrenzt)")
+    parser.add_argument("--media-server-path", help="Ziel für 'show' und 'move' (Standard: temporäres Verzeichnis)")
+    parser.add_argument("--runs", type=int, default=3, help="Läufe pro Szenario (schnellster Lauf zählt)")
+    parser.add_argument("--output", type=Path, help="JSON-Ergebnisdatei (Standard: benchmarks/results/)")
+    parser.add_argument("--compare", type=Path, help="Früheres Ergebnis zum Vergleich")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--params", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_scenario(args.child, json.loads(args.params))))
+        return 0
+
+    scenarios = [scenario.strip() for scenario in args.scenarios.split(",") if scenario.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unbekannte Szenarien: {', '.join(sorted(unknown))}")
+    bandwidth = None
+    if args.bandwidth:
+        from plex_downloader.modules.rate_limiter import parse_rate
+
+        bandwidth = parse_rate(args.bandwidth)
+
+    settings = {
+        key: getattr(args, key) for key in (
+            "size_mb", "episodes", "episode_size_mb", "segments", "concurrency",
+            "transfer_mode", "latency_ms", "bandwidth", "media_server_path",
+        )
+    }
+    results = {}
+    for scenario in scenarios:
+        print(f"Messe '{scenario}'...", file=sys.stderr)
+        results[scenario] = measure(scenario, args, bandwidth)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "revision": _revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "rclone": shutil.which("rclone") is not None,
+        "settings": settings,
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"download-paths-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+
+    print_results(results)
+    print(f"\nErgebnisse gespeichert: {output}")
+    if args.compare:
+        print_comparison(results, settings, json.loads(args.compare.read_text()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
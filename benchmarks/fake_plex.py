@@ -0,0 +1,343 @@
+"""
+Lokaler Ersatz für den Download-Endpunkt eines Plex-Servers (für Benchmarks).
+
+Liefert unter /library/parts/<id>/<zeitstempel>/<name>?download=1&X-Plex-Token=<token>
+synthetische Dateien der eingestellten Größe aus, ohne sie auf die Festplatte zu legen.
+Wie Plex werden Range-Requests, If-Range, ETag und Last-Modified unterstützt. Optional
+wird vor jeder Antwort gewartet (Latenz) und der Durchsatz pro Verbindung begrenzt.
+
+Für Tests der Fehlerbehandlung können einzelne Requests (gezählt ab 1) gestört werden:
+    reset      Verbindung nach einem Teil des Bodys hart abbrechen (TCP RST)
+    truncate   Verbindung nach einem Teil des Bodys sauber schließen (Body zu kurz)
+    slowloris  Nach einem Teil des Bodys nur noch ein Byte pro Sekunde senden
+    stall      Nach einem Teil des Bodys gar nichts mehr senden
+    5xx        Mit 503 Service Unavailable antworten (mehrere Requests = Fehlerserie)
+Unter /stats?X-Plex-Token=<token> liefert der Server Requests, gesendete Bytes und
+ausgelöste Fehler als JSON.
+
+Aufruf (aus dem Projektverzeichnis):
+    python benchmarks/fake_plex.py --size-mb 512 --latency-ms 50 --bandwidth "40 MB/s"
+    python benchmarks/fake_plex.py --fault reset --fault-requests 1,3 --fault-at 0.5
+"""
+
+import argparse
+import json
+import random
+import re
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import FrozenSet, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+TOKEN = "benchmark-token"
+BLOCK_SIZE = 1024 * 1024  # Wiederholter Zufallsblock, aus dem alle Dateien bestehen
+WRITE_SIZE = 256 * 1024  # Bytes pro Schreibaufruf an den Socket
+LAST_MODIFIED = formatdate(1_700_000_000, usegmt=True)
+SERVER_STOP_TIMEOUT = 10
+FAULTS = ("reset", "truncate", "slowloris", "stall", "5xx")
+DRIBBLE_INTERVAL = 1.0  # Sekunden zwischen zwei Bytes im Modus 'slowloris'
+MAX_FAULT_SECONDS = 600  # 'slowloris' und 'stall' geben spätestens danach auf
+
+_PART_PATH = re.compile(r"^/library/parts/(?P<id>\d+)/\d+/[^/]+$")
+_RANGE = re.compile(r"^bytes=(?P<start>\d*)-(?P<end>\d*)$")
+
+
+class FakePlexHandler(BaseHTTPRequestHandler):
+    """Beantwortet Part-Downloads wie Plex. Größe, Latenz und Bandbreite kommen vom Server-Objekt."""
+
+    protocol_version = "HTTP/1.1"  # Keep-Alive, wie beim echten Server
+    # Zufallsblock doppelt, damit jeder Ausschnitt ab einem beliebigen Offset am Stück vorliegt
+    data = memoryview(random.Random(0).randbytes(BLOCK_SIZE) * 2)
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_HEAD(self) -> None:
+        self._serve(send_body=False)
+
+    def do_GET(self) -> None:
+        self._serve(send_body=True)
+
+    def _serve(self, send_body: bool) -> None:
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        match = _PART_PATH.match(url.path)
+        if query.get("X-Plex-Token") != [self.server.token]:
+            self._send_error(401)
+            return
+        if url.path == "/stats":
+            self._send_stats()
+            return
+        if match is None:
+            self._send_error(404)
+            return
+
+        fault = self.server.next_fault()
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if fault == "5xx":
+            self.send_response(503)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        size = self.server.file_size
+        etag = f'"part-{match["id"]}-{size}"'
+        byte_range = self._requested_range(size, etag)
+        if byte_range == "invalid":
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = byte_range or (0, size - 1)
+        self.send_response(206 if byte_range else 200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        if byte_range:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if send_body:
+            if fault is not None:
+                self._send_faulty_body(fault, start, end + 1)
+            else:
+                self._send_body(start, end + 1)
+
+    def _requested_range(self, size: int, etag: str):
+        """Gibt (start, ende) des Range-Headers zurück, None für die ganze Datei oder 'invalid'."""
+        header = self.headers.get("Range")
+        if not header:
+            return None
+        validator = self.headers.get("If-Range")
+        if validator and validator not in (etag, LAST_MODIFIED):
+            # Datei hat sich geändert: wie Plex die ganze Datei senden
+            return None
+        match = _RANGE.match(header.strip())
+        if match is None or not (match["start"] or match["end"]):
+            return None
+        if match["start"]:
+            start = int(match["start"])
+            end = min(int(match["end"]), size - 1) if match["end"] else size - 1
+        else:
+            # Suffix-Range 'bytes=-N': die letzten N Bytes
+            start = max(0, size - int(match["end"]))
+            end = size - 1
+        if start >= size or start > end:
+            return "invalid"
+        return start, end
+
+    def _send_body(self, start: int, stop: int) -> None:
+        """Sendet die Bytes [start, stop) aus dem Zufallsblock, optional mit begrenzter Bandbreite."""
+        bandwidth = self.server.bandwidth
+        started = time.monotonic()
+        sent = 0
+        position = start
+        try:
+            while position < stop:
+                offset = position % BLOCK_SIZE
+                length = min(WRITE_SIZE, stop - position, BLOCK_SIZE)
+                self.wfile.write(self.data[offset:offset + length])
+                self.server.count_sent(length)
+                position += length
+                sent += length
+                if bandwidth:
+                    # So lange warten, bis der Durchschnitt wieder unter der Grenze liegt
+                    ahead = sent / bandwidth - (time.monotonic() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client hat abgebrochen (z.B. Probe-Request oder abgebrochener Download)
+            self.close_connection = True
+
+    def _send_faulty_body(self, fault: str, start: int, stop: int) -> None:
+        """Sendet den ersten Teil des Bodys und stört dann die Verbindung."""
+        cut = start + int((stop - start) * self.server.fault_at)
+        self._send_body(start, cut)
+        self.close_connection = True
+        try:
+            self.wfile.flush()
+            if fault == "reset":
+                # SO_LINGER mit Zeit 0: close() sendet RST statt FIN
+                self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+                self.connection.close()
+            elif fault == "truncate":
+                self.connection.shutdown(socket.SHUT_RDWR)
+            else:
+                deadline = time.monotonic() + MAX_FAULT_SECONDS
+                position = cut
+                while position < stop and time.monotonic() < deadline:
+                    time.sleep(DRIBBLE_INTERVAL)
+                    if fault == "slowloris":
+                        offset = position % BLOCK_SIZE
+                        self.wfile.write(self.data[offset:offset + 1])
+                        self.wfile.flush()
+                        self.server.count_sent(1)
+                        position += 1
+                    elif self._client_gone():
+                        return
+        except OSError:
+            pass
+
+    def _client_gone(self) -> bool:
+        """Prüft ohne zu blockieren, ob der Client die Verbindung geschlossen hat."""
+        try:
+            self.connection.setblocking(False)
+            return self.connection.recv(1, socket.MSG_PEEK) == b""
+        except BlockingIOError:
+            return False
+        finally:
+            self.connection.setblocking(True)
+
+    def _send_stats(self) -> None:
+        body = json.dumps(self.server.stats()).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class FakePlexServer(ThreadingHTTPServer):
+    """HTTP-Server mit den Einstellungen für FakePlexHandler."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], file_size: int, latency: float = 0.0,
+                 bandwidth: Optional[float] = None, token: str = TOKEN, fault: Optional[str] = None,
+                 fault_requests: FrozenSet[int] = frozenset(), fault_at: float = 0.5):
+        super().__init__(address, FakePlexHandler)
+        self.file_size = file_size
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.token = token
+        self.fault = fault
+        self.fault_requests = fault_requests
+        self.fault_at = min(max(fault_at, 0.0), 1.0)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._bytes_sent = 0
+        self._faults = 0
+
+    def next_fault(self) -> Optional[str]:
+        """Zählt einen Part-Request und gibt die Störung zurück, falls er gestört werden soll."""
+        with self._lock:
+            self._requests += 1
+            if self.fault is None or self._requests not in self.fault_requests:
+                return None
+            self._faults += 1
+            return self.fault
+
+    def count_sent(self, size: int) -> None:
+        with self._lock:
+            self._bytes_sent += size
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"requests": self._requests, "bytes_sent": self._bytes_sent, "faults": self._faults}
+
+
+def part_key(part_id: int, name: str = "file.mkv") -> str:
+    """Gibt einen Part-Key im Format von Plex zurück."""
+    return f"/library/parts/{part_id}/1700000000/{name}"
+
+
+def start_fake_plex(file_size: int, latency: float = 0.0, bandwidth: Optional[float] = None,
+                    fault: Optional[str] = None, fault_requests: str = "1", fault_at: float = 0.5) -> tuple:
+    """
+    Startet den Server in einem eigenen Prozess, damit seine CPU-Zeit nicht mitgemessen wird.
+
+    Returns:
+        Tuple (Prozess, Basis-URL)
+    """
+    command = [sys.executable, str(Path(__file__).resolve()), "--port", "0", "--size", str(file_size),
+               "--latency-ms", str(latency * 1000)]
+    if bandwidth:
+        command += ["--bandwidth", str(bandwidth)]
+    if fault:
+        command += ["--fault", fault, "--fault-requests", fault_requests, "--fault-at", str(fault_at)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    port = int(process.stdout.readline())
+    return process, f"http://127.0.0.1:{port}"
+
+
+def stop_fake_plex(process: subprocess.Popen) -> None:
+    """Beendet einen mit start_fake_plex() gestarteten Server."""
+    process.terminate()
+    process.wait(timeout=SERVER_STOP_TIMEOUT)
+
+
+def server_stats(base_url: str) -> dict:
+    """Fragt Requests, gesendete Bytes und ausgelöste Fehler eines laufenden Servers ab."""
+    from urllib.request import urlopen
+
+    with urlopen(f"{base_url}/stats?X-Plex-Token={TOKEN}") as response:
+        return json.loads(response.read())
+
+
+def _parse_requests(value: str) -> FrozenSet[int]:
+    """Liest Request-Nummern wie '1,3,5-7'."""
+    numbers = set()
+    for part in value.replace(" ", "").split(","):
+        if part:
+            start, _, end = part.partition("-")
+            numbers.update(range(int(start), int(end or start) + 1))
+    return frozenset(numbers)
+
+
+def _parse_bandwidth(value: str) -> Optional[float]:
+    """Liest eine Bandbreite wie '40 MB/s' oder eine Zahl in Bytes pro Sekunde."""
+    try:
+        return float(value)
+    except ValueError:
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+        from plex_downloader.modules.rate_limiter import parse_rate
+
+        return parse_rate(value)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=32400, help="Port (0 = beliebiger freier Port)")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--size", type=int, help="Dateigröße in Bytes")
+    size.add_argument("--size-mb", type=int, default=256, help="Dateigröße in MB")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Wartezeit vor jeder Antwort")
+    parser.add_argument("--bandwidth", help="Bandbreite pro Verbindung, z.B. '40 MB/s' (Standard: unbegrenzt)")
+    parser.add_argument("--fault", choices=FAULTS, help="Art der Störung (siehe oben)")
+    parser.add_argument("--fault-requests", default="1", help="Gestörte Requests, z.B. '1,3,5-7' (Standard: 1)")
+    parser.add_argument("--fault-at", type=float, default=0.5, help="Anteil des Bodys vor der Störung (0-1)")
+    args = parser.parse_args()
+
+    file_size = args.size if args.size is not None else args.size_mb * 1000 ** 2
+    bandwidth = _parse_bandwidth(args.bandwidth) if args.bandwidth else None
+    server = FakePlexServer(("127.0.0.1", args.port), file_size, args.latency_ms / 1000, bandwidth,
+                            fault=args.fault, fault_requests=_parse_requests(args.fault_requests),
+                            fault_at=args.fault_at)
+    # Der Port steht in der ersten Zeile, damit start_fake_plex() ihn lesen kann
+    print(server.server_port, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
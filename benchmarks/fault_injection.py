@@ -0,0 +1,156 @@
+"""
+Misst, wie download_file() sich von Störungen des Servers erholt.
+
+Für jedes Szenario stört benchmarks/fake_plex.py einzelne Requests (Verbindungsabbruch,
+abgeschnittener Body, tröpfelnder oder hängender Server, Serie von 503-Antworten). Gemessen
+werden Erfolg, Wiederholungen, Erholungszeit gegenüber einem ungestörten Lauf und
+verschwendete Bytes (vom Server gesendet, aber nicht Teil der fertigen Datei). Die fertige
+Datei wird mit dem Inhalt des Servers verglichen.
+
+Schlägt fehl (Exit-Code 1), wenn ein Szenario nicht vollständig und korrekt geladen wird.
+
+Aufruf (aus dem Projektverzeichnis):
+    python benchmarks/fault_injection.py
+    python benchmarks/fault_injection.py --size-mb 256 --scenarios reset,slowloris --output faults.json
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARK_DIR.parent / "src"))
+sys.path.insert(0, str(BENCHMARK_DIR))
+
+from rich import get_console  # noqa: E402
+
+from fake_plex import (  # noqa: E402
+    BLOCK_SIZE, TOKEN, FakePlexHandler, part_key, server_stats, start_fake_plex, stop_fake_plex,
+)
+from plex_downloader.modules import downloader, metrics  # noqa: E402
+
+# Name: (Störung, gestörte Requests, Anteil des Bodys vor der Störung, Segmente)
+SCENARIOS = {
+    "baseline": (None, "", 0.0, 1),
+    "reset": ("reset", "1", 0.5, 1),
+    "truncate": ("truncate", "1", 0.5, 1),
+    "slowloris": ("slowloris", "1", 0.5, 1),
+    "stall": ("stall", "1", 0.5, 1),
+    "5xx-burst": ("5xx", "1-3", 0.0, 1),
+    "reset-segmented": ("reset", "2,4", 0.5, 4),
+}
+
+# Kurze Zeitlimits, damit hängende Szenarien in Sekunden statt Minuten erkannt werden
+RETRY_CONFIG = {
+    "read_timeout": 3,
+    "stall_window": 3,
+    "stall_min_bytes": "256KiB",
+    "download_retries": 5,
+    "retry_backoff": 0.2,
+}
+
+
+def _expected_digest(size: int) -> str:
+    """Berechnet die Prüfsumme der Datei, wie der Server sie ausliefert."""
+    digest = hashlib.sha256()
+    block = FakePlexHandler.data[:BLOCK_SIZE]
+    remaining = size
+    while remaining > 0:
+        digest.update(block[:remaining])
+        remaining -= BLOCK_SIZE
+    return digest.hexdigest()
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(BLOCK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def run_scenario(name: str, size: int, work_dir: Path) -> dict:
+    """Lädt die Datei einmal gegen einen Server mit der Störung des Szenarios."""
+    fault, fault_requests, fault_at, segments = SCENARIOS[name]
+    target_dir = work_dir / name
+    target_dir.mkdir()
+    events = work_dir / f"{name}.jsonl"
+    downloader.configure_downloads(dict(RETRY_CONFIG, download_path=str(target_dir), min_free_space=0),
+                                   segments=segments)
+    metrics.configure_metrics({"metrics_events": str(events)})
+
+    process, base_url = start_fake_plex(size, fault=fault, fault_requests=fault_requests, fault_at=fault_at)
+    try:
+        url = f"{base_url}{part_key(1)}?download=1&X-Plex-Token={TOKEN}"
+        filepath = target_dir / "file.mkv"
+        start = time.perf_counter()
+        success = downloader.download_file(url, filepath, target_dir / "file.mkv.temp", filepath.name,
+                                           part_key=part_key(1), expected_size=size)
+        wall = time.perf_counter() - start
+        stats = server_stats(base_url)
+    finally:
+        stop_fake_plex(process)
+
+    with open(events) as f:
+        event = [json.loads(line) for line in f if '"phase": "download"' in line][-1]
+    correct = success and _file_digest(filepath) == _expected_digest(size)
+    return {
+        "ok": correct,
+        "retries": event.get("retries", 0),
+        "wall": wall,
+        "requests": stats["requests"],
+        "faults": stats["faults"],
+        "wasted_bytes": max(0, stats["bytes_sent"] - size) if success else stats["bytes_sent"],
+        "error": event.get("error"),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=64, help="Größe der Testdatei in MB")
+    parser.add_argument("--scenarios", default=",".join(name for name in SCENARIOS if name != "baseline"),
+                        help="Kommagetrennte Szenarien (der ungestörte Lauf wird immer gemessen)")
+    parser.add_argument("--output", type=Path, help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    names = ["baseline"] + [name.strip() for name in args.scenarios.split(",")
+                            if name.strip() and name.strip() != "baseline"]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unbekannte Szenarien: {', '.join(sorted(unknown))}")
+
+    # Fortschrittsanzeigen und Meldungen des Downloaders würden die Ausgabe überdecken
+    get_console().quiet = True
+    downloader.console.quiet = True
+
+    size = args.size_mb * 1000 ** 2
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            print(f"Szenario '{name}'...", file=sys.stderr)
+            results[name] = run_scenario(name, size, Path(tmp))
+
+    baseline = results["baseline"]["wall"]
+    print(f"Testdatei: {args.size_mb} MB")
+    print(f"{'Szenario':<16} {'OK':>3} {'Versuche':>8} {'Requests':>8} {'Zeit s':>7} {'Erholung s':>10} "
+          f"{'Verschwendet MB':>15}")
+    for name, result in results.items():
+        recovery = result["wall"] - baseline if name != "baseline" else 0.0
+        result["recovery"] = recovery
+        print(f"{name:<16} {'ja' if result['ok'] else 'NEIN':>3} {result['retries'] + 1:>8} "
+              f"{result['requests']:>8} {result['wall']:>7.2f} {recovery:>10.2f} "
+              f"{result['wasted_bytes'] / 1000 ** 2:>15.1f}")
+        if not result["ok"] and result["error"]:
+            print(f"    {result['error']}")
+
+    if args.output:
+        args.output.write_text(json.dumps({"size": size, "config": RETRY_CONFIG, "results": results}, indent=2) + "\n")
+    return 0 if all(result["ok"] for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
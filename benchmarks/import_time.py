@@ -0,0 +1,106 @@
+"""
+Misst die Import-Zeit des plex-dl Entry Points mit 'python -X importtime'.
+
+Schlägt fehl (Exit-Code 1), wenn der Median über dem Schwellwert liegt oder beim Start
+wieder schwere Abhängigkeiten geladen werden, die erst in den Befehlen gebraucht werden.
+
+Aufruf (aus dem Projektverzeichnis):
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 20 --threshold-ms 150
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ENTRY_MODULE = "plex_downloader.main"
+DEFAULT_RUNS = 10
+DEFAULT_THRESHOLD_MS = 200.0
+
+# Diese Module dürfen erst in den Befehlen importiert werden, nicht beim Start
+LAZY_MODULES = ("plexapi", "requests", "urllib3", "yaml", "sqlite3")
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    return env
+
+
+def measure_import() -> tuple:
+    """
+    Importiert den Entry Point in einem frischen Prozess.
+
+    Returns:
+        Tuple (kumulierte Import-Zeit in ms, Menge der importierten Top-Level-Pakete)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {ENTRY_MODULE}"],
+        capture_output=True, text=True, env=_env(), check=True,
+    )
+    cumulative_us = None
+    packages = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        name = name.strip()
+        packages.add(name.split(".")[0])
+        if name == ENTRY_MODULE:
+            cumulative_us = int(cumulative)
+    if cumulative_us is None:
+        raise RuntimeError(f"{ENTRY_MODULE} nicht in der importtime-Ausgabe gefunden")
+    return cumulative_us / 1000, packages
+
+
+def measure_help() -> float:
+    """Misst die Laufzeit von 'plex-dl --help' (Wall-Clock in ms, inklusive Interpreter-Start)."""
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", f"from {ENTRY_MODULE} import start; start()", "--help"],
+        capture_output=True, env=_env(), check=True,
+    )
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Anzahl Messungen")
+    parser.add_argument("--threshold-ms", type=float, default=DEFAULT_THRESHOLD_MS,
+                        help="Maximal erlaubter Median der Import-Zeit in ms")
+    args = parser.parse_args()
+
+    import_times = []
+    loaded = set()
+    for _ in range(args.runs):
+        elapsed_ms, packages = measure_import()
+        import_times.append(elapsed_ms)
+        loaded |= packages
+    help_times = [measure_help() for _ in range(args.runs)]
+
+    median_import = statistics.median(import_times)
+    print(f"Import {ENTRY_MODULE}: Median {median_import:.1f} ms, "
+          f"Min {min(import_times):.1f} ms, Max {max(import_times):.1f} ms ({args.runs} Läufe)")
+    print(f"plex-dl --help:        Median {statistics.median(help_times):.1f} ms (inkl. Interpreter-Start)")
+
+    failed = False
+    eager = sorted(module for module in LAZY_MODULES if module in loaded)
+    if eager:
+        print(f"FEHLER: beim Start geladen, sollte lazy sein: {', '.join(eager)}")
+        failed = True
+    if median_import > args.threshold_ms:
+        print(f"FEHLER: Import-Zeit {median_import:.1f} ms über Schwellwert {args.threshold_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print(f"OK (Schwellwert {args.threshold_ms:.0f} ms)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Vergleicht die CPU-Kosten pro GB der Transfer-Modi 'simple' und 'threaded'.
+
+Eine Testdatei wird von einem lokalen HTTP-Server in einem eigenen Prozess ausgeliefert,
+damit nur die CPU-Zeit des Downloaders gemessen wird (alle Threads, inkl. Prüfsumme).
+
+Aufruf (aus dem Projektverzeichnis):
+    python benchmarks/transfer_cpu.py
+    python benchmarks/transfer_cpu.py --size-mb 2048 --buffer-size 4MiB --buffer-count 16
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from rich import get_console  # noqa: E402
+
+from plex_downloader.modules import downloader  # noqa: E402
+
+SERVER_STOP_TIMEOUT = 10
+
+
+def _create_file(path: Path, size: int) -> None:
+    """Erstellt eine Testdatei mit Zufallsdaten."""
+    block = os.urandom(8 * 1024 * 1024)
+    with open(path, "wb") as file:
+        remaining = size
+        while remaining > 0:
+            file.write(block[:remaining])
+            remaining -= len(block)
+
+
+def _start_server(directory: Path) -> tuple:
+    """Startet einen HTTP-Server in einem eigenen Prozess und gibt (Prozess, Port) zurück."""
+    code = (
+        "import functools, http.server, sys\n"
+        "handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=sys.argv[1])\n"
+        "handler.func.log_message = lambda *args: None\n"
+        "server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)\n"
+        "print(server.server_port, flush=True)\n"
+        "server.serve_forever()\n"
+    )
+    process = subprocess.Popen([sys.executable, "-c", code, str(directory)], stdout=subprocess.PIPE, text=True)
+    port = int(process.stdout.readline())
+    return process, port
+
+
+def run_mode(mode: str, url: str, target_dir: Path, size: int, buffer_size: str, buffer_count: int) -> dict:
+    """Lädt die Testdatei einmal mit dem angegebenen Modus und misst CPU- und Wall-Zeit."""
+    downloader.configure_downloads(
+        {"transfer_mode": mode, "buffer_size": buffer_size, "buffer_count": buffer_count}, segments=1
+    )
+    filepath = target_dir / f"download-{mode}.bin"
+    temp_filepath = target_dir / f"download-{mode}.bin.temp"
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    success = downloader.download_file(url, filepath, temp_filepath, filepath.name, expected_size=size)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    if not success:
+        raise RuntimeError(f"Download im Modus '{mode}' fehlgeschlagen")
+    filepath.unlink()
+
+    gigabytes = size / 1000 ** 3
+    return {"mode": mode, "cpu_per_gb": cpu / gigabytes, "throughput": size / wall / 1000 ** 2, "wall": wall}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=1024, help="Größe der Testdatei in MB")
+    parser.add_argument("--runs", type=int, default=3, help="Läufe pro Modus (bester Lauf zählt)")
+    parser.add_argument("--buffer-size", default="1MiB", help="Puffergröße für den Modus 'threaded'")
+    parser.add_argument("--buffer-count", type=int, default=8, help="Anzahl Puffer für den Modus 'threaded'")
+    args = parser.parse_args()
+
+    # Fortschrittsanzeigen des Downloaders würden die Messung verfälschen
+    get_console().quiet = True
+    downloader.console.quiet = True
+
+    size = args.size_mb * 1000 ** 2
+    with tempfile.TemporaryDirectory() as tmp:
+        serve_dir = Path(tmp) / "serve"
+        target_dir = Path(tmp) / "target"
+        serve_dir.mkdir()
+        target_dir.mkdir()
+        _create_file(serve_dir / "file.bin", size)
+        process, port = _start_server(serve_dir)
+        try:
+            url = f"http://127.0.0.1:{port}/file.bin"
+            results = {}
+            for mode in ("simple", "threaded"):
+                runs = [run_mode(mode, url, target_dir, size, args.buffer_size, args.buffer_count)
+                        for _ in range(args.runs)]
+                results[mode] = min(runs, key=lambda result: result["cpu_per_gb"])
+        finally:
+            process.terminate()
+            process.wait(timeout=SERVER_STOP_TIMEOUT)
+
+    print(f"Testdatei: {args.size_mb} MB, Puffer: {args.buffer_count} x {args.buffer_size}")
+    for mode in ("simple", "threaded"):
+        result = results[mode]
+        print(f"{mode:>9}: {result['cpu_per_gb']:.3f} CPU-s/GB, {result['throughput']:.0f} MB/s")
+    saving = 1 - results["threaded"]["cpu_per_gb"] / results["simple"]["cpu_per_gb"]
+    print(f"CPU-Ersparnis 'threaded' gegenüber 'simple': {saving:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
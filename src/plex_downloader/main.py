@@ -1,40 +1,57 @@
 import typer
-import yaml
 import sys
 import os
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 from datetime import datetime, time, timedelta
 import time as time_module
-from plexapi.myplex import MyPlexAccount
-from plexapi.server import PlexServer
-from plexapi.exceptions import Unauthorized
 from rich.console import Console
 from rich.table import Table
 from rich.prompt import Prompt, Confirm
 
-from plex_downloader.modules.downloader import download_video, download_episode, sanitize_filename
-from plex_downloader.modules.cleanup import cleanup_temp_files
+# Schwere Abhängigkeiten (plexapi, requests, yaml, sqlite3) werden erst in den Befehlen
+# importiert, die sie brauchen. So bleiben 'plex-dl --help' und 'plex-dl config' schnell.
+if TYPE_CHECKING:
+    from plexapi.server import PlexServer
 
 # --- KONFIGURATION ---
 APP_NAME = "plex-downloader"
 CONFIG_DIR = Path.home() / ".config" / APP_NAME
 CONFIG_FILE = CONFIG_DIR / "config.yaml"
+QUEUE_FILE = CONFIG_DIR / "queue.db"
+LIBRARY_INDEX_FILE = CONFIG_DIR / "library.db"
+MIRROR_FILE = CONFIG_DIR / "mirror.db"
+CACHED_CONNECT_TIMEOUT = 3  # Sekunden für die gespeicherte Server-Adresse
+PLAN_PAGE_SIZE = 100  # Elemente pro Request beim Probelauf der Versionsauswahl
 
 app = typer.Typer(help="CLI zum Herunterladen von Plex-Filmen und TV Shows in Originalqualität.")
+queue_app = typer.Typer(help="Persistente Download-Warteschlange für unbeaufsichtigte Läufe.")
+app.add_typer(queue_app, name="queue")
+index_app = typer.Typer(help="Lokaler Bibliotheks-Index für schnelle Offline-Suche.")
+app.add_typer(index_app, name="index")
 console = Console()
 
+# Die Config wird pro Prozess nur einmal gelesen, save_config hält den Zwischenspeicher aktuell
+_config_cache = {"data": None}
+
 def load_config():
     """Lädt die Konfiguration oder gibt ein leeres Dict zurück."""
-    if not CONFIG_FILE.exists():
-        return {}
-    with open(CONFIG_FILE, "r") as f:
-        return yaml.safe_load(f) or {}
+    if _config_cache["data"] is None:
+        if not CONFIG_FILE.exists():
+            return {}
+        import yaml
+        with open(CONFIG_FILE, "r") as f:
+            _config_cache["data"] = yaml.safe_load(f) or {}
+    # Kopie, damit Änderungen erst mit save_config wirksam werden
+    return dict(_config_cache["data"])
 
 def save_config(data):
     """Speichert die Konfiguration in die YAML-Datei."""
+    import yaml
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
     with open(CONFIG_FILE, "w") as f:
         yaml.dump(data, f)
+    _config_cache["data"] = dict(data)
 
 def calculate_wait_until_2am():
     """Berechnet die Wartezeit bis 2 Uhr morgens in Sekunden."""
@@ -115,6 +132,8 @@ def configure_plex_account(existing_config):
         token, server_name = result
         existing_config["token"] = token
         existing_config["server_name"] = server_name
+        # Gespeicherte Server-Adresse gehört zum alten Account/Server
+        existing_config.pop("server_connection", None)
         save_config(existing_config)
         console.print(f"[bold green]Plex Account Konfiguration gespeichert![/bold green]")
         return True
@@ -122,6 +141,9 @@ def configure_plex_account(existing_config):
 
 def get_plex_credentials_and_server():
     """Fragt Plex Credentials ab und lässt Server auswählen. Gibt (token, server_name) zurück oder None bei Fehler."""
+    from plexapi.exceptions import Unauthorized
+    from plexapi.myplex import MyPlexAccount
+    
     username = Prompt.ask("Plex Benutzername/Email")
     password = Prompt.ask("Plex Passwort", password=True)
     
@@ -223,8 +245,50 @@ def validate_media_path(media_path):
 
 
 
-def get_plex_server() -> PlexServer:
-    """Verbindet sich mit dem Plex Server basierend auf der Config."""
+def _connect_cached(cached: dict) -> "PlexServer":
+    """
+    Verbindet sich direkt mit der gespeicherten Server-Adresse, ohne plex.tv.
+
+    Raises:
+        Exception: Wenn die Adresse nicht erreichbar ist oder dort ein anderer Server antwortet
+    """
+    from plexapi.server import PlexServer
+    from plex_downloader.modules.http_session import get_session
+    
+    uri = cached["uri"]
+    # Kurzer Check mit knappem Timeout, damit eine veraltete Adresse den Start nicht lange blockiert
+    response = get_session().get(
+        f"{uri}/identity", headers={"Accept": "application/json"}, timeout=CACHED_CONNECT_TIMEOUT
+    )
+    response.raise_for_status()
+    machine_id = response.json().get("MediaContainer", {}).get("machineIdentifier")
+    if machine_id != cached["machine_identifier"]:
+        raise ValueError(f"unter {uri} antwortet ein anderer Server")
+    return PlexServer(uri, cached["access_token"], session=get_session())
+
+def _remember_connection(config_data: dict, server_name: str, plex: "PlexServer", access_token: str):
+    """Speichert die funktionierende Server-Adresse in der Config für schnellere Starts."""
+    cached = {
+        "server_name": server_name,
+        "uri": plex._baseurl,
+        "machine_identifier": plex.machineIdentifier,
+        "access_token": access_token,
+    }
+    if config_data.get("server_connection") != cached:
+        config_data["server_connection"] = cached
+        save_config(config_data)
+
+def get_plex_server() -> "PlexServer":
+    """
+    Verbindet sich mit dem Plex Server basierend auf der Config.
+
+    Zuerst wird die gespeicherte Server-Adresse versucht. Nur wenn diese fehlschlägt,
+    wird der Server über plex.tv gesucht und alle angebotenen Adressen geprüft.
+    """
+    from plexapi.myplex import MyPlexAccount
+    from plex_downloader.modules.http_session import get_session, share_session
+    from plex_downloader.modules.metrics import phase
+    
     config_data = load_config()
     
     # Check ob wir bereits configuriert sind
@@ -235,15 +299,30 @@ def get_plex_server() -> PlexServer:
 
     token = config_data.get("token")
     server_name = config_data.get("server_name")
+    started = time_module.monotonic()
     
     # Spinner starten während Verbindung
     with console.status(f"[bold green]Verbinde mit Server '{server_name}'..."):
+        cached = config_data.get("server_connection") or {}
+        if cached.get("server_name") == server_name and cached.get("uri"):
+            try:
+                with phase("connect", method="cached"):
+                    plex = _connect_cached(cached)
+                share_session(plex)
+                elapsed = time_module.monotonic() - started
+                console.print(f"[dim]Verbunden mit {plex._baseurl} in {elapsed:.2f}s (gespeicherte Adresse)[/dim]")
+                return plex
+            except Exception as e:
+                console.print(f"[dim]Gespeicherte Adresse nicht erreichbar ({e}), suche Server über plex.tv...[/dim]")
+
         try:
             # Wir nutzen MyPlex, um die Ressource zu finden (funktioniert remote & lokal)
-            account = MyPlexAccount(token=token)
-            resource = account.resource(server_name)
-            plex = resource.connect()
-            return plex
+            # Gemeinsame Session, damit plex.tv, Metadaten und Downloads Verbindungen wiederverwenden
+            with phase("connect", method="plex.tv"):
+                account = MyPlexAccount(token=token, session=get_session())
+                resource = account.resource(server_name)
+                plex = resource.connect()
+            share_session(plex)
         except Exception as e:
             console.print(f"[bold red]Fehler bei der Verbindung:[/bold red] {e}")
             # Falls Token ungültig, Config anbieten
@@ -253,6 +332,11 @@ def get_plex_server() -> PlexServer:
             else:
                 sys.exit(1)
 
+    elapsed = time_module.monotonic() - started
+    console.print(f"[dim]Verbunden mit {plex._baseurl} in {elapsed:.2f}s (über plex.tv)[/dim]")
+    _remember_connection(config_data, server_name, plex, resource.accessToken)
+    return plex
+
 @app.command()
 def config():
     """Interaktive Konfiguration für Account, Server-Wahl und Pfade."""
@@ -346,9 +430,84 @@ def setup():
     config()
 
 @app.command()
-def search(query: str):
+def search(
+    query: str,
+    segments: Optional[int] = typer.Option(
+        None, "--segments", "-n", min=1,
+        help="Anzahl paralleler Verbindungen pro Datei (überschreibt 'segments' aus der Konfiguration)."
+    ),
+    parallel: Optional[int] = typer.Option(
+        None, "--parallel", "-p", min=1,
+        help="Anzahl gleichzeitig geladener Episoden (überschreibt 'concurrency' aus der Konfiguration)."
+    ),
+    online: bool = typer.Option(False, "--online", help="Direkt auf dem Server suchen statt im lokalen Index."),
+    transcode: Optional[bool] = typer.Option(
+        None, "--transcode/--original",
+        help="Über den Plex Transcoder in kleinerer Qualität laden bzw. die Originaldatei (überschreibt 'transcode' aus der Konfiguration)."
+    ),
+):
     """Sucht nach Filmen und TV Shows und bietet Download an."""
-    # Prüfe ob Konfiguration existiert
+    from plex_downloader.modules.downloader import configure_downloads
+    from plex_downloader.modules.cleanup import cleanup_temp_files, cleanup_paths
+    
+    config_data = ensure_config()
+    configure_downloads(config_data, segments=segments, concurrency=parallel, transcode=transcode)
+    announce_transcoding()
+    
+    # Cleanup alte temp Dateien vor der Suche (auch in Staging- und lokalen Zielverzeichnissen)
+    for download_path in cleanup_paths(config_data):
+        cleanup_temp_files(download_path)
+    
+    run_search(query, online=online)
+
+@app.command()
+def verify(
+    directory: Path = typer.Argument(..., exists=True, file_okay=False, help="Verzeichnis, das rekursiv geprüft wird."),
+    parallel: int = typer.Option(4, "--parallel", "-p", min=1, help="Anzahl gleichzeitig geprüfter Dateien."),
+):
+    """Prüft geladene Dateien anhand der Manifeste (Größe und Prüfsumme)."""
+    from rich.progress import BarColumn, TextColumn, DownloadColumn, TransferSpeedColumn
+    from plex_downloader.modules.headless import progress_display
+    from plex_downloader.modules.integrity import verify_tree, total_manifest_bytes, STATUS_OK
+    
+    total_bytes = total_manifest_bytes(directory)
+    with progress_display(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+    ) as progress:
+        task = progress.add_task("[cyan]Prüfe Dateien...", total=total_bytes or None, kind="batch")
+        results = verify_tree(
+            directory, workers=parallel,
+            on_result=lambda filepath, status, size: progress.update(task, advance=size),
+        )
+    
+    if not results:
+        console.print(f"[yellow]Keine Manifeste gefunden unter {directory}.[/yellow]")
+        return
+    
+    problems = [(filepath, status) for filepath, status in results if status != STATUS_OK]
+    if not problems:
+        console.print(f"[bold green]Alle {len(results)} Datei(en) in Ordnung.[/bold green]")
+        return
+    
+    table = Table(title="Fehlerhafte Dateien")
+    table.add_column("Datei", style="magenta")
+    table.add_column("Problem", style="red")
+    for filepath, status in sorted(problems):
+        table.add_row(str(filepath), status)
+    console.print(table)
+    console.print(f"[bold red]{len(problems)} von {len(results)} Datei(en) fehlerhaft.[/bold red]")
+    raise typer.Exit(code=1)
+
+def ensure_config():
+    """Prüft ob eine Konfiguration existiert, startet sonst die Konfiguration. Gibt die Konfiguration zurück."""
+    from plex_downloader.modules.headless import configure_output
+    from plex_downloader.modules.media_selection import configure_selection
+    from plex_downloader.modules.metrics import configure_metrics
+    from plex_downloader.modules.transcode import configure_transcode
+    
     config_data = load_config()
     if not config_data.get("token") or not config_data.get("server_name"):
         console.print("[yellow]Keine Konfiguration gefunden. Starte Konfiguration...[/yellow]")
@@ -358,17 +517,79 @@ def search(query: str):
         if not config_data.get("token") or not config_data.get("server_name"):
             console.print("[red]Konfiguration unvollständig. Bitte führe 'plex-dl config' aus.[/red]")
             sys.exit(1)
+    configure_metrics(config_data)
+    configure_output(config_data)
+    try:
+        configure_selection(config_data)
+    except (AttributeError, TypeError, ValueError) as e:
+        console.print(f"[yellow]Ungültige media_policy ({e}), lade wie bisher die erste Version.[/yellow]")
+    try:
+        configure_transcode(config_data)
+    except (TypeError, ValueError) as e:
+        console.print(f"[yellow]Ungültige Einstellung für transkodierte Downloads ({e}), verwende Standardwerte.[/yellow]")
+    return config_data
+
+def announce_transcoding():
+    """Weist darauf hin, wenn über den Transcoder statt als Originaldatei geladen wird."""
+    from plex_downloader.modules.transcode import transcoding, describe_profile
     
-    # Cleanup alte temp Dateien vor der Suche
-    cleanup_temp_files(config_data.get("download_path"))
+    if transcoding():
+        console.print(f"[cyan]Transkodierter Download ({describe_profile()}), Dateien werden als .mkv gespeichert.[/cyan]")
+
+def open_library_index():
+    """Öffnet den lokalen Bibliotheks-Index. Gibt None zurück, wenn noch kein Index aufgebaut wurde."""
+    from plex_downloader.modules.library_index import LibraryIndex
     
-    plex = get_plex_server()
+    if not LIBRARY_INDEX_FILE.exists():
+        return None
+    index = LibraryIndex(LIBRARY_INDEX_FILE)
+    if index.is_empty():
+        index.close()
+        return None
+    return index
+
+def run_search(query, plex=None, enqueue: bool = False, online: bool = False):
+    """
+    Sucht nach Filmen und TV Shows und lädt die Auswahl herunter oder stellt sie in die Warteschlange.
+    
+    Ist ein lokaler Index vorhanden, wird darin gesucht und der Server erst nach der Auswahl kontaktiert.
+    """
+    from plex_downloader.modules.downloader import download_video
+    from plex_downloader.modules.metrics import phase
+    from plex_downloader.modules.show_catalog import season_count
     
-    with console.status(f"Suche nach '{query}'..."):
-        # Suche über alle Bibliotheken (Filme und TV Shows)
-        movie_results = plex.search(query, mediatype='movie')
-        show_results = plex.search(query, mediatype='show')
-        results = movie_results + show_results
+    index = None if online else open_library_index()
+    if index is not None:
+        with console.status(f"Suche nach '{query}' im lokalen Index..."):
+            try:
+                indexed_results = index.search(query)
+            finally:
+                index.close()
+        # Merke nur die ratingKeys, die Plex-Objekte werden erst nach der Auswahl geladen
+        results = [row["rating_key"] for row in indexed_results]
+        rows = []
+        for row in indexed_results:
+            if row["type"] == 'movie':
+                rows.append(("Film", row["title"], row["year"], row["resolution"] or "Unbekannt"))
+            else:  # show
+                rows.append(("Serie", row["title"], row["year"], f"{row['child_count'] or 0} Staffel(n)"))
+    else:
+        if plex is None:
+            plex = get_plex_server()
+        with console.status(f"Suche nach '{query}'..."), phase("search", query=query):
+            # Suche über alle Bibliotheken (Filme und TV Shows)
+            movie_results = plex.search(query, mediatype='movie')
+            show_results = plex.search(query, mediatype='show')
+            results = movie_results + show_results
+        rows = []
+        for item in results:
+            # Bestimme Typ und Info
+            if item.type == 'movie':
+                info = item.media[0].videoResolution if item.media else "Unbekannt"
+                rows.append(("Film", item.title, getattr(item, 'year', 'N/A'), info))
+            else:  # show
+                # Anzahl Staffeln
+                rows.append(("Serie", item.title, getattr(item, 'year', 'N/A'), f"{season_count(item)} Staffel(n)"))
     
     if not results:
         console.print(f"[yellow]Keine Ergebnisse gefunden für '{query}'.[/yellow]")
@@ -382,20 +603,12 @@ def search(query: str):
     table.add_column("Jahr", style="green")
     table.add_column("Info", style="blue")
 
-    for idx, item in enumerate(results, 1):
-        # Bestimme Typ und Info
-        if item.type == 'movie':
-            item_type = "Film"
-            info = item.media[0].videoResolution if item.media else "Unbekannt"
-        else:  # show
-            item_type = "Serie"
-            # Anzahl Staffeln
-            info = f"{len(item.seasons())} Staffel(n)"
-        
-        year = getattr(item, 'year', 'N/A')
-        table.add_row(str(idx), item_type, item.title, str(year), str(info))
+    for idx, (item_type, title, year, info) in enumerate(rows, 1):
+        table.add_row(str(idx), item_type, title, str(year if year is not None else 'N/A'), str(info))
 
     console.print(table)
+    if index is not None:
+        console.print("[dim]Ergebnisse aus dem lokalen Index. Aktualisieren mit 'plex-dl index refresh', Live-Suche mit --online.[/dim]")
     
     # Interaktive Auswahl
     choice = Prompt.ask(
@@ -412,7 +625,14 @@ def search(query: str):
             selected_item = results[selection_idx]
             
             try:
-                if selected_item.type == 'movie':
+                if index is not None:
+                    # Erst jetzt mit dem Server verbinden und das ausgewählte Element laden
+                    plex = get_plex_server()
+                    selected_item = plex.fetchItem(selected_item)
+                
+                if selected_item.type == 'movie' and enqueue:
+                    enqueue_items([selected_item])
+                elif selected_item.type == 'movie':
                     # For movies, ask about timing before download
                     ask_download_timing()
                     
@@ -423,7 +643,7 @@ def search(query: str):
                     download_video(selected_item, plex, download_dir, media_server_path)
                 else:  # show
                     # For TV shows, let user select episodes first, then ask about timing
-                    handle_show_download(selected_item, plex)
+                    handle_show_download(selected_item, plex, enqueue=enqueue)
                     
             except Exception as e:
                 console.print(f"[bold red]Fehler beim Download:[/bold red] {e}")
@@ -433,8 +653,10 @@ def search(query: str):
     except ValueError:
         console.print("[red]Bitte eine Zahl eingeben.[/red]")
 
-def handle_show_download(show, plex, at_night: bool = False):
-    """Behandelt den Download einer TV-Show."""
+def handle_show_download(show, plex, at_night: bool = False, enqueue: bool = False):
+    """Behandelt den Download einer TV-Show (oder stellt die Auswahl mit enqueue in die Warteschlange)."""
+    from plex_downloader.modules.show_catalog import show_episodes
+    
     console.print(f"\n[bold magenta]{show.title}[/bold magenta]")
     console.print("\nWas möchtest du herunterladen?")
     console.print("1. Ganze Serie")
@@ -452,7 +674,9 @@ def handle_show_download(show, plex, at_night: bool = False):
         return
     elif choice == "1":
         # Ganze Serie herunterladen
-        if Confirm.ask(f"Möchtest du wirklich die ganze Serie '{show.title}' herunterladen?"):
+        if enqueue:
+            enqueue_items(show_episodes(show), show)
+        elif Confirm.ask(f"Möchtest du wirklich die ganze Serie '{show.title}' herunterladen?"):
             # Ask about timing after user confirms downloading entire series
             ask_download_timing()
             download_entire_show(show, plex)
@@ -460,19 +684,22 @@ def handle_show_download(show, plex, at_night: bool = False):
             console.print("[yellow]Download abgebrochen.[/yellow]")
     elif choice == "2":
         # Bestimmte Episode auswählen
-        select_and_download_episode(show, plex)
+        select_and_download_episode(show, plex, enqueue)
     elif choice == "3":
         # Ab bestimmter Episode bis Ende der Staffel
-        download_from_episode_onwards(show, plex, at_night)
+        download_from_episode_onwards(show, plex, at_night, enqueue)
 
-def select_and_download_episode(show, plex):
+def select_and_download_episode(show, plex, enqueue: bool = False):
     """Lässt den Benutzer eine bestimmte Episode auswählen und lädt sie herunter."""
-    seasons = show.seasons()
+    from plex_downloader.modules.downloader import download_episode, sanitize_filename
+    from plex_downloader.modules.show_catalog import show_seasons, season_episodes, episode_count
+    
+    seasons = show_seasons(show)
     
     # Staffel auswählen
     console.print("\n[bold]Verfügbare Staffeln:[/bold]")
     for idx, season in enumerate(seasons, 1):
-        console.print(f"{idx}. {season.title} ({len(season.episodes())} Episoden)")
+        console.print(f"{idx}. {season.title} ({episode_count(season)} Episoden)")
     
     season_choice = Prompt.ask(
         "Welche Staffel? (Nummer eingeben, 'q' für Abbruch)",
@@ -494,7 +721,7 @@ def select_and_download_episode(show, plex):
         return
     
     # Episode auswählen
-    episodes = selected_season.episodes()
+    episodes = season_episodes(show, selected_season)
     console.print(f"\n[bold]Episoden in {selected_season.title}:[/bold]")
     
     table = Table()
@@ -518,7 +745,9 @@ def select_and_download_episode(show, plex):
     
     try:
         episode_idx = int(episode_choice) - 1
-        if 0 <= episode_idx < len(episodes):
+        if 0 <= episode_idx < len(episodes) and enqueue:
+            enqueue_items([episodes[episode_idx]], show)
+        elif 0 <= episode_idx < len(episodes):
             # Ask about timing after user has selected the specific episode
             ask_download_timing()
             
@@ -536,14 +765,18 @@ def select_and_download_episode(show, plex):
     except ValueError:
         console.print("[red]Bitte eine Zahl eingeben.[/red]")
 
-def download_from_episode_onwards(show, plex, at_night: bool = False):
+def download_from_episode_onwards(show, plex, at_night: bool = False, enqueue: bool = False):
     """Lädt alle Episoden ab einer bestimmten Episode bis zum Ende der Staffel herunter."""
-    seasons = show.seasons()
+    from plex_downloader.modules.downloader import sanitize_filename
+    from plex_downloader.modules.show_catalog import show_seasons, season_episodes, episode_count
+    from plex_downloader.modules.worker_pool import download_episodes
+    
+    seasons = show_seasons(show)
     
     # Staffel auswählen
     console.print("\n[bold]Verfügbare Staffeln:[/bold]")
     for idx, season in enumerate(seasons, 1):
-        console.print(f"{idx}. {season.title} ({len(season.episodes())} Episoden)")
+        console.print(f"{idx}. {season.title} ({episode_count(season)} Episoden)")
     
     season_choice = Prompt.ask(
         "Welche Staffel? (Nummer eingeben, 'q' für Abbruch)",
@@ -577,7 +810,7 @@ def download_from_episode_onwards(show, plex, at_night: bool = False):
         return
     
     # Start-Episode auswählen
-    episodes = selected_season.episodes()
+    episodes = season_episodes(show, selected_season)
     console.print(f"\n[bold]Episoden in {selected_season.title}:[/bold]")
     
     table = Table()
@@ -616,6 +849,10 @@ def download_from_episode_onwards(show, plex, at_night: bool = False):
                     sys.exit(0)
                 return
             
+            if enqueue:
+                enqueue_items(episodes[start_episode_idx:], show)
+                return
+            
             # Download-Verzeichnis vorbereiten
             config_data = load_config()
             download_dir = Path(config_data.get("download_path", Path.home() / "Downloads"))
@@ -626,38 +863,15 @@ def download_from_episode_onwards(show, plex, at_night: bool = False):
             
             console.print(f"\n[bold cyan]Lade Episoden ab {start_ep_num} herunter...[/bold cyan]")
             
-            # Download-Statistik
-            downloaded_count = 0
-            skipped_count = 0
-            failed_count = 0
+            # Sammle alle Episoden ab der ausgewählten bis zum Ende
+            delivered = list_delivered_episodes(show, media_server_path)
+            pending_episodes, skipped_count = collect_pending_episodes(
+                episodes[start_episode_idx:], show, show_dir, delivered
+            )
             
-            # Lade alle Episoden ab der ausgewählten bis zum Ende
-            for episode_idx in range(start_episode_idx, len(episodes)):
-                episode = episodes[episode_idx]
-                episode_num = f"S{episode.seasonNumber:02d}E{episode.index:02d}"
-                
-                console.print(f"\n[cyan]Episode {episode_idx - start_episode_idx + 1}/{episodes_to_download}: {episode_num}[/cyan]")
-                
-                # Prüfe ob Episode bereits existiert
-                if not episode.media or not episode.media[0].parts:
-                    console.print(f"[yellow]Keine Mediendatei für {episode.title}[/yellow]")
-                    skipped_count += 1
-                    continue
-                    
-                part = episode.media[0].parts[0]
-                filename = f"{show.title} - {episode_num} - {episode.title}.{part.container}"
-                filename = sanitize_filename(filename)
-                filepath = show_dir / filename
-                
-                if filepath.exists():
-                    console.print(f"[yellow]Bereits vorhanden, überspringe: {filename}[/yellow]")
-                    skipped_count += 1
-                    continue
-                
-                if download_episode(episode, show, plex, show_dir, skip_existing_check=True, media_server_path=media_server_path):
-                    downloaded_count += 1
-                else:
-                    failed_count += 1
+            downloaded_count, failed_count = download_episodes(
+                pending_episodes, show, plex, show_dir, media_server_path=media_server_path, delivered=delivered
+            )
             
             # Detaillierte Statistik
             summary = f"\n[bold green]Fertig! {downloaded_count} Episode(n) heruntergeladen, {skipped_count} übersprungen"
@@ -683,8 +897,68 @@ def download_from_episode_onwards(show, plex, at_night: bool = False):
             console.print("[yellow]Anwendung wird beendet.[/yellow]")
             sys.exit(0)
 
+def list_delivered_episodes(show, media_server_path=None):
+    """
+    Listet das Show-Verzeichnis auf dem Medienserver einmal pro Serie, nicht pro Episode.
+    
+    Returns:
+        Der DestinationIndex oder None, wenn kein Medienserver konfiguriert ist
+    """
+    if not media_server_path:
+        return None
+    from plex_downloader.modules.downloader import show_media_path
+    from plex_downloader.modules.destination_index import build_destination_index
+    
+    with console.status("[cyan]Prüfe bereits gelieferte Episoden auf dem Medienserver..."):
+        return build_destination_index(show_media_path(media_server_path, show))
+
+
+def collect_pending_episodes(episodes, show, show_dir: Path, delivered=None):
+    """
+    Filtert Episoden heraus, die keine Mediendatei haben oder bereits vorhanden sind.
+    
+    Als vorhanden gilt eine Episode im lokalen Show-Verzeichnis oder auf dem Medienserver
+    (laut delivered, siehe list_delivered_episodes).
+    
+    Returns:
+        Tuple (zu ladende Episoden, Anzahl übersprungene)
+    """
+    from plex_downloader.modules.downloader import episode_files, delivered_size, local_file
+    
+    skipped_count = 0
+    pending_episodes = []
+    for episode in episodes:
+        # Prüfe ob Episode bereits existiert (alle Teile der gewählten Version)
+        files = episode_files(episode, show)
+        if not files:
+            console.print(f"[yellow]Keine Mediendatei für {episode.title}[/yellow]")
+            skipped_count += 1
+            continue
+        names = ", ".join(filename for filename, _ in files)
+        
+        if all(local_file(show_dir, filename) for filename, _ in files):
+            console.print(f"[yellow]Bereits vorhanden, überspringe: {names}[/yellow]")
+            skipped_count += 1
+            continue
+        
+        if delivered is not None and all(delivered.contains(filename, delivered_size(part)) for filename, part in files):
+            console.print(f"[yellow]Bereits auf dem Medienserver, überspringe: {names}[/yellow]")
+            skipped_count += 1
+            continue
+        if delivered is not None and any(delivered.size_of(filename) is not None
+                                         and not delivered.contains(filename, delivered_size(part))
+                                         for filename, part in files):
+            console.print(f"[yellow]Größe auf dem Medienserver weicht ab, lade erneut: {names}[/yellow]")
+        
+        pending_episodes.append(episode)
+    return pending_episodes, skipped_count
+
 def download_entire_show(show, plex, at_night: bool = False):
     """Lädt alle Episoden einer TV-Show herunter."""
+    from plex_downloader.modules.downloader import sanitize_filename
+    from plex_downloader.modules.show_catalog import show_episodes, season_count
+    from plex_downloader.modules.worker_pool import download_episodes
+    
     config_data = load_config()
     download_dir = Path(config_data.get("download_path", Path.home() / "Downloads"))
     # Keep media_server_path as string to support both local and remote paths
@@ -696,42 +970,434 @@ def download_entire_show(show, plex, at_night: bool = False):
     
     console.print(f"\n[bold cyan]Lade alle Episoden von '{show.title}' herunter...[/bold cyan]")
     
-    seasons = show.seasons()
-    total_episodes = sum(len(season.episodes()) for season in seasons)
+    # Alle Episoden mit einem Request laden statt einzeln pro Staffel
+    episodes = show_episodes(show)
     
-    console.print(f"Insgesamt {total_episodes} Episode(n) in {len(seasons)} Staffel(n)")
+    console.print(f"Insgesamt {len(episodes)} Episode(n) in {season_count(show)} Staffel(n)")
     
-    episode_count = 0
-    skipped_count = 0
-    for season in seasons:
-        for episode in season.episodes():
-            episode_count += 1
-            console.print(f"\n[cyan]Episode {episode_count}/{total_episodes}[/cyan]")
-            
-            # Prüfe ob Episode bereits existiert
-            if not episode.media or not episode.media[0].parts:
-                console.print(f"[yellow]Keine Mediendatei für {episode.title}[/yellow]")
-                continue
-                
-            part = episode.media[0].parts[0]
-            episode_num = f"S{episode.seasonNumber:02d}E{episode.index:02d}"
-            filename = f"{show.title} - {episode_num} - {episode.title}.{part.container}"
-            filename = sanitize_filename(filename)
-            filepath = show_dir / filename
-            
-            if filepath.exists():
-                console.print(f"[yellow]Bereits vorhanden, überspringe: {filename}[/yellow]")
-                skipped_count += 1
-                continue
-                
-            download_episode(episode, show, plex, show_dir, skip_existing_check=True, media_server_path=media_server_path)
+    delivered = list_delivered_episodes(show, media_server_path)
+    pending_episodes, skipped_count = collect_pending_episodes(episodes, show, show_dir, delivered)
     
-    console.print(f"\n[bold green]Fertig! {episode_count - skipped_count} Episode(n) heruntergeladen, {skipped_count} übersprungen. 🎉[/bold green]")
+    downloaded_count, failed_count = download_episodes(
+        pending_episodes, show, plex, show_dir, media_server_path=media_server_path, delivered=delivered
+    )
+    
+    summary = f"\n[bold green]Fertig! {downloaded_count} Episode(n) heruntergeladen, {skipped_count} übersprungen"
+    if failed_count > 0:
+        summary += f", {failed_count} fehlgeschlagen"
+    summary += ". 🎉[/bold green]"
+    console.print(summary)
+
+
+def enqueue_items(items, show=None):
+    """
+    Stellt Filme oder Episoden in die Download-Warteschlange, ohne sie herunterzuladen.
+
+    Alle Elemente werden in einer Transaktion eingereiht. Ohne show wird der Serientitel
+    jeder Episode aus ihren eigenen Daten (grandparentTitle) genommen.
+    """
+    from plex_downloader.modules.job_queue import JobQueue
+    from plex_downloader.modules.media_selection import download_size
+
+    jobs = []
+    for item in items:
+        bytes_total = download_size(item)
+        if item.type == 'movie':
+            jobs.append({
+                "kind": "movie", "rating_key": item.ratingKey, "title": f"{item.title} ({item.year})",
+                "bytes_total": bytes_total,
+            })
+        else:
+            show_title = show.title if show is not None else item.grandparentTitle
+            episode_num = f"S{item.seasonNumber:02d}E{item.index:02d}"
+            jobs.append({
+                "kind": "episode", "rating_key": item.ratingKey,
+                "title": f"{show_title} - {episode_num} - {item.title}",
+                "show_title": show_title, "bytes_total": bytes_total,
+            })
+
+    job_queue = JobQueue(QUEUE_FILE)
+    try:
+        added_count = job_queue.add_many(jobs)
+    finally:
+        job_queue.close()
+    
+    already_queued = len(items) - added_count
+    summary = f"[bold green]{added_count} Job(s) in die Warteschlange gestellt"
+    if already_queued:
+        summary += f", {already_queued} bereits vorhanden"
+    summary += ".[/bold green]"
+    console.print(summary)
+    console.print("[dim]Starte die Downloads mit 'plex-dl queue run'.[/dim]")
+
+@queue_app.command("add")
+def queue_add(
+    query: str,
+    online: bool = typer.Option(False, "--online", help="Direkt auf dem Server suchen statt im lokalen Index."),
+):
+    """Sucht nach Filmen und TV Shows und stellt die Auswahl in die Warteschlange, ohne zu laden."""
+    ensure_config()
+    run_search(query, enqueue=True, online=online)
+
+@queue_app.command("import")
+def queue_import(
+    file: Path = typer.Argument(
+        ..., exists=True, dir_okay=False,
+        help="Titelliste (.yaml, .csv oder eine Zeile pro Titel, z.B. 'Titel (2010) S01E03-E07')."
+    ),
+    parallel: int = typer.Option(8, "--parallel", "-p", min=1, help="Anzahl gleichzeitiger Suchanfragen."),
+    yes: bool = typer.Option(False, "--yes", "-y", help="Mehrdeutige Titel nicht nachfragen, sondern überspringen."),
+):
+    """Löst eine Titelliste gebündelt auf und stellt alle Treffer auf einmal in die Warteschlange."""
+    from rich.progress import BarColumn, TextColumn, MofNCompleteColumn
+    from plex_downloader.modules.headless import progress_display
+    from plex_downloader.modules.bulk_import import (
+        load_title_list, resolve_titles, select_items, STATUS_RESOLVED, STATUS_AMBIGUOUS
+    )
+    from plex_downloader.modules.http_session import configure_session
+
+    ensure_config()
+    try:
+        title_requests = load_title_list(file)
+    except ValueError as e:
+        console.print(f"[red]Titelliste konnte nicht gelesen werden: {e}[/red]")
+        raise typer.Exit(code=1)
+    if not title_requests:
+        console.print(f"[yellow]Keine Titel in {file} gefunden.[/yellow]")
+        return
+
+    plex = get_plex_server()
+    # Alle Suchanfragen teilen sich die Verbindungen der einen Plex-Session
+    configure_session(parallel + 2)
+    with progress_display(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+    ) as progress:
+        task = progress.add_task("[cyan]Löse Titel auf...", total=len(title_requests), kind="batch")
+        resolutions = resolve_titles(
+            plex, title_requests, workers=parallel, on_result=lambda resolution: progress.update(task, advance=1)
+        )
+
+    table = Table(title=f"Titelliste {file.name}")
+    table.add_column("Zeile", style="cyan", justify="right")
+    table.add_column("Eintrag", style="magenta")
+    table.add_column("Status")
+    table.add_column("Treffer")
+    table.add_column("Elemente", justify="right")
+    status_styles = {STATUS_RESOLVED: "green", STATUS_AMBIGUOUS: "yellow"}
+    for resolution in resolutions:
+        style = status_styles.get(resolution.status, "red")
+        matches = resolution.error or ", ".join(f"{item.title} ({item.year})" for item in resolution.candidates)
+        table.add_row(
+            str(resolution.request.line), resolution.request.describe(), f"[{style}]{resolution.status}[/{style}]",
+            matches, str(len(resolution.items)) if resolution.status == STATUS_RESOLVED else ""
+        )
+    console.print(table)
+
+    # Mehrdeutige Titel zur Prüfung vorlegen
+    for resolution in resolutions:
+        if resolution.status != STATUS_AMBIGUOUS or yes:
+            continue
+        console.print(f"\n[yellow]'{resolution.request.describe()}' (Zeile {resolution.request.line}) ist mehrdeutig:[/yellow]")
+        for number, item in enumerate(resolution.candidates, start=1):
+            kind = "Film" if item.type == "movie" else "TV Show"
+            console.print(f"  {number}: {item.title} ({item.year}) - {kind}")
+        choices = [str(number) for number in range(len(resolution.candidates) + 1)]
+        choice = int(Prompt.ask("Welcher Treffer ist gemeint? (0 = überspringen)", choices=choices, default="0"))
+        if choice:
+            with console.status("[cyan]Lade Episoden..."):
+                resolution.items = select_items(resolution.request, resolution.candidates[choice - 1])
+            resolution.status = STATUS_RESOLVED
+
+    items = [item for resolution in resolutions if resolution.status == STATUS_RESOLVED for item in resolution.items]
+    unresolved = sum(1 for resolution in resolutions if resolution.status != STATUS_RESOLVED)
+    if unresolved:
+        console.print(f"[yellow]{unresolved} Eintrag/Einträge übersprungen.[/yellow]")
+    if not items:
+        console.print("[yellow]Nichts einzureihen.[/yellow]")
+        return
+    enqueue_items(items)
+
+@queue_app.command("run")
+def queue_run(
+    segments: Optional[int] = typer.Option(
+        None, "--segments", "-n", min=1,
+        help="Anzahl paralleler Verbindungen pro Datei (überschreibt 'segments' aus der Konfiguration)."
+    ),
+    at_night: bool = typer.Option(False, "--at-night", help="Mit der Abarbeitung erst um 2:00 Uhr beginnen."),
+    dry_run: bool = typer.Option(
+        False, "--dry-run",
+        help="Nichts laden, nur die gewählten Versionen und die Ersparnis gegenüber der ersten Version zeigen."
+    ),
+    transcode: Optional[bool] = typer.Option(
+        None, "--transcode/--original",
+        help="Über den Plex Transcoder in kleinerer Qualität laden bzw. die Originaldatei (überschreibt 'transcode' aus der Konfiguration)."
+    ),
+):
+    """Arbeitet die Warteschlange ab (mit automatischen Wiederholungen bei Fehlern)."""
+    from plex_downloader.modules.downloader import configure_downloads
+    from plex_downloader.modules.job_queue import JobQueue, run_queue
+    
+    config_data = ensure_config()
+    configure_downloads(config_data, segments=segments, transcode=transcode)
+    
+    if dry_run:
+        show_selection_plan(get_plex_server())
+        return
+    
+    announce_transcoding()
+    if at_night:
+        wait_until_2am()
+    
+    download_dir = Path(config_data.get("download_path", Path.home() / "Downloads"))
+    # Keep media_server_path as string to support both local and remote paths
+    media_server_path = config_data.get("media_server_path")
+    
+    plex = get_plex_server()
+    job_queue = JobQueue(QUEUE_FILE)
+    try:
+        done_count, failed_count = run_queue(job_queue, plex, download_dir, media_server_path)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Abgebrochen. Offene Jobs bleiben in der Warteschlange.[/yellow]")
+        sys.exit(1)
+    finally:
+        job_queue.close()
+    
+    summary = f"\n[bold green]Warteschlange abgearbeitet: {done_count} Job(s) erledigt"
+    if failed_count > 0:
+        summary += f", {failed_count} fehlgeschlagen"
+    summary += ".[/bold green]"
+    console.print(summary)
+
+def show_selection_plan(plex):
+    """
+    Zeigt für alle wartenden Jobs die gewählte Version und die gesparten Bytes gegenüber der ersten Version.
+    
+    Bei transkodierten Downloads steht daneben die aus Laufzeit und Zielbitrate geschätzte Größe.
+    """
+    from plex_downloader.modules.job_queue import JobQueue, STATUS_PENDING
+    from plex_downloader.modules.media_selection import selection_plan, selected_parts
+    from plex_downloader.modules.transcode import transcoding, estimated_size, describe_profile
+    
+    job_queue = JobQueue(QUEUE_FILE)
+    try:
+        jobs = job_queue.jobs(STATUS_PENDING)
+    finally:
+        job_queue.close()
+    if not jobs:
+        console.print("[yellow]Keine wartenden Jobs.[/yellow]")
+        return
+    
+    # Elemente seitenweise mit einem Request pro Seite laden statt einzeln pro Job
+    items = {}
+    with console.status(f"Lade {len(jobs)} Element(e)..."):
+        keys = [str(job["rating_key"]) for job in jobs]
+        for start in range(0, len(keys), PLAN_PAGE_SIZE):
+            page = ",".join(keys[start:start + PLAN_PAGE_SIZE])
+            for item in plex.fetchItems(f"/library/metadata/{page}"):
+                items[int(item.ratingKey)] = item
+    
+    table = Table(title="Auswahl der Versionen (Probelauf)")
+    table.add_column("ID", style="cyan", justify="right")
+    table.add_column("Titel", style="magenta")
+    table.add_column("Version", style="blue")
+    table.add_column("Bisher", justify="right")
+    table.add_column("Gewählt", justify="right")
+    table.add_column("Ersparnis", style="green", justify="right")
+    if transcoding():
+        table.add_column(f"Transkodiert ({describe_profile()})", style="cyan", justify="right")
+    
+    current_total = selected_total = saved_total = transcoded_total = 0
+    for job in jobs:
+        item = items.get(int(job["rating_key"]))
+        plan = selection_plan(item) if item is not None else None
+        if plan is None:
+            table.add_row(str(job["id"]), job["title"], "[red]nicht gefunden[/red]", "", "", "")
+            continue
+        current_total += plan["current"]
+        selected_total += plan["selected"]
+        saved_total += plan["saved"]
+        row = [
+            str(job["id"]), job["title"], plan["version"],
+            f"{plan['current'] / 1024 ** 2:.0f} MB", f"{plan['selected'] / 1024 ** 2:.0f} MB",
+            f"{plan['saved'] / 1024 ** 2:.0f} MB",
+        ]
+        if transcoding():
+            transcoded = sum(estimated_size(part) for part in selected_parts(item))
+            transcoded_total += transcoded
+            row.append(f"ca. {transcoded / 1024 ** 2:.0f} MB")
+        table.add_row(*row)
+    console.print(table)
+    console.print(
+        f"Bisher {current_total / 1024 ** 3:.1f} GB, mit media_policy {selected_total / 1024 ** 3:.1f} GB: "
+        f"[bold green]{saved_total / 1024 ** 3:.1f} GB gespart[/bold green]"
+    )
+    if transcoding():
+        console.print(f"Transkodiert ca. {transcoded_total / 1024 ** 3:.1f} GB")
+    console.print("[dim]Mehrteilige Medien werden vollständig geladen, bisher nur der erste Teil.[/dim]")
+
+@queue_app.command("list")
+def queue_list(
+    status: Optional[str] = typer.Option(None, "--status", help="Nur Jobs mit diesem Status (pending, running, done, failed)."),
+):
+    """Zeigt die Jobs der Warteschlange mit Status und Fortschritt an."""
+    from plex_downloader.modules.job_queue import JobQueue
+    
+    job_queue = JobQueue(QUEUE_FILE)
+    try:
+        jobs = job_queue.jobs(status)
+    finally:
+        job_queue.close()
+    
+    if not jobs:
+        console.print("[yellow]Die Warteschlange ist leer.[/yellow]")
+        return
+    
+    table = Table(title="Download-Warteschlange")
+    table.add_column("ID", style="cyan", justify="right")
+    table.add_column("Status", style="yellow")
+    table.add_column("Titel", style="magenta")
+    table.add_column("Versuche", justify="right")
+    table.add_column("Fortschritt", style="green", justify="right")
+    table.add_column("Fehler", style="red")
+    
+    for job in jobs:
+        progress_text = f"{job['bytes_done'] / (1024 * 1024):.0f} / {job['bytes_total'] / (1024 * 1024):.0f} MB"
+        table.add_row(
+            str(job["id"]), job["status"], job["title"],
+            f"{job['attempts']}/{job['max_attempts']}", progress_text, job["error"] or ""
+        )
+    console.print(table)
+
+@queue_app.command("retry")
+def queue_retry():
+    """Stellt endgültig fehlgeschlagene Jobs erneut in die Warteschlange."""
+    from plex_downloader.modules.job_queue import JobQueue
+    
+    job_queue = JobQueue(QUEUE_FILE)
+    try:
+        count = job_queue.retry_failed()
+    finally:
+        job_queue.close()
+    console.print(f"[green]{count} Job(s) erneut in die Warteschlange gestellt.[/green]")
+
+@queue_app.command("clear")
+def queue_clear():
+    """Entfernt erledigte Jobs aus der Warteschlange."""
+    from plex_downloader.modules.job_queue import JobQueue
+    
+    job_queue = JobQueue(QUEUE_FILE)
+    try:
+        count = job_queue.clear("done")
+    finally:
+        job_queue.close()
+    console.print(f"[green]{count} erledigte(r) Job(s) entfernt.[/green]")
+
+
+@app.command()
+def mirror(
+    name: Optional[str] = typer.Argument(
+        None, help="Bibliothek oder Serie, die gespiegelt werden soll. Ohne Angabe werden alle Ziele aktualisiert."
+    ),
+    remove: bool = typer.Option(False, "--remove", help="Bibliothek oder Serie nicht mehr spiegeln."),
+):
+    """Stellt neue oder geänderte Filme und Episoden gespiegelter Bibliotheken/Serien in die Warteschlange."""
+    from plex_downloader.modules.downloader import configure_downloads
+    from plex_downloader.modules.job_queue import JobQueue
+    from plex_downloader.modules.mirror import MirrorState, resolve_target, mirror_target, delivered_lookup
+    
+    config_data = ensure_config()
+    # Staging-Verzeichnisse, damit bereits geladene Dateien auf allen Laufwerken erkannt werden
+    configure_downloads(config_data)
+    download_dir = Path(config_data.get("download_path", Path.home() / "Downloads"))
+    # Keep media_server_path as string to support both local and remote paths
+    media_server_path = config_data.get("media_server_path")
+    
+    plex = get_plex_server()
+    state = MirrorState(MIRROR_FILE)
+    job_queue = JobQueue(QUEUE_FILE)
+    try:
+        if name:
+            try:
+                kind, plex_key, title = resolve_target(plex, name)
+            except ValueError as e:
+                console.print(f"[red]{e}[/red]")
+                raise typer.Exit(code=1)
+            if remove:
+                state.remove(f"{kind}:{plex_key}")
+                console.print(f"[green]'{title}' wird nicht mehr gespiegelt.[/green]")
+                return
+            targets = [state.get(state.add(kind, plex_key, title))]
+        else:
+            targets = state.targets()
+            if not targets:
+                console.print("[yellow]Noch keine Spiegel-Ziele. Beispiel: plex-dl mirror \"Filme\"[/yellow]")
+                return
+        
+        table = Table(title="Spiegeln")
+        table.add_column("Ziel", style="magenta")
+        table.add_column("Geprüft", justify="right")
+        table.add_column("Eingereiht", style="green", justify="right")
+        table.add_column("Übersprungen", style="yellow", justify="right")
+        table.add_column("Dauer", justify="right")
+        
+        delivered = delivered_lookup(media_server_path)
+        total_enqueued = 0
+        for target in targets:
+            started = time_module.monotonic()
+            with console.status(f"[cyan]Suche Änderungen in '{target['title']}'..."):
+                stats = mirror_target(plex, state, job_queue, target, download_dir, delivered)
+            total_enqueued += stats["enqueued"]
+            table.add_row(
+                target["title"], str(stats["changed"]), str(stats["enqueued"]), str(stats["skipped"]),
+                f"{time_module.monotonic() - started:.1f}s"
+            )
+    finally:
+        job_queue.close()
+        state.close()
+    
+    console.print(table)
+    if total_enqueued:
+        console.print(f"[bold green]{total_enqueued} Element(e) eingereiht.[/bold green] Laden mit: plex-dl queue run")
+    else:
+        console.print("[green]Alles aktuell.[/green]")
+
+@index_app.command("refresh")
+def index_refresh(
+    full: bool = typer.Option(False, "--full", help="Alle Elemente neu laden statt nur die geänderten."),
+):
+    """Baut den lokalen Index auf oder aktualisiert ihn inkrementell."""
+    from plex_downloader.modules.library_index import LibraryIndex, refresh_index
+    
+    ensure_config()
+    plex = get_plex_server()
+    index = LibraryIndex(LIBRARY_INDEX_FILE)
+    started = time_module.monotonic()
+    try:
+        with console.status("[bold green]Aktualisiere lokalen Index..."):
+            stats = refresh_index(plex, index, full=full)
+    finally:
+        index.close()
+    elapsed = time_module.monotonic() - started
+    console.print(
+        f"[bold green]Index aktualisiert:[/bold green] {stats['updated']} Element(e) geladen, "
+        f"{stats['deleted']} entfernt ({elapsed:.1f}s)"
+    )
 
 
 
 def start():
-    app()
+    try:
+        app()
+    finally:
+        # Nur berichten, wenn in diesem Lauf überhaupt HTTP-Verbindungen möglich waren
+        http_session = sys.modules.get("plex_downloader.modules.http_session")
+        if http_session is not None:
+            http_session.report_connection_stats()
+        metrics = sys.modules.get("plex_downloader.modules.metrics")
+        if metrics is not None:
+            metrics.flush_metrics()
 
 if __name__ == "__main__":
     start()
\ No newline at end of file
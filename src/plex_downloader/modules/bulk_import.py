@@ -0,0 +1,255 @@
+"""Titellisten (YAML, CSV oder Text) einlesen und gebündelt über eine Plex-Verbindung auflösen."""
+
+import csv
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, List, Optional, Set
+
+from plex_downloader.modules.metrics import phase
+from plex_downloader.modules.show_catalog import show_episodes
+
+DEFAULT_RESOLVE_WORKERS = 8
+MAX_CANDIDATES = 5  # Angezeigte Treffer bei mehrdeutigen Titeln
+
+# Ergebnisse von resolve_titles()
+STATUS_RESOLVED = "gefunden"
+STATUS_AMBIGUOUS = "mehrdeutig"
+STATUS_NOT_FOUND = "nicht gefunden"
+STATUS_ERROR = "Fehler"
+
+# 'Titel (2010) S01', 'Titel S01-S03', 'Titel S02E03-E07'
+_EPISODE_SPEC = re.compile(
+    r"\s+S(?P<season>\d+)(?:-S?(?P<season_end>\d+))?(?:E(?P<episode>\d+)(?:-E?(?P<episode_end>\d+))?)?$",
+    re.IGNORECASE,
+)
+_YEAR = re.compile(r"\s*\((?P<year>\d{4})\)$")
+
+
+class TitleRequest:
+    """Ein Eintrag der Titelliste: Titel, optional Jahr und Staffel-/Episodenbereiche."""
+
+    def __init__(self, title: str, year: Optional[int] = None, seasons: Optional[Set[int]] = None,
+                 episodes: Optional[Set[int]] = None, line: int = 0):
+        self.title = title
+        self.year = year
+        self.seasons = seasons
+        self.episodes = episodes
+        self.line = line
+
+    @property
+    def wants_show(self) -> bool:
+        """True, wenn Staffeln oder Episoden angegeben sind (der Titel muss eine Serie sein)."""
+        return self.seasons is not None or self.episodes is not None
+
+    def describe(self) -> str:
+        """Gibt den Eintrag so zurück, wie er in der Liste stand (für Tabellen und Meldungen)."""
+        text = f"{self.title} ({self.year})" if self.year else self.title
+        if self.seasons:
+            text += " " + _format_range(self.seasons, "S")
+        if self.episodes:
+            text += " " + _format_range(self.episodes, "E")
+        return text
+
+
+def _format_range(numbers: Set[int], prefix: str) -> str:
+    """Fasst Nummern zu Bereichen zusammen, z.B. {1, 2, 3, 5} → 'S01-S03,S05'."""
+    runs = []
+    for number in sorted(numbers):
+        if runs and number == runs[-1][1] + 1:
+            runs[-1][1] = number
+        else:
+            runs.append([number, number])
+    return ",".join(
+        f"{prefix}{start:02d}" if start == end else f"{prefix}{start:02d}-{prefix}{end:02d}" for start, end in runs
+    )
+
+
+class Resolution:
+    """Ergebnis der Auflösung eines Eintrags: Status, Treffer und die zu ladenden Elemente."""
+
+    def __init__(self, request: TitleRequest, status: str, candidates: Optional[List] = None,
+                 items: Optional[List] = None, error: Optional[str] = None):
+        self.request = request
+        self.status = status
+        self.candidates = candidates or []
+        self.items = items or []
+        self.error = error
+
+
+def parse_range(value) -> Optional[Set[int]]:
+    """
+    Liest einen Bereich wie 3, '1-3', '1,4,6-8' oder [1, 2] als Menge von Nummern.
+
+    Raises:
+        ValueError: Wenn der Bereich nicht gelesen werden kann
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, int):
+        return {value}
+    if isinstance(value, (list, tuple)):
+        numbers = set()
+        for entry in value:
+            numbers |= parse_range(entry) or set()
+        return numbers
+    numbers = set()
+    for part in str(value).replace(" ", "").split(","):
+        start, _, end = part.upper().lstrip("SE").partition("-")
+        end = end.lstrip("SE")
+        if not start.isdigit() or (end and not end.isdigit()):
+            raise ValueError(f"Ungültiger Bereich '{value}'")
+        numbers |= set(range(int(start), int(end or start) + 1))
+    return numbers
+
+
+def parse_line(text: str, line: int = 0) -> Optional[TitleRequest]:
+    """Liest eine Textzeile wie 'Titel (2010) S01E03-E07'. Leere Zeilen und Kommentare ergeben None."""
+    text = text.strip()
+    if not text or text.startswith("#"):
+        return None
+    seasons = episodes = None
+    match = _EPISODE_SPEC.search(text)
+    if match:
+        seasons = set(range(int(match["season"]), int(match["season_end"] or match["season"]) + 1))
+        if match["episode"]:
+            episodes = set(range(int(match["episode"]), int(match["episode_end"] or match["episode"]) + 1))
+        text = text[:match.start()]
+    year = None
+    match = _YEAR.search(text)
+    if match:
+        year = int(match["year"])
+        text = text[:match.start()]
+    return TitleRequest(text.strip(), year, seasons, episodes, line)
+
+
+def _from_mapping(entry: dict, line: int) -> TitleRequest:
+    """Erstellt einen Eintrag aus einer YAML- oder CSV-Zeile mit Spalten title, year, season(s), episode(s)."""
+    title = str(entry.get("title") or "").strip()
+    if not title:
+        raise ValueError(f"Eintrag {line}: 'title' fehlt")
+    year = entry.get("year")
+    seasons = entry.get("seasons", entry.get("season"))
+    episodes = entry.get("episodes", entry.get("episode"))
+    return TitleRequest(
+        title, int(year) if year not in (None, "") else None, parse_range(seasons), parse_range(episodes), line
+    )
+
+
+def load_title_list(path: Path) -> List[TitleRequest]:
+    """
+    Liest eine Titelliste. Das Format ergibt sich aus der Dateiendung.
+
+    - .yaml/.yml: Liste aus Textzeilen oder Einträgen mit title, year, seasons, episodes
+    - .csv: Kopfzeile mit den Spalten title, year, seasons, episodes
+    - sonst: eine Textzeile pro Titel, z.B. 'Titel (2010) S01E03-E07'
+
+    Raises:
+        ValueError: Wenn ein Eintrag nicht gelesen werden kann
+    """
+    suffix = path.suffix.lower()
+    title_requests = []
+    if suffix in (".yaml", ".yml"):
+        import yaml
+
+        with open(path, "r") as f:
+            data = yaml.safe_load(f) or []
+        if not isinstance(data, list):
+            raise ValueError("Die YAML-Datei muss eine Liste von Titeln enthalten")
+        for number, entry in enumerate(data, start=1):
+            if isinstance(entry, dict):
+                title_requests.append(_from_mapping(entry, number))
+            elif entry is not None:
+                request = parse_line(str(entry), number)
+                if request is not None:
+                    title_requests.append(request)
+    elif suffix == ".csv":
+        with open(path, "r", newline="") as f:
+            for number, row in enumerate(csv.DictReader(f), start=2):
+                row = {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+                if row.get("title", "").startswith("#"):
+                    continue
+                title_requests.append(_from_mapping(row, number))
+    else:
+        with open(path, "r") as f:
+            for number, text in enumerate(f, start=1):
+                request = parse_line(text, number)
+                if request is not None:
+                    title_requests.append(request)
+    return title_requests
+
+
+def _normalize(title: str) -> str:
+    """Vereinheitlicht einen Titel für den Vergleich (Groß-/Kleinschreibung, Akzente, Satzzeichen)."""
+    text = unicodedata.normalize("NFKD", title.casefold())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+def select_items(request: TitleRequest, item) -> List:
+    """Gibt die zu ladenden Elemente eines Treffers zurück (den Film oder die gewünschten Episoden)."""
+    if item.type == "movie":
+        return [item]
+    return [
+        episode for episode in show_episodes(item)
+        if (request.seasons is None or episode.seasonNumber in request.seasons)
+        and (request.episodes is None or episode.index in request.episodes)
+    ]
+
+
+def resolve_title(plex, request: TitleRequest) -> Resolution:
+    """
+    Sucht einen Eintrag auf dem Server (ein Request, bei Serien ein weiterer für alle Episoden).
+
+    Eindeutig ist ein Treffer nur, wenn genau ein Titel exakt übereinstimmt (und das Jahr,
+    falls angegeben). Ein einzelner ungefährer Treffer gilt als mehrdeutig und wird zur
+    Prüfung vorgelegt.
+    """
+    libtype = "show" if request.wants_show else None
+    with phase("search", query=request.title):
+        results = [
+            item for item in plex.library.search(title=request.title, libtype=libtype)
+            if item.type in ("movie", "show")
+        ]
+    if request.year:
+        results = [item for item in results if getattr(item, "year", None) == request.year]
+    wanted = _normalize(request.title)
+    exact = [item for item in results if _normalize(item.title) == wanted]
+
+    if len(exact) == 1:
+        return Resolution(request, STATUS_RESOLVED, exact, select_items(request, exact[0]))
+    candidates = exact or results
+    if not candidates:
+        return Resolution(request, STATUS_NOT_FOUND)
+    return Resolution(request, STATUS_AMBIGUOUS, candidates[:MAX_CANDIDATES])
+
+
+def resolve_titles(plex, title_requests: List[TitleRequest], workers: int = DEFAULT_RESOLVE_WORKERS,
+                   on_result: Optional[Callable[[Resolution], None]] = None) -> List[Resolution]:
+    """
+    Löst alle Einträge gleichzeitig über dieselbe Plex-Verbindung auf.
+
+    Args:
+        plex: Die Plex Server-Verbindung
+        title_requests: Die Einträge der Titelliste
+        workers: Anzahl gleichzeitiger Suchanfragen
+        on_result: Optionaler Callback(ergebnis) nach jedem aufgelösten Eintrag
+
+    Returns:
+        Die Ergebnisse in der Reihenfolge der Liste
+    """
+    results = [None] * len(title_requests)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(resolve_title, plex, request): number for number, request in enumerate(title_requests)}
+        for future in as_completed(futures):
+            number = futures[future]
+            try:
+                resolution = future.result()
+            except Exception as e:
+                # Ein fehlerhafter Eintrag soll nicht die ganze Liste abbrechen
+                resolution = Resolution(title_requests[number], STATUS_ERROR, error=str(e))
+            results[number] = resolution
+            if on_result is not None:
+                on_result(resolution)
+    return results
@@ -1,18 +1,58 @@
 """Cleanup-Modul für temporäre Dateien."""
 
 from pathlib import Path
+from typing import List
 from rich.console import Console
 from rich.prompt import Confirm
 
+from plex_downloader.modules.resume import (
+    SIDECAR_SUFFIX, is_resumable, load_resume_state, remove_resume_state, resumed_bytes
+)
+
 console = Console()
 
 
+def cleanup_paths(config_data: dict) -> List[str]:
+    """
+    Gibt alle Verzeichnisse zurück, in denen .temp Dateien liegen können.
+
+    Das sind das Download-Verzeichnis, weitere Staging-Verzeichnisse und ein lokales
+    Zielverzeichnis auf dem Medienserver (dort lädt direct_to_destination). rclone remotes
+    werden nicht durchsucht.
+    """
+    paths = [config_data.get("download_path")] + list(config_data.get("staging_paths") or [])
+    media_server_path = config_data.get("media_server_path")
+    if media_server_path and ":" not in str(media_server_path):
+        paths.append(media_server_path)
+    return paths
+
+
+def _remove_orphaned_sidecars(download_dir: Path) -> None:
+    """Löscht Sidecar-Dateien (auch halb geschriebene), deren .temp Datei nicht mehr existiert."""
+    orphaned = [
+        sidecar for suffix in (SIDECAR_SUFFIX, f"{SIDECAR_SUFFIX}.tmp")
+        for sidecar in download_dir.rglob(f"*.temp{suffix}")
+        if not sidecar.with_name(sidecar.name[:-len(suffix)]).exists()
+    ]
+    for sidecar in orphaned:
+        try:
+            sidecar.unlink()
+        except OSError as e:
+            console.print(f"[red]Fehler beim Löschen von {sidecar.name}: {e}[/red]")
+    if orphaned:
+        console.print(f"[dim]{len(orphaned)} verwaiste Sidecar-Datei(en) ohne .temp Datei entfernt.[/dim]")
+
+
 def cleanup_temp_files(download_path: str) -> None:
     """
-    Prüft auf alte .temp Dateien und bietet deren Löschung an.
+    Prüft auf alte .temp Dateien und bietet die Löschung der nicht fortsetzbaren an.
+    
+    Fortsetzbare .temp Dateien (mit gültiger Sidecar-Datei) bleiben erhalten und werden
+    beim nächsten Download derselben Datei weitergeladen. Sidecar-Dateien, deren .temp
+    Datei fehlt, werden ohne Nachfrage gelöscht.
     
     Args:
-        download_path: Der Pfad zum Download-Verzeichnis
+        download_path: Der Pfad zum Download-Verzeichnis (oder ein anderes aus cleanup_paths())
     """
     if not download_path:
         return  # Keine Konfiguration vorhanden
@@ -21,12 +61,28 @@ def cleanup_temp_files(download_path: str) -> None:
     if not download_dir.exists():
         return
     
+    _remove_orphaned_sidecars(download_dir)
+    
     # Suche nach .temp Dateien (rekursiv)
     temp_files = list(download_dir.rglob("*.temp"))
     
     if not temp_files:
         return  # Keine temp Dateien gefunden
     
+    resumable_files = [temp_file for temp_file in temp_files if is_resumable(temp_file)]
+    temp_files = [temp_file for temp_file in temp_files if temp_file not in resumable_files]
+    
+    if resumable_files:
+        console.print(f"\n[cyan]{len(resumable_files)} unvollständige Download(s) können fortgesetzt werden:[/cyan]")
+        for temp_file in resumable_files:
+            state = load_resume_state(temp_file)
+            done_size = resumed_bytes(temp_file, state) / (1024 * 1024)  # In MB
+            total_size = state["size"] / (1024 * 1024)
+            console.print(f"  - {temp_file.name} ({done_size:.2f} von {total_size:.2f} MB)")
+    
+    if not temp_files:
+        return  # Keine nicht fortsetzbaren temp Dateien
+    
     console.print(f"\n[yellow]Es wurden {len(temp_files)} alte .temp Datei(en) gefunden:[/yellow]")
     for temp_file in temp_files:
         file_size = temp_file.stat().st_size / (1024 * 1024)  # In MB
@@ -38,6 +94,7 @@ def cleanup_temp_files(download_path: str) -> None:
         for temp_file in temp_files:
             try:
                 temp_file.unlink()
+                remove_resume_state(temp_file)
                 console.print(f"[green]Gelöscht: {temp_file.name}[/green]")
                 deleted_count += 1
             except Exception as e:
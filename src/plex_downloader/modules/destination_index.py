@@ -0,0 +1,108 @@
+"""Index der bereits zum Medienserver gelieferten Dateien (ein Aufruf pro Verzeichnis statt pro Datei)."""
+
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, Optional, Union
+from rich.console import Console
+
+console = Console()
+
+# rclone Exit-Code, wenn das Verzeichnis nicht existiert
+RCLONE_DIR_NOT_FOUND = 3
+
+
+class DestinationIndex:
+    """
+    Dateinamen und Größen eines Zielverzeichnisses auf dem Medienserver.
+
+    Für lokale Verzeichnisse werden nur die Pfade gemerkt (paths); die Größe wird erst beim
+    ersten Nachfragen per stat gelesen, also nur für Dateien, die tatsächlich geprüft werden.
+    """
+
+    def __init__(self, files: Optional[Dict[str, int]] = None, paths: Optional[Dict[str, str]] = None):
+        self.files = files or {}
+        self._paths = paths or {}
+
+    def __len__(self) -> int:
+        return len(self.files) + len(self._paths)
+
+    def size_of(self, filename: str) -> Optional[int]:
+        """Gibt die Größe einer gelieferten Datei zurück oder None, wenn sie fehlt."""
+        if filename not in self.files and filename in self._paths:
+            try:
+                self.files[filename] = os.stat(self._paths.pop(filename)).st_size
+            except OSError:
+                # Inzwischen gelöscht oder umbenannt
+                return None
+        return self.files.get(filename)
+
+    def contains(self, filename: str, size: Optional[int] = None) -> bool:
+        """
+        Prüft, ob eine Datei bereits geliefert wurde.
+
+        Args:
+            filename: Der Dateiname
+            size: Optional die erwartete Größe; weicht sie ab, gilt die Datei als nicht geliefert
+        """
+        if not size:
+            # Ohne erwartete Größe genügt der Name, ein stat ist nicht nötig
+            return filename in self.files or filename in self._paths
+        return self.size_of(filename) == size
+
+
+def _list_remote(destination: str, recursive: bool) -> Dict[str, int]:
+    """Listet ein rclone remote mit einem einzigen 'rclone lsjson' Aufruf."""
+    command = ["rclone", "lsjson", "--files-only", "--no-modtime", "--no-mimetype", destination]
+    if recursive:
+        command.insert(2, "-R")
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+    except FileNotFoundError:
+        console.print("[yellow]rclone nicht gefunden, bereits gelieferte Dateien werden nicht erkannt.[/yellow]")
+        return {}
+    if result.returncode == RCLONE_DIR_NOT_FOUND:
+        return {}
+    if result.returncode != 0:
+        console.print(f"[yellow]Medienserver konnte nicht gelistet werden: {result.stderr.strip()}[/yellow]")
+        return {}
+    return {Path(entry["Path"]).name: int(entry.get("Size", -1)) for entry in json.loads(result.stdout or "[]")}
+
+
+def _list_local(destination: Path, recursive: bool) -> Dict[str, str]:
+    """Listet die Pfade eines lokalen Verzeichnisses (mit os.scandir, die Größen liest erst DestinationIndex)."""
+    files = {}
+    pending = [destination]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        pending.append(Path(entry.path))
+                elif entry.is_file():
+                    files[entry.name] = entry.path
+    return files
+
+
+def build_destination_index(destination: Union[str, Path], recursive: bool = True) -> DestinationIndex:
+    """
+    Erstellt den Index eines Zielverzeichnisses auf dem Medienserver.
+
+    Für rclone remotes genügt ein 'rclone lsjson -R' Aufruf, für lokale Pfade ein
+    Verzeichnisdurchlauf. Danach sind keine Abfragen pro Datei mehr nötig.
+
+    Args:
+        destination: Das Zielverzeichnis (lokaler Pfad oder rclone remote)
+        recursive: Auch Unterverzeichnisse einbeziehen
+
+    Returns:
+        Der Index; leer, wenn das Verzeichnis (noch) nicht existiert
+    """
+    if isinstance(destination, str) and ":" in destination:
+        return DestinationIndex(_list_remote(destination, recursive))
+    return DestinationIndex(paths=_list_local(Path(destination), recursive))
@@ -1,14 +1,62 @@
 """Download-Modul für Plex-Medien."""
 
+import shutil
+import subprocess
+import tempfile
+import threading
 import requests
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Union, Optional
+from typing import Callable, List, Optional, Tuple, Union
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TransferSpeedColumn, TimeRemainingColumn
 from rich.prompt import Confirm
 
+from plex_downloader.modules.destination_index import DestinationIndex
+from plex_downloader.modules.headless import HeadlessProgress, headless
+from plex_downloader.modules.http_session import get_session, configure_session
+from plex_downloader.modules.rate_limiter import configure_bandwidth, throttle
+from plex_downloader.modules.media_selection import selected_parts
+from plex_downloader.modules.integrity import new_hasher, hash_file, record_file
+from plex_downloader.modules.transfer import (
+    stream_to_file, preallocate, parse_size, DEFAULT_BUFFER_SIZE, DEFAULT_BUFFER_COUNT, TRANSFER_MODES
+)
+from plex_downloader.modules.metrics import PhaseRecord, phase
+from plex_downloader.modules.retry import (
+    configure_retries, retry_setting, timeouts, is_transient, backoff_delay, watch,
+    IncompleteTransferError, RetryableError,
+)
+from plex_downloader.modules.transcode import (
+    set_transcoding, transcoding, transcode_url, new_session, stop_transcode, estimated_size, TRANSCODE_CONTAINER,
+)
+from plex_downloader.modules.staging import StagingArea, InsufficientSpaceError, DEFAULT_MIN_FREE_SPACE
+from plex_downloader.modules.resume import (
+    load_resume_state, save_resume_state, remove_resume_state, resumed_bytes, is_resumable
+)
+
 console = Console()
 
+CHUNK_SIZE = 1024 * 1024  # 1MB Chunks
+DEFAULT_SEGMENTS = 1
+DEFAULT_CONCURRENCY = 1
+MIN_SEGMENT_SIZE = 16 * 1024 * 1024  # Kleinere Segmente lohnen den Verbindungsaufbau nicht
+RESUME_SAVE_INTERVAL = 64 * 1024 * 1024  # Segment-Fortschritt alle 64MB in der Sidecar-Datei sichern
+
+# Laufzeit-Einstellungen, werden über configure_downloads() aus der Konfiguration gesetzt
+_settings = {
+    "segments": DEFAULT_SEGMENTS,
+    "concurrency": DEFAULT_CONCURRENCY,
+    "transfer_mode": TRANSFER_MODES[0],
+    "buffer_size": DEFAULT_BUFFER_SIZE,
+    "buffer_count": DEFAULT_BUFFER_COUNT,
+    "direct_to_destination": False,
+    "staging": StagingArea(),
+}
+
+# Wird gesetzt, um laufende Downloads in anderen Threads abzubrechen
+_cancel_event = threading.Event()
+
 
 def sanitize_filename(filename: str) -> str:
     """Entfernt ungültige Zeichen aus Dateinamen."""
@@ -27,15 +75,357 @@ def sanitize_filename(filename: str) -> str:
     return filename
 
 
-def download_file(download_url: str, filepath: Path, temp_filepath: Path, filename: str) -> bool:
+def _positive_int(value, default: int, label: str) -> int:
+    """Wandelt einen Konfigurationswert in eine positive Ganzzahl um."""
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        console.print(f"[yellow]Ungültige {label} '{value}', verwende {default}.[/yellow]")
+        return default
+
+
+def configure_downloads(config_data: dict, segments: Optional[int] = None,
+                        concurrency: Optional[int] = None, transcode: Optional[bool] = None) -> None:
     """
-    Lädt eine Datei von einer URL mit Fortschrittsbalken herunter.
+    Übernimmt die Download-Einstellungen aus der Konfiguration.
+    
+    Args:
+        config_data: Die geladene Konfiguration (config.yaml)
+        segments: Optionaler Wert von der Kommandozeile, hat Vorrang vor der Konfiguration
+        concurrency: Optionaler Wert von der Kommandozeile, hat Vorrang vor der Konfiguration
+        transcode: Optionaler Wert von der Kommandozeile, hat Vorrang vor der Konfiguration
+    """
+    if segments is None:
+        segments = config_data.get("segments", DEFAULT_SEGMENTS)
+    if concurrency is None:
+        concurrency = config_data.get("concurrency", DEFAULT_CONCURRENCY)
+    _settings["segments"] = _positive_int(segments, DEFAULT_SEGMENTS, "Segmentanzahl")
+    _settings["concurrency"] = _positive_int(concurrency, DEFAULT_CONCURRENCY, "Anzahl paralleler Downloads")
+    
+    transfer_mode = config_data.get("transfer_mode", TRANSFER_MODES[0])
+    if transfer_mode not in TRANSFER_MODES:
+        console.print(f"[yellow]Unbekannter transfer_mode '{transfer_mode}', verwende {TRANSFER_MODES[0]}.[/yellow]")
+        transfer_mode = TRANSFER_MODES[0]
+    _settings["transfer_mode"] = transfer_mode
+    try:
+        _settings["buffer_size"] = parse_size(config_data.get("buffer_size", DEFAULT_BUFFER_SIZE))
+    except ValueError as e:
+        console.print(f"[yellow]{e}, verwende {DEFAULT_BUFFER_SIZE // 1024} KB Puffer.[/yellow]")
+        _settings["buffer_size"] = DEFAULT_BUFFER_SIZE
+    _settings["buffer_count"] = _positive_int(
+        config_data.get("buffer_count", DEFAULT_BUFFER_COUNT), DEFAULT_BUFFER_COUNT, "Pufferanzahl"
+    )
+    _settings["direct_to_destination"] = bool(config_data.get("direct_to_destination", False))
+    
+    # Das Download-Verzeichnis zuerst, weitere Staging-Verzeichnisse werden nach freiem Platz und Last gewählt
+    staging_dirs = [Path(config_data.get("download_path", Path.home() / "Downloads"))]
+    staging_dirs += [Path(path).expanduser() for path in config_data.get("staging_paths") or []]
+    try:
+        min_free_space = parse_size(config_data.get("min_free_space", DEFAULT_MIN_FREE_SPACE))
+    except ValueError as e:
+        console.print(f"[yellow]{e}, lasse {DEFAULT_MIN_FREE_SPACE // 1024 ** 3} GB frei.[/yellow]")
+        min_free_space = DEFAULT_MIN_FREE_SPACE
+    _settings["staging"] = StagingArea(staging_dirs, min_free_space)
+    try:
+        configure_retries(config_data)
+    except ValueError as e:
+        console.print(f"[yellow]Ungültige Einstellung für Zeitlimits oder Wiederholungen ({e}), verwende Standardwerte.[/yellow]")
+    if transcode is not None:
+        set_transcoding(transcode)
+    
+    from plex_downloader.modules.rclone_mover import configure_mover, DEFAULT_TRANSFERS, DEFAULT_CHECKERS
+    configure_mover(
+        _positive_int(config_data.get("rclone_transfers", DEFAULT_TRANSFERS), DEFAULT_TRANSFERS, "Anzahl rclone-Übertragungen"),
+        _positive_int(config_data.get("rclone_checkers", DEFAULT_CHECKERS), DEFAULT_CHECKERS, "Anzahl rclone-Prüfungen"),
+    )
+    
+    # Genug Verbindungen für alle gleichzeitigen Segmente plus Metadaten-Abfragen offen halten
+    configure_session(_settings["segments"] * _settings["concurrency"] + 2)
+    configure_bandwidth(config_data.get("bandwidth_schedule"))
+
+
+def download_setting(key: str):
+    """Gibt eine über configure_downloads() gesetzte Einstellung zurück."""
+    return _settings[key]
+
+
+def local_file(download_dir: Path, filename: str) -> Optional[Path]:
+    """Gibt den Pfad einer bereits geladenen Datei zurück, auf welchem Staging-Verzeichnis sie auch liegt (sonst None)."""
+    return _settings["staging"].locate(download_dir, filename)
+
+
+def cancel_downloads() -> None:
+    """Bricht alle laufenden Downloads ab (z.B. parallele Downloads bei Ctrl+C)."""
+    _cancel_event.set()
+
+
+def reset_cancel() -> None:
+    """Setzt den Abbruch-Zustand vor einem neuen Batch zurück."""
+    _cancel_event.clear()
+
+
+def _check_cancelled() -> None:
+    """Wirft KeyboardInterrupt, wenn die Downloads abgebrochen wurden."""
+    if _cancel_event.is_set():
+        raise KeyboardInterrupt
+
+
+def _supports_ranges(response: requests.Response) -> bool:
+    """Prüft, ob der Server Byte-Range-Requests für die Datei unterstützt."""
+    return response.headers.get('accept-ranges', '').lower() == 'bytes'
+
+
+def _validators(response: requests.Response) -> dict:
+    """Liest die Validatoren (ETag/Last-Modified) einer Antwort aus."""
+    return {
+        "etag": response.headers.get('etag'),
+        "last_modified": response.headers.get('last-modified'),
+    }
+
+
+def _content_range_total(response: requests.Response) -> int:
+    """Liest die Gesamtgröße aus dem Content-Range Header (z.B. 'bytes 0-0/12345')."""
+    content_range = response.headers.get('content-range', '')
+    try:
+        return int(content_range.rsplit('/', 1)[1])
+    except (IndexError, ValueError):
+        return 0
+
+
+def _same_source(state: dict, validators: dict) -> bool:
+    """Prüft, ob die gespeicherten Validatoren noch zur Datei auf dem Server passen."""
+    for key in ("etag", "last_modified"):
+        if state.get(key) and validators.get(key):
+            return state[key] == validators[key]
+    # Ohne Validatoren verlassen wir uns auf den Part-Key (enthält den Änderungszeitpunkt)
+    return True
+
+
+def _segment_ranges(total_size: int, segments: int) -> list:
+    """Teilt eine Datei in Segmente auf. Jedes Segment ist [start, end, bereits geschrieben]."""
+    segment_size = total_size // segments
+    ranges = []
+    for idx in range(segments):
+        start = idx * segment_size
+        end = total_size - 1 if idx == segments - 1 else start + segment_size - 1
+        ranges.append([start, end, 0])
+    return ranges
+
+
+def _keep_or_remove_partial(temp_filepath: Path) -> None:
+    """Behält eine fortsetzbare temp Datei, löscht sie sonst samt Sidecar."""
+    if is_resumable(temp_filepath):
+        console.print("[yellow]Teildownload bleibt erhalten und wird beim nächsten Versuch fortgesetzt.[/yellow]")
+        return
+    if temp_filepath.exists():
+        temp_filepath.unlink()
+    remove_resume_state(temp_filepath)
+
+
+def _check_size(temp_filepath: Path, expected_size: int) -> int:
+    """
+    Vergleicht die geladene Bytezahl mit der erwarteten Dateigröße.
+    
+    Raises:
+        IOError: Wenn die Datei kleiner (abgeschnittene Antwort) oder größer als erwartet ist
+    """
+    size = temp_filepath.stat().st_size
+    if expected_size and size < expected_size:
+        raise IncompleteTransferError(f"Download unvollständig: {size} von {expected_size} Bytes")
+    if expected_size and size > expected_size:
+        # Nicht fortsetzbar, die Datei stimmt nicht mit der Quelle überein
+        temp_filepath.unlink()
+        remove_resume_state(temp_filepath)
+        raise IOError(f"Download größer als erwartet: {size} statt {expected_size} Bytes")
+    return size
+
+
+def _unverified_end(response, known_size: int) -> bool:
+    """
+    Prüft, ob sich das Ende einer Antwort nicht auf Vollständigkeit prüfen lässt.
+
+    Ohne bekannte Größe erkennt nur chunked Transfer-Encoding ein vorzeitiges Ende (fehlender
+    Abschluss-Chunk). Endet eine Antwort ohne beides einfach mit der Verbindung, fällt ein
+    Abbruch nicht auf.
+    """
+    chunked = "chunked" in response.headers.get("transfer-encoding", "").lower()
+    return not known_size and not chunked
+
+
+class _SegmentStopped(Exception):
+    """Ein anderes Segment ist fehlgeschlagen, dieses Segment bricht ab."""
+
+
+def _threaded_transfer() -> bool:
+    """Gibt zurück, ob Lesen und Schreiben in getrennten Threads laufen (transfer_mode 'threaded')."""
+    return _settings["transfer_mode"] == "threaded"
+
+
+def _stream(response, file, on_read, on_written) -> int:
+    """Überträgt eine Antwort mit den konfigurierten Puffern in die Datei (siehe stream_to_file)."""
+    return stream_to_file(
+        response, file, on_read=on_read, on_written=on_written,
+        buffer_size=_settings["buffer_size"], buffer_count=_settings["buffer_count"],
+    )
+
+
+def _download_segment(download_url: str, temp_filepath: Path, segment: list,
+                      stop_event: threading.Event, on_progress) -> None:
+    """
+    Lädt den fehlenden Teil eines Segments und schreibt ihn an die passende Stelle der temp Datei.
     
     Args:
         download_url: Die URL der Datei
+        temp_filepath: Die vorbelegte temporäre Datei
+        segment: Das Segment als [start, end, bereits geschrieben]
+        stop_event: Wird gesetzt, wenn die anderen Segmente abbrechen sollen
+        on_progress: Callback(segment, bytes) nach jedem geschriebenen Chunk
+    """
+    start, end, written = segment
+    length = end - start + 1
+    if written >= length:
+        return
+    
+    headers = {"Range": f"bytes={start + written}-{end}"}
+    with get_session().get(download_url, headers=headers, stream=True, timeout=timeouts()) as response:
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise IOError(f"Server ignoriert Range-Request für Bytes {start}-{end}")
+        
+        try:
+            with watch(response) as guard:
+                if _threaded_transfer():
+                    def on_read(size: int) -> None:
+                        _check_cancelled()
+                        if stop_event.is_set():
+                            raise _SegmentStopped
+                        guard.update(size)
+                        with guard.paused():
+                            throttle(size)
+                    
+                    # Ungepuffert: ein Chunk ist nach dem Schreiben sofort in der Datei, wie sonst nach flush()
+                    with open(temp_filepath, "r+b", buffering=0) as file:
+                        file.seek(start + written)
+                        _stream(response, file, on_read, lambda data: on_progress(segment, len(data)))
+                else:
+                    _copy_segment(response, temp_filepath, segment, stop_event, on_progress, guard)
+        except _SegmentStopped:
+            return
+    
+    if segment[2] != length:
+        raise IncompleteTransferError(f"Segment unvollständig: {segment[2]} von {length} Bytes für Bytes {start}-{end}")
+
+
+def _copy_segment(response, temp_filepath: Path, segment: list,
+                  stop_event: threading.Event, on_progress, guard) -> None:
+    """Schreibt ein Segment im einfachen Modus (Lesen und Schreiben im selben Thread)."""
+    start, _, written = segment
+    with open(temp_filepath, "r+b") as file:
+        file.seek(start + written)
+        for data in response.iter_content(chunk_size=CHUNK_SIZE):
+            _check_cancelled()
+            if stop_event.is_set():
+                raise _SegmentStopped
+            guard.update(len(data))
+            file.write(data)
+            # Erst nach dem Flush zählen, damit der gespeicherte Stand nie vor den Daten liegt
+            file.flush()
+            on_progress(segment, len(data))
+            with guard.paused():
+                throttle(len(data))
+
+
+def _download_segmented(download_url: str, temp_filepath: Path, state: dict,
+                        progress: Progress, task, persist: bool) -> None:
+    """
+    Lädt die offenen Segmente einer Datei über parallele Verbindungen in die vorbelegte temp Datei.
+    
+    Args:
+        download_url: Die URL der Datei
+        temp_filepath: Der temporäre Pfad während des Downloads
+        state: Der Download-Zustand mit der Segmentliste
+        progress: Die Fortschrittsanzeige
+        task: Der Fortschritts-Task der Datei
+        persist: Ob der Fortschritt in der Sidecar-Datei gespeichert werden soll
+    """
+    lock = threading.Lock()
+    unsaved = [0]
+    
+    def on_progress(segment: list, size: int) -> None:
+        progress.update(task, advance=size)
+        with lock:
+            segment[2] += size
+            unsaved[0] += size
+            if persist and unsaved[0] >= RESUME_SAVE_INTERVAL:
+                save_resume_state(temp_filepath, state)
+                unsaved[0] = 0
+    
+    pending = [segment for segment in state["segments"] if segment[2] < segment[1] - segment[0] + 1]
+    if not pending:
+        return
+    
+    stop_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=len(pending))
+    try:
+        futures = [
+            executor.submit(_download_segment, download_url, temp_filepath, segment, stop_event, on_progress)
+            for segment in pending
+        ]
+        for future in as_completed(futures):
+            future.result()  # Gibt Fehler eines Segments an den Aufrufer weiter
+    except BaseException:
+        # Restliche Segmente stoppen (auch bei Ctrl+C)
+        stop_event.set()
+        raise
+    finally:
+        executor.shutdown(wait=True)
+        if persist:
+            save_resume_state(temp_filepath, state)
+
+
+def _progress_context(progress, filename: str) -> tuple:
+    """Gibt (Kontext der Fortschrittsanzeige, Beschreibung) zurück: die gemeinsame Anzeige oder eine eigene."""
+    if progress is not None:
+        return nullcontext(progress), f"[cyan]{filename}"
+    if headless():
+        return HeadlessProgress(), filename
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TransferSpeedColumn(),
+        TimeRemainingColumn(),
+    ), "[cyan]Downloading..."
+
+
+def download_file(download_url: Union[str, Callable[[], str]], filepath: Path, temp_filepath: Path, filename: str,
+                  segments: Optional[int] = None, part_key: Optional[str] = None,
+                  expected_size: Optional[int] = None, progress=None, details: Optional[dict] = None) -> bool:
+    """
+    Lädt eine Datei von einer URL mit Fortschrittsbalken herunter.
+    
+    Unterstützt der Server Range-Requests, wird die Datei in mehrere Segmente aufgeteilt
+    und über parallele Verbindungen geladen. Sonst wird über eine einzelne Verbindung geladen.
+    
+    Ist ein part_key angegeben, bleibt die temp Datei bei einem Fehler zusammen mit einer
+    Sidecar-Datei erhalten und wird beim nächsten Aufruf per Range-Request fortgesetzt.
+    
+    Die Bytezahl wird mit der Größe laut Plex verglichen, eine abgeschnittene Antwort gilt
+    damit als Fehler. Die Prüfsumme wird im Download-Loop berechnet und zusammen mit der
+    Größe im Manifest des Zielverzeichnisses gespeichert.
+    
+    Args:
+        download_url: Die URL der Datei oder ein Callback, der vor jedem Versuch eine neue URL
+            liefert (z.B. eine eigene Transcoder-Sitzung pro Versuch)
         filepath: Der finale Zielpfad
         temp_filepath: Der temporäre Pfad während des Downloads
         filename: Der Dateiname für die Anzeige
+        segments: Anzahl paralleler Verbindungen (Standard: Wert aus der Konfiguration)
+        part_key: Der Plex Part-Key der Quelldatei, aktiviert das Fortsetzen
+        expected_size: Die erwartete Dateigröße laut Plex
+        progress: Optionale gemeinsame Fortschrittsanzeige (z.B. bei parallelen Downloads).
+            Die Datei erhält dort eine eigene Zeile, die nach dem Download entfernt wird.
+        details: Zusätzliche Angaben für das Ereignisprotokoll der Messwerte
         
     Returns:
         True wenn der Download erfolgreich war, False sonst
@@ -43,158 +433,667 @@ def download_file(download_url: str, filepath: Path, temp_filepath: Path, filena
     console.print(f"Starte Download: [bold cyan]{filename}[/bold cyan]")
     console.print(f"Ziel: {filepath}")
     
+    with phase("download", file=filename, **(details or {})) as record:
+        record.ok = _with_retries(
+            lambda retry: _download_file(download_url() if callable(download_url) else download_url, filepath, temp_filepath, filename, segments, part_key,
+                                         expected_size, progress, record, retry),
+            filename, record,
+        )
+        return record.ok
+
+
+def _with_retries(attempt, filename: str, record: PhaseRecord) -> bool:
+    """
+    Führt einen Transfer aus und wiederholt ihn bei vorübergehenden Fehlern mit exponentiellem Backoff.
+
+    Args:
+        attempt: Callback(retry) für einen Versuch. Ist retry True, wirft er bei einem
+            vorübergehenden Fehler RetryableError, statt aufzugeben.
+        filename: Der Dateiname für die Anzeige
+        record: Die Messwerte des Transfers (zählt die Wiederholungen)
+    """
+    retries = retry_setting("retries")
+    for number in range(retries + 1):
+        try:
+            return attempt(number < retries)
+        except RetryableError as e:
+            delay = backoff_delay(number)
+            record.retries += 1
+            console.print(
+                f"[yellow]{filename}: {e.__cause__} – Versuch {number + 2}/{retries + 1} "
+                f"in {delay:.1f} Sekunden...[/yellow]"
+            )
+            # Ctrl+C bei parallelen Downloads beendet auch das Warten
+            if _cancel_event.wait(delay):
+                raise KeyboardInterrupt
+    return False
+
+
+def _download_file(download_url: str, filepath: Path, temp_filepath: Path, filename: str,
+                   segments: Optional[int], part_key: Optional[str], expected_size: Optional[int],
+                   progress, record: PhaseRecord, retry: bool) -> bool:
+    """
+    Ein Versuch von download_file(). Trägt Time-to-first-Byte, Bytes und Fehler in record ein.
+
+    Ist retry True, wird bei vorübergehenden Fehlern RetryableError geworfen. Die temp Datei
+    bleibt dann erhalten und der nächste Versuch setzt per Range-Request fort.
+    """
+    if segments is None:
+        segments = _settings["segments"]
+    
+    shared_progress = progress is not None
+    task = None
+    
     try:
-        response = requests.get(download_url, stream=True)
+        # Gespeicherten Zustand nur übernehmen, wenn er zur selben Quelldatei gehört
+        state = load_resume_state(temp_filepath) if part_key else None
+        if state and state["part_key"] != part_key:
+            state = None
+        
+        headers = {}
+        offset = 0
+        probe = False
+        if state and not state.get("segments"):
+            offset = temp_filepath.stat().st_size
+            if 0 < offset < state["size"]:
+                headers["Range"] = f"bytes={offset}-"
+                validator = state.get("etag") or state.get("last_modified")
+                if validator:
+                    headers["If-Range"] = validator
+            else:
+                offset = 0
+        elif segments > 1 or state:
+            # Kleiner Probe-Request: liefert Range-Unterstützung und Gesamtgröße, und die
+            # Verbindung kann danach im Pool wiederverwendet werden
+            headers["Range"] = "bytes=0-0"
+            probe = True
+        
+        response = get_session().get(download_url, headers=headers, stream=True, timeout=timeouts())
+        record.ttfb = response.elapsed.total_seconds()
         response.raise_for_status()  # Prüfe HTTP Status
-        total_size = int(response.headers.get('content-length', 0))
+        content_length = int(response.headers.get('content-length', 0))
+        validators = _validators(response)
+        
+        resumed = 0
+        ranges_supported = _supports_ranges(response)
+        probe_consumed = False
+        if probe and response.status_code == 206:
+            total_size = _content_range_total(response)
+            response.content  # Das eine Byte lesen, damit die Verbindung in den Pool zurückgeht
+            probe_consumed = True
+            ranges_supported = total_size > 0
+            if (state and state.get("segments") and state["size"] == total_size
+                    and _same_source(state, validators)):
+                resumed = resumed_bytes(temp_filepath, state)
+            else:
+                state = None
+        elif offset and response.status_code == 206:
+            total_size = offset + content_length
+            resumed = offset
+        else:
+            # Server liefert die ganze Datei (ignoriert Range oder Datei hat sich geändert)
+            total_size = content_length
+            ranges_supported = ranges_supported and not probe
+            state = None
+        
+        if state and state.get("segments"):
+            # Segmentierter Download wird mit den gespeicherten Segmenten fortgesetzt
+            use_segments = True
+            segments = len(state["segments"])
+        else:
+            # Segmentierter Download nur bei Range-Unterstützung und genügend großen Dateien
+            if segments > 1 and not resumed and not ranges_supported:
+                console.print("[yellow]Server unterstützt keine Range-Requests, lade über eine Verbindung.[/yellow]")
+            segments = min(segments, total_size // MIN_SEGMENT_SIZE)
+            use_segments = not resumed and segments > 1 and ranges_supported
+        
+        if probe_consumed and not use_segments:
+            # Zu klein für Segmente: Datei über die (wiederverwendete) Verbindung normal laden
+            response = get_session().get(download_url, stream=True, timeout=timeouts())
+            response.raise_for_status()
+        
+        if resumed:
+            console.print(f"[cyan]Setze Download fort bei {resumed / (1024 * 1024):.2f} MB[/cyan]")
+        elif part_key:
+            state = {
+                "part_key": part_key,
+                "size": expected_size or total_size,
+                "etag": validators["etag"],
+                "last_modified": validators["last_modified"],
+                "segments": _segment_ranges(total_size, segments) if use_segments else None,
+            }
+            save_resume_state(temp_filepath, state)
+        
+        progress_context, description = _progress_context(progress, filename)
         
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TransferSpeedColumn(),
-            TimeRemainingColumn(),
-        ) as progress:
-            task = progress.add_task("[cyan]Downloading...", total=total_size)
-            
-            with open(temp_filepath, "wb") as file:
-                for data in response.iter_content(chunk_size=1024*1024):  # 1MB Chunks
-                    file.write(data)
-                    progress.update(task, advance=len(data))
+        hasher = None
+        with progress_context as progress:
+            if use_segments:
+                response.close()
+                task = progress.add_task(f"{description} ({segments} Segmente)", total=total_size, completed=resumed)
+                if not resumed:
+                    # Datei auf Endgröße vorbelegen, damit jedes Segment an seinen Offset schreiben kann
+                    with open(temp_filepath, "wb") as file:
+                        file.truncate(total_size)
+                        preallocate(file, 0, total_size)
+                if state is None:
+                    state = {"segments": _segment_ranges(total_size, segments)}
+                _download_segmented(download_url, temp_filepath, state, progress, task, persist=bool(part_key))
+            else:
+                # Ohne Content-Length (z.B. transkodierte Datenströme) ohne Gesamtgröße anzeigen
+                task = progress.add_task(description, total=total_size or None, completed=resumed)
+                hasher = new_hasher()
+                if resumed:
+                    # Bereits geladenen Teil einmal einlesen, danach rechnet der Download-Loop weiter
+                    hash_file(temp_filepath, limit=resumed, hasher=hasher)
+                with watch(response) as guard:
+                    if _threaded_transfer():
+                        def on_read(size: int) -> None:
+                            _check_cancelled()
+                            progress.update(task, advance=size)
+                            guard.update(size)
+                            with guard.paused():
+                                throttle(size)
+                        
+                        with open(temp_filepath, "ab" if resumed else "wb", buffering=0) as file:
+                            # Platz für den Rest am Stück reservieren, vermeidet Fragmentierung
+                            preallocate(file, resumed, total_size - resumed)
+                            _stream(response, file, on_read, hasher.update)
+                    else:
+                        with open(temp_filepath, "ab" if resumed else "wb") as file:
+                            for data in response.iter_content(chunk_size=CHUNK_SIZE):  # 1MB Chunks
+                                _check_cancelled()
+                                guard.update(len(data))
+                                file.write(data)
+                                hasher.update(data)
+                                progress.update(task, advance=len(data))
+                                with guard.paused():
+                                    throttle(len(data))
+        
+        # Abgeschnittene Antworten erkennen (auch ohne Content-Length)
+        size = _check_size(temp_filepath, expected_size or total_size)
+        if not use_segments and _unverified_end(response, expected_size or total_size):
+            console.print(f"[yellow]{filename}: Server meldet weder Größe noch chunked Ende, "
+                          f"Vollständigkeit nicht prüfbar ({size / (1024 * 1024):.0f} MB geladen).[/yellow]")
+        if hasher is None:
+            # Segmente kommen nicht in Dateireihenfolge an, daher Prüfsumme nach dem Zusammensetzen
+            hasher = hash_file(temp_filepath)
         
         # Download erfolgreich, Datei umbenennen (replace überschreibt atomisch)
         temp_filepath.replace(filepath)
-        console.print(f"[green]Download abgeschlossen![/green]")
+        remove_resume_state(temp_filepath)
+        record_file(filepath, size, hasher.hexdigest(), part_key)
+        record.bytes = size - resumed
+        console.print("[green]Download abgeschlossen![/green]")
         return True
         
     except KeyboardInterrupt:
-        console.print(f"\n[yellow]Download abgebrochen.[/yellow]")
-        # Lösche unvollständige temp Datei
-        if temp_filepath.exists():
-            temp_filepath.unlink()
+        console.print("\n[yellow]Download abgebrochen.[/yellow]")
+        # Unvollständige temp Datei behalten, falls fortsetzbar, sonst löschen
+        _keep_or_remove_partial(temp_filepath)
         raise  # Re-raise um das Programm zu beenden
     except requests.exceptions.RequestException as e:
+        if retry and is_transient(e):
+            # temp Datei bleibt für den nächsten Versuch erhalten
+            raise RetryableError() from e
         console.print(f"[bold red]Netzwerk-Fehler beim Download:[/bold red] {e}")
-        if temp_filepath.exists():
-            temp_filepath.unlink()
+        record.error = str(e)
+        _keep_or_remove_partial(temp_filepath)
         return False
     except IOError as e:
+        if retry and is_transient(e):
+            raise RetryableError() from e
         console.print(f"[bold red]Dateisystem-Fehler:[/bold red] {e}")
-        if temp_filepath.exists():
-            temp_filepath.unlink()
+        record.error = str(e)
+        _keep_or_remove_partial(temp_filepath)
+        return False
+    except Exception as e:
+        console.print(f"[bold red]Download Fehler:[/bold red] {e}")
+        record.error = str(e)
+        _keep_or_remove_partial(temp_filepath)
+        return False
+    finally:
+        # In einer gemeinsamen Anzeige nur die Zeilen aktiver Dateien stehen lassen
+        if shared_progress and task is not None:
+            progress.remove_task(task)
+
+
+def stream_to_remote(download_url: str, remote_dir: str, filename: str,
+                     expected_size: Optional[int] = None, progress=None) -> bool:
+    """
+    Lädt eine Datei und leitet sie direkt per 'rclone rcat' auf ein rclone remote.
+
+    Die Datei wird lokal nicht zwischengespeichert. Ein abgebrochener Download kann daher
+    nicht fortgesetzt werden; rclone wird dann beendet, bevor es den Upload abschließt.
+
+    Args:
+        download_url: Die URL der Datei
+        remote_dir: Das Zielverzeichnis auf dem remote
+        filename: Der Dateiname
+        expected_size: Die erwartete Dateigröße laut Plex
+        progress: Optionale gemeinsame Fortschrittsanzeige
+
+    Returns:
+        True wenn Download und Upload erfolgreich waren, False sonst
+    """
+    destination = f"{remote_dir.rstrip('/')}/{filename}"
+    console.print(f"Starte Download: [bold cyan]{filename}[/bold cyan]")
+    console.print(f"Ziel: {destination}")
+
+    with phase("download", file=filename, mode="direct") as record:
+        record.ok = _with_retries(
+            lambda retry: _stream_to_remote(download_url, destination, filename, expected_size, progress,
+                                            record, retry),
+            filename, record,
+        )
+        return record.ok
+
+
+def _stream_to_remote(download_url: str, destination: str, filename: str, expected_size: Optional[int],
+                      progress, record: PhaseRecord, retry: bool) -> bool:
+    """
+    Ein Versuch von stream_to_remote(). Trägt Time-to-first-Byte, Bytes und Fehler in record ein.
+
+    Ist retry True, wird bei vorübergehenden Fehlern RetryableError geworfen. Der Upload wird
+    vorher abgebrochen; der nächste Versuch beginnt von vorn.
+    """
+    shared_progress = progress is not None
+    task = None
+    process = None
+    # stderr in eine Datei, damit rclone nicht an einer vollen Pipe hängen bleibt
+    errors = tempfile.TemporaryFile("w+")
+    try:
+        with get_session().get(download_url, stream=True, timeout=timeouts()) as response:
+            record.ttfb = response.elapsed.total_seconds()
+            response.raise_for_status()
+            total_size = expected_size or int(response.headers.get('content-length', 0))
+            command = ["rclone", "rcat", destination]
+            if total_size:
+                command[2:2] = ["--size", str(total_size)]
+            process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                       stderr=errors, bufsize=0)
+
+            progress_context, description = _progress_context(progress, filename)
+            with progress_context as progress:
+                task = progress.add_task(description, total=total_size or None)
+
+                try:
+                    with watch(response) as guard:
+                        def on_read(size: int) -> None:
+                            _check_cancelled()
+                            progress.update(task, advance=size)
+                            guard.update(size)
+                            with guard.paused():
+                                throttle(size)
+
+                        size = _stream(response, process.stdin, on_read, None)
+                except OSError as e:
+                    if process.poll() is None:
+                        raise
+                    # rclone hat sich beendet und die Pipe geschlossen
+                    errors.seek(0)
+                    raise IOError(f"rclone rcat abgebrochen: {errors.read().strip() or e}") from e
+
+        if expected_size and size != expected_size:
+            raise IncompleteTransferError(f"Download unvollständig: {size} von {expected_size} Bytes")
+        process.stdin.close()
+        if process.wait() != 0:
+            errors.seek(0)
+            raise IOError(f"rclone rcat fehlgeschlagen: {errors.read().strip()}")
+        record.bytes = size
+        console.print("[green]Download abgeschlossen![/green]")
+        return True
+
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Download abgebrochen.[/yellow]")
+        _abort_upload(process)
+        raise
+    except requests.exceptions.RequestException as e:
+        _abort_upload(process)
+        if retry and is_transient(e):
+            raise RetryableError() from e
+        console.print(f"[bold red]Netzwerk-Fehler beim Download:[/bold red] {e}")
+        record.error = str(e)
+        return False
+    except IOError as e:
+        _abort_upload(process)
+        if retry and is_transient(e):
+            raise RetryableError() from e
+        console.print(f"[bold red]Upload-Fehler:[/bold red] {e}")
+        record.error = str(e)
         return False
     except Exception as e:
         console.print(f"[bold red]Download Fehler:[/bold red] {e}")
-        if temp_filepath.exists():
-            temp_filepath.unlink()
+        record.error = str(e)
+        _abort_upload(process)
+        return False
+    finally:
+        errors.close()
+        if shared_progress and task is not None:
+            progress.remove_task(task)
+
+
+def _abort_upload(process: Optional[subprocess.Popen]) -> None:
+    """Beendet einen laufenden 'rclone rcat', ohne den Upload abzuschließen."""
+    if process is None or process.poll() is not None:
+        return
+    process.kill()
+    process.wait()
+
+
+def _is_remote_path(path: Union[str, Path]) -> bool:
+    """Prüft ob es sich um einen rclone remote path handelt (enthält ":")."""
+    return isinstance(path, str) and ":" in path
+
+
+def _use_direct(destination: Union[str, Path]) -> bool:
+    """Prüft, ob direkt ins Zielverzeichnis geladen werden soll (direct_to_destination)."""
+    if not _settings["direct_to_destination"]:
         return False
+    if _is_remote_path(destination) and shutil.which("rclone") is None:
+        console.print("[yellow]rclone nicht gefunden, lade über das Download-Verzeichnis.[/yellow]")
+        return False
+    return True
+
+
+def _download_direct(download_url: Union[str, Callable[[], str]], destination: Union[str, Path], filename: str,
+                     options: dict, progress) -> bool:
+    """
+    Lädt eine Datei ohne Umweg über das Download-Verzeichnis ins Zielverzeichnis.
+
+    rclone remotes erhalten den Datenstrom über 'rclone rcat'. Lokale Ziele werden wie
+    sonst über eine temp Datei im Zielverzeichnis geladen und atomisch umbenannt.
+
+    Args:
+        options: Weitere Argumente für download_file() (part_key, expected_size, segments, details)
+    """
+    if _is_remote_path(destination):
+        return stream_to_remote(download_url, destination, filename, options.get("expected_size"), progress=progress)
+    destination = Path(destination)
+    destination.mkdir(parents=True, exist_ok=True)
+    return download_file(download_url, destination / filename, destination / f"{filename}.temp", filename,
+                         progress=progress, **options)
+
+
+def _download_staged(download_url: Union[str, Callable[[], str]], download_dir: Path, filename: str, options: dict,
+                     reserve_size: int, progress, mover) -> tuple:
+    """
+    Lädt eine Datei in das Staging-Verzeichnis mit genug freiem Platz (siehe StagingArea.reserve).
+
+    Args:
+        options: Weitere Argumente für download_file() (part_key, expected_size, segments, details)
+        reserve_size: Der zu reservierende Platz (bei transkodierten Downloads geschätzt)
+
+    Returns:
+        Tuple (erfolgreich, Pfad der fertigen Datei)
+    """
+    pending_moves = mover.pending if mover is not None else None
+    try:
+        with _settings["staging"].reserve(download_dir, filename, reserve_size, pending_moves) as target_dir:
+            target_dir.mkdir(parents=True, exist_ok=True)
+            filepath = target_dir / filename
+            success = download_file(download_url, filepath, target_dir / f"{filename}.temp", filename,
+                                    progress=progress, **options)
+            return success, filepath
+    except InsufficientSpaceError as e:
+        console.print(f"[bold red]Dateisystem-Fehler:[/bold red] {e}")
+        return False, download_dir / filename
+
+
+def _part_suffix(number: int) -> str:
+    """Gibt den Namenszusatz eines Teils zurück: " - pt2" bei mehrteiligen Medien, sonst nichts."""
+    return f" - pt{number}" if number else ""
+
+
+def _container(part) -> str:
+    """Gibt die Dateiendung eines Teils zurück (bei transkodierten Downloads die des Transcoders)."""
+    return TRANSCODE_CONTAINER if transcoding() else part.container
 
 
-def download_video(video, plex, download_dir: Path, media_server_path: Optional[Union[str, Path]] = None) -> bool:
+def delivered_size(part) -> Optional[int]:
+    """
+    Gibt die Größe zurück, die eine bereits gelieferte Datei haben muss.
+
+    Bei transkodierten Downloads ist sie vorher nicht bekannt (None), dann zählt nur der Dateiname.
+    """
+    return None if transcoding() else getattr(part, 'size', None)
+
+
+def video_filename(video, part, number: int = 0) -> str:
+    """Gibt den bereinigten Dateinamen eines Films zurück: "Titel (Jahr).mkv" bzw. "Titel (Jahr) - pt1.mkv"."""
+    return sanitize_filename(f"{video.title} ({video.year}){_part_suffix(number)}.{_container(part)}")
+
+
+def episode_filename(episode, show, part, number: int = 0) -> str:
+    """Gibt den bereinigten Dateinamen einer Episode zurück: "ShowName - S01E01 - Episode Title.mkv"."""
+    episode_num = f"S{episode.seasonNumber:02d}E{episode.index:02d}"
+    return sanitize_filename(f"{show.title} - {episode_num} - {episode.title}{_part_suffix(number)}.{_container(part)}")
+
+
+def _numbered(parts: list) -> list:
+    """Nummeriert die Teile ab 1, wenn es mehrere sind (0 = einteilig, ohne Namenszusatz)."""
+    if len(parts) == 1:
+        return [(0, parts[0])]
+    return list(enumerate(parts, 1))
+
+
+def video_files(video) -> List[Tuple[str, object]]:
+    """Gibt (Dateiname, Teil) für alle zu ladenden Teile eines Films zurück (siehe select_media)."""
+    return [(video_filename(video, part, number), part) for number, part in _numbered(selected_parts(video))]
+
+
+def episode_files(episode, show) -> List[Tuple[str, object]]:
+    """Gibt (Dateiname, Teil) für alle zu ladenden Teile einer Episode zurück (siehe select_media)."""
+    return [(episode_filename(episode, show, part, number), part)
+            for number, part in _numbered(selected_parts(episode))]
+
+
+def _report_transcoded(filepath: Path, original_size: int) -> None:
+    """Zeigt die Größe eines transkodierten Downloads neben der Größe des Originals."""
+    size = filepath.stat().st_size
+    text = f"Transkodiert: {size / (1024 * 1024):.0f} MB"
+    if original_size:
+        text += f", Original {original_size / (1024 * 1024):.0f} MB ({100 * size / original_size:.0f} %)"
+    console.print(f"[cyan]{text}[/cyan]")
+
+
+def _download_part(plex, item, part, filename: str, download_dir: Path, destination: Optional[Union[str, Path]],
+                   progress, mover) -> bool:
+    """
+    Lädt einen Teil herunter und bringt ihn ins Zielverzeichnis auf dem Medienserver (falls angegeben).
+
+    Bei transkodierten Downloads liefert der Transcoder den Datenstrom. Er hat keine bekannte
+    Größe und keine Range-Unterstützung, wird also über eine Verbindung und ohne Fortsetzen
+    geladen; ein neuer Versuch beginnt von vorn, mit einer neuen Transcoder-Sitzung (die
+    vorige wird beendet). Ein vorzeitiges Ende erkennt nur der fehlende Abschluss-Chunk.
+
+    Returns:
+        True wenn der Download erfolgreich war, False sonst
+    """
+    original_size = int(getattr(part, 'size', 0) or 0)
+    transcoded = transcoding()
+    sessions = []
+    if transcoded:
+        def download_url() -> str:
+            # Jeder Versuch bekommt eine eigene Sitzung, die des vorigen Versuchs wird beendet
+            if sessions:
+                stop_transcode(plex, sessions[-1])
+            sessions.append(new_session())
+            return transcode_url(plex, item, part, sessions[-1])
+
+        options = {"segments": 1, "details": {"mode": "transcode", "original_bytes": original_size}}
+        reserve_size = estimated_size(part)
+    else:
+        # Download URL generieren (Direct Stream / Original)
+        download_url = plex.url(part.key) + f"?download=1&X-Plex-Token={plex._token}"
+        options = {"part_key": part.key, "expected_size": getattr(part, 'size', None)}
+        reserve_size = original_size
+
+    try:
+        # rclone rcat ohne --size puffert auf manchen remotes die ganze Datei, transkodiert daher immer über Staging
+        if destination and _use_direct(destination) and not (transcoded and _is_remote_path(destination)):
+            # Direkt ins Zielverzeichnis, jedes Byte wird nur einmal geschrieben
+            success = _download_direct(download_url, destination, filename, options, progress)
+            if success and transcoded:
+                _report_transcoded(Path(destination) / filename, original_size)
+            return success
+
+        success, filepath = _download_staged(download_url, download_dir, filename, options, reserve_size,
+                                             progress, mover)
+        if success and transcoded:
+            _report_transcoded(filepath, original_size)
+    finally:
+        if sessions:
+            stop_transcode(plex, sessions[-1])
+
+    if success and destination:
+        _deliver(filepath, destination, mover)
+    return success
+
+
+def _deliver(filepath: Path, destination: Union[str, Path], mover) -> None:
+    """Bringt eine fertige Datei ins Zielverzeichnis auf dem Medienserver."""
+    if mover is not None:
+        # Im Hintergrund verschieben, damit der nächste Download sofort starten kann
+        mover.submit(filepath, destination)
+        return
+    from plex_downloader.modules.rclone_mover import move_to_media_server
+    if not move_to_media_server(filepath, destination):
+        console.print(f"[yellow]Datei verbleibt im Download-Verzeichnis: {filepath}[/yellow]")
+
+
+def _confirm_overwrite(download_dir: Path, filename: str) -> bool:
+    """
+    Fragt nach, ob eine bereits vorhandene Datei überschrieben werden soll.
+
+    Returns:
+        True wenn geladen werden soll (auch wenn es die Datei noch nicht gibt), False wenn abgelehnt
+    """
+    if local_file(download_dir, filename) is None:
+        return True
+    if Confirm.ask(f"[yellow]Datei existiert bereits: {filename}. Überschreiben?[/yellow]"):
+        return True
+    console.print("[yellow]Download übersprungen.[/yellow]")
+    return False
+
+
+def _keep_existing(filename: str, part, download_dir: Path, destination: Optional[Union[str, Path]],
+                   skip_existing_check: bool, delivered: Optional[DestinationIndex], mover) -> bool:
+    """
+    Prüft, ob ein Teil schon vorhanden ist und behalten wird, statt ihn erneut zu laden.
+
+    Ein Teil, der laut delivered schon auf dem Medienserver liegt, wird übersprungen. Eine
+    lokale Datei wird nur im Batch-Modus behalten (interaktiv entscheidet _confirm_overwrite)
+    und wie ein neuer Download ins Zielverzeichnis gebracht.
+
+    Returns:
+        True wenn der Teil behalten wird, False wenn er geladen werden soll
+    """
+    if delivered is not None and delivered.contains(filename, delivered_size(part)):
+        console.print(f"[yellow]Bereits auf dem Medienserver, überspringe: {filename}[/yellow]")
+        return True
+    if not skip_existing_check:
+        return False
+    filepath = local_file(download_dir, filename)
+    if filepath is None:
+        return False
+    # Im Batch-Modus sind ganz vorhandene Elemente schon ausgefiltert, hier fehlen nur einzelne Teile
+    if destination:
+        console.print(f"[yellow]Bereits geladen, bringe zum Medienserver: {filename}[/yellow]")
+        _deliver(filepath, destination, mover)
+    else:
+        console.print(f"[yellow]Bereits vorhanden, überspringe: {filename}[/yellow]")
+    return True
+
+
+def show_media_path(media_server_path: Union[str, Path], show) -> Union[str, Path]:
+    """
+    Gibt das Show-Verzeichnis auf dem Medienserver zurück.
+    
+    Für rclone remotes wird String-Konkatenation verwendet, für lokale Pfade Path-Objekte.
+    """
+    if _is_remote_path(media_server_path):
+        # rclone remote path
+        return f"{media_server_path}/{sanitize_filename(show.title)}"
+    # lokaler Pfad
+    return Path(media_server_path) / sanitize_filename(show.title)
+
+
+def download_video(video, plex, download_dir: Path, media_server_path: Optional[Union[str, Path]] = None,
+                   skip_existing_check: bool = False, progress=None, mover=None,
+                   delivered: Optional[DestinationIndex] = None) -> bool:
     """
     Lädt ein Video herunter.
     
+    Im Batch-Modus werden vorhandene Teile behalten (siehe _keep_existing), ein erneuter
+    Versuch lädt also nur die fehlenden Teile. Interaktiv bricht ein abgelehntes Überschreiben
+    den Download ab.
+    
     Args:
         video: Das Plex Video-Objekt
         plex: Die Plex Server-Verbindung
         download_dir: Das Zielverzeichnis
         media_server_path: Optionaler Pfad zum Medienserver für automatisches Verschieben (kann lokaler Pfad oder rclone remote sein)
+        skip_existing_check: Vorhandene Dateien ohne Rückfrage behalten (Batch-Modus, die Prüfung ist schon erfolgt)
+        progress: Optionale gemeinsame Fortschrittsanzeige
+        mover: Optionaler BackgroundMover; das Video wird dann im Hintergrund verschoben
+        delivered: Optionaler Index des Medienserver-Verzeichnisses; gelieferte Teile werden übersprungen
         
     Returns:
         True wenn der Download erfolgreich war, False sonst
     """
-    # Prüfen, ob Mediendatei vorhanden ist
-    if not video.media or not video.media[0].parts:
+    # Gewählte Version (siehe media_policy), mehrteilige Filme mit allen Teilen
+    files = video_files(video)
+    if not files:
         console.print(f"[red]Keine Mediendatei gefunden für {video.title}[/red]")
         return False
     
-    # Wir nehmen den ersten Teil (Part) der ersten Mediendatei (normalerweise der Hauptfilm)
-    part = video.media[0].parts[0]
-    
-    # Dateiname bereinigen und Pfad bauen
-    filename = f"{video.title} ({video.year}).{part.container}"
-    filename = sanitize_filename(filename)
-    filepath = download_dir / filename
-    temp_filepath = download_dir / f"{filename}.temp"
-    
-    # Prüfen, ob Datei bereits existiert
-    if filepath.exists():
-        if not Confirm.ask(f"[yellow]Datei existiert bereits: {filename}. Überschreiben?[/yellow]"):
-            console.print("[yellow]Download übersprungen.[/yellow]")
+    for filename, part in files:
+        if not skip_existing_check and not _confirm_overwrite(download_dir, filename):
             return False
-    
-    # Download URL generieren (Direct Stream / Original)
-    download_url = plex.url(part.key) + f"?download=1&X-Plex-Token={plex._token}"
-    
-    success = download_file(download_url, filepath, temp_filepath, filename)
-    if success:
-        console.print(f"[bold green]Download abgeschlossen![/bold green] 🎉")
-        
-        # Verschiebe zum Medienserver, falls konfiguriert
-        if media_server_path:
-            from plex_downloader.modules.rclone_mover import move_to_media_server
-            move_success = move_to_media_server(filepath, media_server_path)
-            if not move_success:
-                console.print(f"[yellow]Datei verbleibt im Download-Verzeichnis: {filepath}[/yellow]")
-    return success
+        if _keep_existing(filename, part, download_dir, media_server_path, skip_existing_check, delivered, mover):
+            continue
+        if not _download_part(plex, video, part, filename, download_dir, media_server_path, progress, mover):
+            return False
+    console.print("[bold green]Download abgeschlossen![/bold green] 🎉")
+    return True
 
 
-def download_episode(episode, show, plex, download_dir: Path, skip_existing_check: bool = False, media_server_path: Optional[Union[str, Path]] = None) -> bool:
+def download_episode(episode, show, plex, download_dir: Path, skip_existing_check: bool = False, media_server_path: Optional[Union[str, Path]] = None, progress=None, mover=None,
+                     delivered: Optional[DestinationIndex] = None) -> bool:
     """
     Lädt eine einzelne Episode herunter.
     
+    Im Batch-Modus werden vorhandene Teile behalten (siehe _keep_existing), ein erneuter Versuch
+    lädt nur die fehlenden. Interaktiv bricht ein abgelehntes Überschreiben den Download ab.
+    
     Args:
         episode: Das Plex Episode-Objekt
         show: Das Plex Show-Objekt
         plex: Die Plex Server-Verbindung
         download_dir: Das Zielverzeichnis
-        skip_existing_check: Ob die Prüfung auf existierende Dateien übersprungen werden soll
+        skip_existing_check: Vorhandene Dateien ohne Rückfrage behalten (Batch-Modus, die Prüfung ist schon erfolgt)
         media_server_path: Optionaler Pfad zum Medienserver für automatisches Verschieben (kann lokaler Pfad oder rclone remote sein)
+        progress: Optionale gemeinsame Fortschrittsanzeige für parallele Downloads
+        mover: Optionaler BackgroundMover; die Episode wird dann im Hintergrund verschoben
+        delivered: Optionaler Index des Show-Verzeichnisses auf dem Medienserver; gelieferte Teile werden übersprungen
         
     Returns:
         True wenn der Download erfolgreich war, False sonst
     """
-    # Hole die Mediendatei
-    if not episode.media or not episode.media[0].parts:
+    # Gewählte Version (siehe media_policy), Dateiname: "ShowName - S01E01 - Episode Title.mkv"
+    files = episode_files(episode, show)
+    if not files:
         console.print(f"[red]Keine Mediendatei gefunden für {episode.title}[/red]")
         return False
     
-    part = episode.media[0].parts[0]
-    
-    # Dateiname: "ShowName - S01E01 - Episode Title.mkv"
-    episode_num = f"S{episode.seasonNumber:02d}E{episode.index:02d}"
-    filename = f"{show.title} - {episode_num} - {episode.title}.{part.container}"
-    filename = sanitize_filename(filename)
-    
-    filepath = download_dir / filename
-    temp_filepath = download_dir / f"{filename}.temp"
-    
-    # Prüfen, ob Datei bereits existiert (nur wenn nicht schon im Batch-Modus übersprungen)
-    if not skip_existing_check and filepath.exists():
-        if not Confirm.ask(f"[yellow]Datei existiert bereits: {filename}. Überschreiben?[/yellow]"):
-            console.print("[yellow]Download übersprungen.[/yellow]")
+    # Direkt ins Show-Verzeichnis auf dem Medienserver bzw. nach dem Download dorthin verschieben
+    destination = show_media_path(media_server_path, show) if media_server_path else None
+    for filename, part in files:
+        if not skip_existing_check and not _confirm_overwrite(download_dir, filename):
             return False
-    
-    # Download URL generieren
-    download_url = plex.url(part.key) + f"?download=1&X-Plex-Token={plex._token}"
-    
-    success = download_file(download_url, filepath, temp_filepath, filename)
-    
-    # Verschiebe zum Medienserver, falls konfiguriert und Download erfolgreich
-    if success and media_server_path:
-        from plex_downloader.modules.rclone_mover import move_to_media_server
-        
-        # Erstelle Show-Verzeichnis auf Medienserver
-        # Für rclone remotes verwende String-Konkatenation, für lokale Pfade Path-Objekte
-        if isinstance(media_server_path, str) and ":" in media_server_path:
-            # rclone remote path
-            show_media_dir = f"{media_server_path}/{sanitize_filename(show.title)}"
-        else:
-            # lokaler Pfad
-            show_media_dir = Path(media_server_path) / sanitize_filename(show.title)
-        
-        move_success = move_to_media_server(filepath, show_media_dir)
-        if not move_success:
-            console.print(f"[yellow]Episode verbleibt im Download-Verzeichnis: {filepath}[/yellow]")
-    
-    return success
+        if _keep_existing(filename, part, download_dir, destination, skip_existing_check, delivered, mover):
+            continue
+        if not _download_part(plex, episode, part, filename, download_dir, destination, progress, mover):
+            return False
+    return True
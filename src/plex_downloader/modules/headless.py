@@ -0,0 +1,165 @@
+"""Maschinenlesbare Fortschrittsausgabe (JSON-Lines) für Läufe ohne Terminal, z.B. per cron."""
+
+import json
+import sys
+import threading
+import time as time_module
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+EMIT_INTERVAL = 1.0  # Höchstens ein Fortschritts-Ereignis pro Sekunde und Zeile
+PROGRESS_OUTPUTS = ("auto", "rich", "json")
+
+# Laufzeit-Einstellungen, werden über configure_output() aus der Konfiguration gesetzt
+_settings = {
+    "progress_output": PROGRESS_OUTPUTS[0],
+    "events": None,  # Stream für die JSON-Zeilen (das ursprüngliche stdout), None ohne JSON-Ausgabe
+}
+_write_lock = threading.Lock()
+
+
+def configure_output(config_data: dict) -> None:
+    """
+    Übernimmt die Art der Fortschrittsanzeige aus der Konfiguration.
+
+    Args:
+        config_data: Die geladene Konfiguration mit optional 'progress_output': 'auto' (JSON-Lines,
+            wenn stdout kein Terminal ist), 'rich' (immer Fortschrittsbalken) oder 'json'
+    """
+    progress_output = config_data.get("progress_output", PROGRESS_OUTPUTS[0])
+    if progress_output not in PROGRESS_OUTPUTS:
+        progress_output = PROGRESS_OUTPUTS[0]
+    _settings["progress_output"] = progress_output
+    if progress_output == "json" or (progress_output == "auto" and not sys.stdout.isatty()):
+        _reserve_stdout()
+
+
+def _reserve_stdout() -> None:
+    """
+    Reserviert stdout für die JSON-Zeilen und leitet alle anderen Ausgaben auf stderr um.
+
+    Die rich Consoles der Module schreiben ohne eigene Datei jeweils auf das aktuelle
+    sys.stdout, Statusmeldungen landen damit auf stderr und stdout bleibt maschinenlesbar.
+    """
+    if _settings["events"] is None:
+        _settings["events"] = sys.stdout
+        sys.stdout = sys.stderr
+
+
+def headless() -> bool:
+    """Gibt zurück, ob Fortschritt als JSON-Lines statt als Fortschrittsbalken ausgegeben wird."""
+    return _settings["events"] is not None
+
+
+def emit(event: str, **fields) -> None:
+    """Schreibt ein Ereignis als eine JSON-Zeile auf das für Ereignisse reservierte stdout."""
+    record = {"time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"), "event": event}
+    record.update(fields)
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    stream = _settings["events"] or sys.stdout
+    with _write_lock:
+        stream.write(line)
+        stream.flush()
+
+
+def _plain(description: str) -> str:
+    """Entfernt Rich-Markup aus einer Beschreibung, z.B. '[cyan]Datei.mkv' → 'Datei.mkv'."""
+    from rich.text import Text
+
+    return Text.from_markup(description).plain
+
+
+class _Task:
+    def __init__(self, name: str, kind: str, total: Optional[float], completed: float):
+        self.name = name
+        self.kind = kind
+        self.total = total
+        self.completed = completed
+        self.started = time_module.monotonic()
+        self.last_emit = self.started
+        self.last_completed = completed
+
+
+class HeadlessProgress:
+    """
+    Ersatz für rich.progress.Progress ohne Darstellung.
+
+    Bietet add_task(), update() und remove_task() wie Progress und schreibt stattdessen pro
+    Zeile ein 'start'-, höchstens einmal pro EMIT_INTERVAL ein 'progress'- und am Ende ein
+    'end'-Ereignis. Zusätzliche Felder wie kind='batch' werden wie bei Progress angenommen.
+    """
+
+    def __init__(self, *columns, **kwargs):
+        self._tasks: Dict[int, _Task] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "HeadlessProgress":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for task_id in list(self._tasks):
+            self.remove_task(task_id)
+
+    def add_task(self, description: str, total: Optional[float] = None, completed: float = 0,
+                 kind: str = "file", **fields) -> int:
+        with self._lock:
+            task_id = self._next_id
+            self._next_id += 1
+            task = self._tasks[task_id] = _Task(_plain(description), kind, total, completed)
+        emit("start", task=task.name, kind=task.kind, completed=completed, total=total)
+        return task_id
+
+    def update(self, task_id: int, advance: float = 0, completed: Optional[float] = None,
+               total: Optional[float] = None, description: Optional[str] = None, **fields) -> None:
+        now = time_module.monotonic()
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return
+            if description is not None:
+                task.name = _plain(description)
+            if total is not None:
+                task.total = total
+            task.completed = completed if completed is not None else task.completed + advance
+            if now - task.last_emit < EMIT_INTERVAL:
+                return
+            rate = (task.completed - task.last_completed) / (now - task.last_emit)
+            task.last_emit = now
+            task.last_completed = task.completed
+            payload = self._fields(task)
+        payload["rate"] = round(rate)
+        if task.total and rate > 0:
+            payload["eta"] = round((task.total - task.completed) / rate)
+        emit("progress", **payload)
+
+    def remove_task(self, task_id: int) -> None:
+        with self._lock:
+            task = self._tasks.pop(task_id, None)
+            if task is None:
+                return
+            payload = self._fields(task)
+        payload["elapsed"] = round(time_module.monotonic() - task.started, 1)
+        emit("end", **payload)
+
+    @staticmethod
+    def _fields(task: _Task) -> dict:
+        fields = {"task": task.name, "kind": task.kind, "completed": task.completed, "total": task.total}
+        if task.total:
+            fields["percent"] = round(100 * task.completed / task.total, 1)
+        return fields
+
+
+def progress_display(*columns, **kwargs):
+    """
+    Gibt eine Fortschrittsanzeige zurück: rich Progress mit den Spalten oder HeadlessProgress.
+
+    Args:
+        columns: Die Spalten für rich.progress.Progress
+        kwargs: Weitere Argumente für rich.progress.Progress
+    """
+    if headless():
+        return HeadlessProgress(*columns, **kwargs)
+    from rich.progress import Progress
+
+    return Progress(*columns, **kwargs)
@@ -0,0 +1,140 @@
+"""Gemeinsame HTTP-Session mit Connection-Pooling für alle Transfers."""
+
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from rich.console import Console
+
+console = Console()
+
+DEFAULT_POOL_SIZE = 10
+
+
+class ConnectionStats:
+    """Zählt HTTP-Requests und neu aufgebaute Verbindungen (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.new_connections += 1
+
+    @property
+    def reused_connections(self) -> int:
+        return max(0, self.requests - self.new_connections)
+
+
+connection_stats = ConnectionStats()
+
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        connection_stats.record_connect()
+        super().connect()
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        connection_stats.record_connect()
+        super().connect()
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter mit größerem Pool, der neue und wiederverwendete Verbindungen zählt."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        connection_stats.record_request()
+        return super().send(request, **kwargs)
+
+
+# Die Session wird beim ersten Zugriff erstellt oder von der Plex-Verbindung übernommen
+_state = {
+    "session": None,
+    "pool_size": DEFAULT_POOL_SIZE,
+}
+_lock = threading.Lock()
+
+
+def _mount(session: requests.Session) -> None:
+    """Hängt den gepoolten Adapter für http und https an eine Session."""
+    adapter = PooledAdapter(pool_connections=_state["pool_size"], pool_maxsize=_state["pool_size"])
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
+def configure_session(pool_size: int) -> None:
+    """
+    Legt die Poolgröße fest (gleichzeitige Verbindungen pro Host).
+
+    Args:
+        pool_size: Anzahl Verbindungen, die pro Host offen gehalten werden
+    """
+    with _lock:
+        _state["pool_size"] = max(DEFAULT_POOL_SIZE, pool_size)
+        if _state["session"] is not None:
+            _mount(_state["session"])
+
+
+def get_session() -> requests.Session:
+    """Gibt die gemeinsame Session für alle Requests dieses Laufs zurück."""
+    with _lock:
+        if _state["session"] is None:
+            session = requests.Session()
+            _mount(session)
+            _state["session"] = session
+        return _state["session"]
+
+
+def share_session(plex) -> None:
+    """
+    Übernimmt die Session einer Plex-Verbindung als gemeinsame Session.
+
+    Damit nutzen Metadaten-Abfragen von plexapi und die Downloads denselben Verbindungspool.
+
+    Args:
+        plex: Die Plex Server-Verbindung
+    """
+    session: Optional[requests.Session] = getattr(plex, "_session", None)
+    if session is None:
+        return
+    with _lock:
+        if session is not _state["session"]:
+            _mount(session)
+            _state["session"] = session
+
+
+def report_connection_stats() -> None:
+    """Gibt aus, wie viele Verbindungen neu aufgebaut und wie viele wiederverwendet wurden."""
+    if not connection_stats.requests:
+        return
+    console.print(
+        f"[dim]HTTP: {connection_stats.requests} Request(s), "
+        f"{connection_stats.new_connections} neue Verbindung(en), "
+        f"{connection_stats.reused_connections} wiederverwendet[/dim]"
+    )
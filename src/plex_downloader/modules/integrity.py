@@ -0,0 +1,182 @@
+"""Prüfsummen fertiger Downloads und Manifest pro Verzeichnis."""
+
+import hashlib
+import json
+import os
+import threading
+import time as time_module
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+HASH_ALGORITHM = "sha256"
+MANIFEST_NAME = ".plex-dl-manifest.json"
+READ_CHUNK_SIZE = 4 * 1024 * 1024
+DEFAULT_VERIFY_WORKERS = 4
+
+# Ergebnisse von verify_tree()
+STATUS_OK = "ok"
+STATUS_MISSING = "fehlt"
+STATUS_SIZE_MISMATCH = "falsche Größe"
+STATUS_HASH_MISMATCH = "falsche Prüfsumme"
+
+# Parallele Downloads können gleichzeitig in dasselbe Manifest schreiben
+_manifest_lock = threading.Lock()
+
+
+def new_hasher():
+    """Gibt ein neues Hash-Objekt für Prüfsummen zurück."""
+    return hashlib.new(HASH_ALGORITHM)
+
+
+def hash_file(path: Path, limit: Optional[int] = None, hasher=None):
+    """
+    Liest eine Datei (oder ihre ersten limit Bytes) in das Hash-Objekt ein.
+
+    Args:
+        path: Die zu lesende Datei
+        limit: Optional nur die ersten limit Bytes lesen (z.B. bereits geladener Teil beim Fortsetzen)
+        hasher: Optional ein bestehendes Hash-Objekt, sonst wird ein neues erstellt
+
+    Returns:
+        Das Hash-Objekt
+    """
+    if hasher is None:
+        hasher = new_hasher()
+    remaining = limit
+    with open(path, "rb") as file:
+        while remaining is None or remaining > 0:
+            size = READ_CHUNK_SIZE if remaining is None else min(READ_CHUNK_SIZE, remaining)
+            data = file.read(size)
+            if not data:
+                break
+            hasher.update(data)
+            if remaining is not None:
+                remaining -= len(data)
+    return hasher
+
+
+def manifest_path(directory: Path) -> Path:
+    """Gibt den Pfad des Manifests in einem Verzeichnis zurück."""
+    return Path(directory) / MANIFEST_NAME
+
+
+def load_manifest(directory: Path) -> dict:
+    """Lädt die Manifest-Einträge eines Verzeichnisses (Dateiname → Eintrag)."""
+    path = manifest_path(directory)
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    files = data.get("files") if isinstance(data, dict) else None
+    return files if isinstance(files, dict) else {}
+
+
+def _save_manifest(directory: Path, files: dict) -> None:
+    """Speichert das Manifest atomisch. Muss mit _manifest_lock aufgerufen werden."""
+    path = manifest_path(directory)
+    if not files:
+        if path.exists():
+            path.unlink()
+        return
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"algorithm": HASH_ALGORITHM, "files": files}, f, indent=2, sort_keys=True)
+    tmp_path.replace(path)
+
+
+def record_file(filepath: Path, size: int, digest: str, part_key: Optional[str] = None) -> None:
+    """
+    Trägt eine fertig geladene Datei mit Größe und Prüfsumme ins Manifest ihres Verzeichnisses ein.
+
+    Args:
+        filepath: Die fertige Datei
+        size: Die Dateigröße in Bytes
+        digest: Die Prüfsumme als Hex-String
+        part_key: Optional der Plex Part-Key der Quelldatei
+    """
+    entry = {"size": size, HASH_ALGORITHM: digest, "recorded_at": int(time_module.time())}
+    if part_key:
+        entry["part_key"] = part_key
+    with _manifest_lock:
+        files = load_manifest(filepath.parent)
+        files[filepath.name] = entry
+        _save_manifest(filepath.parent, files)
+
+
+def move_manifest_entry(source_path: Path, dest_dir: Optional[Path]) -> None:
+    """
+    Übernimmt den Manifest-Eintrag einer verschobenen Datei.
+
+    Der Eintrag wird aus dem Quellverzeichnis entfernt und, bei lokalen Zielen, in das
+    Manifest des Zielverzeichnisses geschrieben. Bei rclone remotes prüft rclone selbst.
+
+    Args:
+        source_path: Der ursprüngliche Pfad der Datei
+        dest_dir: Das lokale Zielverzeichnis oder None für remote Ziele
+    """
+    with _manifest_lock:
+        files = load_manifest(source_path.parent)
+        entry = files.pop(source_path.name, None)
+        if entry is None:
+            return
+        _save_manifest(source_path.parent, files)
+        if dest_dir is not None:
+            dest_files = load_manifest(dest_dir)
+            dest_files[source_path.name] = entry
+            _save_manifest(dest_dir, dest_files)
+
+
+def _verify_entry(filepath: Path, entry: dict) -> Tuple[Path, str]:
+    """Prüft eine Datei gegen ihren Manifest-Eintrag."""
+    try:
+        size = filepath.stat().st_size
+    except FileNotFoundError:
+        return filepath, STATUS_MISSING
+    if entry.get("size") is not None and size != entry["size"]:
+        return filepath, STATUS_SIZE_MISMATCH
+    expected = entry.get(HASH_ALGORITHM)
+    if expected and hash_file(filepath).hexdigest() != expected:
+        return filepath, STATUS_HASH_MISMATCH
+    return filepath, STATUS_OK
+
+
+def verify_tree(root: Path, workers: int = DEFAULT_VERIFY_WORKERS, on_result=None) -> List[Tuple[Path, str]]:
+    """
+    Prüft alle Dateien aus den Manifesten unterhalb eines Verzeichnisses parallel.
+
+    Args:
+        root: Das Wurzelverzeichnis
+        workers: Anzahl gleichzeitig geprüfter Dateien
+        on_result: Optionaler Callback(pfad, status, größe) nach jeder geprüften Datei
+
+    Returns:
+        Liste (Pfad, Status) für alle Dateien aus den Manifesten
+    """
+    jobs = []
+    for directory, _, filenames in os.walk(root):
+        if MANIFEST_NAME not in filenames:
+            continue
+        for name, entry in load_manifest(Path(directory)).items():
+            jobs.append((Path(directory) / name, entry))
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(_verify_entry, filepath, entry): entry for filepath, entry in jobs}
+        for future in as_completed(futures):
+            entry = futures[future]
+            filepath, status = future.result()
+            results.append((filepath, status))
+            if on_result is not None:
+                on_result(filepath, status, entry.get("size") or 0)
+    return results
+
+
+def total_manifest_bytes(root: Path) -> int:
+    """Gibt die Gesamtgröße aller Dateien aus den Manifesten unterhalb eines Verzeichnisses zurück."""
+    total = 0
+    for directory, _, filenames in os.walk(root):
+        if MANIFEST_NAME in filenames:
+            total += sum(entry.get("size") or 0 for entry in load_manifest(Path(directory)).values())
+    return total
@@ -0,0 +1,503 @@
+"""Persistente Download-Warteschlange (SQLite) für unbeaufsichtigte Läufe."""
+
+import sqlite3
+import threading
+import time as time_module
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from rich.console import Console
+from rich.progress import SpinnerColumn, BarColumn, TextColumn, TransferSpeedColumn, TimeRemainingColumn
+
+from plex_downloader.modules.downloader import (
+    download_video, download_episode, sanitize_filename, video_files, episode_files, show_media_path,
+    delivered_size, local_file,
+)
+from plex_downloader.modules.destination_index import DestinationIndex, build_destination_index
+from plex_downloader.modules.headless import progress_display
+from plex_downloader.modules.metrics import phase
+from plex_downloader.modules.rclone_mover import BackgroundMover, report_move_failures
+
+console = Console()
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 60  # Sekunden, verdoppelt sich mit jedem Fehlversuch
+PROGRESS_SAVE_INTERVAL = 16 * 1024 * 1024  # Übertragene Bytes alle 16MB sichern
+MOVE_WAIT_INTERVAL = 1.0  # Sekunden zwischen zwei Prüfungen, solange Jobs auf ihre Verschiebung warten
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    rating_key INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    show_title TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    bytes_total INTEGER NOT NULL DEFAULT 0,
+    bytes_done INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    not_before REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, not_before);
+"""
+
+
+class JobQueue:
+    """
+    Download-Jobs in einer SQLite-Datenbank.
+
+    Jeder Statuswechsel wird sofort geschrieben. Jobs, die bei einem Absturz noch auf
+    'running' standen, werden beim nächsten Lauf über recover() wieder eingereiht.
+    """
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        """Führt eine schreibende Abfrage aus und gibt die Anzahl betroffener Zeilen zurück."""
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor.rowcount
+
+    def _fetch(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """Führt eine lesende Abfrage aus und gibt alle Zeilen zurück."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def add(self, kind: str, rating_key: int, title: str, show_title: Optional[str] = None,
+            bytes_total: int = 0, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> bool:
+        """
+        Fügt einen Job hinzu.
+
+        Args:
+            kind: 'movie' oder 'episode'
+            rating_key: Der Plex ratingKey des Elements
+            title: Anzeigename des Jobs
+            show_title: Titel der Serie bei Episoden
+            bytes_total: Erwartete Größe in Bytes
+            max_attempts: Anzahl Versuche, bevor der Job als fehlgeschlagen gilt
+
+        Returns:
+            False wenn das Element bereits wartet oder gerade geladen wird
+        """
+        existing = self._fetch(
+            "SELECT id FROM jobs WHERE rating_key = ? AND status IN (?, ?)",
+            (rating_key, STATUS_PENDING, STATUS_RUNNING),
+        )
+        if existing:
+            return False
+        now = time_module.time()
+        self._execute(
+            "INSERT INTO jobs (kind, rating_key, title, show_title, bytes_total, max_attempts, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (kind, rating_key, title, show_title, bytes_total, max_attempts, now, now),
+        )
+        return True
+
+    def add_many(self, jobs: List[dict], max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        """
+        Fügt viele Jobs in einer einzigen Transaktion hinzu.
+
+        Args:
+            jobs: Jobs mit 'kind', 'rating_key', 'title' und optional 'show_title' und 'bytes_total'
+            max_attempts: Anzahl Versuche, bevor ein Job als fehlgeschlagen gilt
+
+        Returns:
+            Anzahl hinzugefügter Jobs (ohne Elemente, die bereits warten oder gerade geladen werden)
+        """
+        now = time_module.time()
+        added = 0
+        with self._lock:
+            waiting = {
+                row[0] for row in self._conn.execute(
+                    "SELECT rating_key FROM jobs WHERE status IN (?, ?)", (STATUS_PENDING, STATUS_RUNNING)
+                )
+            }
+            for job in jobs:
+                rating_key = int(job["rating_key"])
+                if rating_key in waiting:
+                    continue
+                waiting.add(rating_key)
+                self._conn.execute(
+                    "INSERT INTO jobs (kind, rating_key, title, show_title, bytes_total, max_attempts, "
+                    "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job["kind"], rating_key, job["title"], job.get("show_title"), job.get("bytes_total", 0),
+                     max_attempts, now, now),
+                )
+                added += 1
+            self._conn.commit()
+        return added
+
+    def rating_keys(self, statuses: Tuple[str, ...] = (STATUS_PENDING, STATUS_RUNNING, STATUS_DONE)) -> set:
+        """Gibt die ratingKeys aller Jobs mit einem der Status zurück (eine Abfrage für viele Elemente)."""
+        placeholders = ", ".join("?" for _ in statuses)
+        rows = self._fetch(f"SELECT DISTINCT rating_key FROM jobs WHERE status IN ({placeholders})", statuses)
+        return {row["rating_key"] for row in rows}
+
+    def recover(self) -> int:
+        """Setzt nach einem Absturz hängengebliebene Jobs zurück auf 'pending'."""
+        return self._execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?",
+            (STATUS_PENDING, time_module.time(), STATUS_RUNNING),
+        )
+
+    def claim_next(self) -> Optional[sqlite3.Row]:
+        """Holt den nächsten fälligen Job und markiert ihn als 'running'."""
+        now = time_module.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? AND not_before <= ? ORDER BY id LIMIT 1",
+                (STATUS_PENDING, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (STATUS_RUNNING, now, row["id"]),
+            )
+            self._conn.commit()
+        return row
+
+    def next_retry_at(self) -> Optional[float]:
+        """Gibt den Zeitpunkt zurück, an dem der nächste wartende Job fällig wird."""
+        rows = self._fetch("SELECT MIN(not_before) AS due FROM jobs WHERE status = ?", (STATUS_PENDING,))
+        return rows[0]["due"] if rows else None
+
+    def update_bytes(self, job_id: int, bytes_done: int) -> None:
+        self._execute(
+            "UPDATE jobs SET bytes_done = ?, updated_at = ? WHERE id = ?",
+            (bytes_done, time_module.time(), job_id),
+        )
+
+    def mark_done(self, job_id: int) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, error = NULL, bytes_done = MAX(bytes_done, bytes_total), updated_at = ? "
+            "WHERE id = ?",
+            (STATUS_DONE, time_module.time(), job_id),
+        )
+
+    def release(self, job_id: int) -> None:
+        """Gibt einen abgebrochenen Job zurück in die Warteschlange, ohne den Versuch zu zählen."""
+        self._execute(
+            "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), updated_at = ? WHERE id = ?",
+            (STATUS_PENDING, time_module.time(), job_id),
+        )
+
+    def mark_failed(self, job_id: int, error: str) -> bool:
+        """
+        Verbucht einen Fehlversuch.
+
+        Returns:
+            True wenn der Job später erneut versucht wird, False wenn er endgültig fehlgeschlagen ist
+        """
+        row = self._fetch("SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,))[0]
+        now = time_module.time()
+        if row["attempts"] < row["max_attempts"]:
+            delay = RETRY_BASE_DELAY * 2 ** (row["attempts"] - 1)
+            self._execute(
+                "UPDATE jobs SET status = ?, error = ?, not_before = ?, updated_at = ? WHERE id = ?",
+                (STATUS_PENDING, error, now + delay, now, job_id),
+            )
+            return True
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+            (STATUS_FAILED, error, now, job_id),
+        )
+        return False
+
+    def retry_failed(self) -> int:
+        """Stellt alle endgültig fehlgeschlagenen Jobs wieder in die Warteschlange."""
+        return self._execute(
+            "UPDATE jobs SET status = ?, attempts = 0, not_before = 0, updated_at = ? WHERE status = ?",
+            (STATUS_PENDING, time_module.time(), STATUS_FAILED),
+        )
+
+    def clear(self, status: str) -> int:
+        """Entfernt alle Jobs mit dem angegebenen Status."""
+        return self._execute("DELETE FROM jobs WHERE status = ?", (status,))
+
+    def jobs(self, status: Optional[str] = None) -> List[sqlite3.Row]:
+        if status:
+            return self._fetch("SELECT * FROM jobs WHERE status = ? ORDER BY id", (status,))
+        return self._fetch("SELECT * FROM jobs ORDER BY id")
+
+
+class JobProgress:
+    """
+    Fortschrittsanzeige für einen Queue-Job, die die übertragenen Bytes in der Datenbank mitschreibt.
+
+    Wird als progress an download_video()/download_episode() übergeben.
+    """
+
+    def __init__(self, progress, job_queue: JobQueue, job_id: int):
+        self.progress = progress
+        self.job_queue = job_queue
+        self.job_id = job_id
+        self._lock = threading.Lock()
+        self._bytes_done = 0
+        self._unsaved = 0
+
+    def add_task(self, description: str, total: Optional[int] = None, completed: int = 0):
+        with self._lock:
+            self._bytes_done = completed
+        self.job_queue.update_bytes(self.job_id, completed)
+        return self.progress.add_task(description, total=total, completed=completed)
+
+    def update(self, task, advance: int = 0) -> None:
+        self.progress.update(task, advance=advance)
+        with self._lock:
+            self._bytes_done += advance
+            self._unsaved += advance
+            if self._unsaved < PROGRESS_SAVE_INTERVAL:
+                return
+            self._unsaved = 0
+            bytes_done = self._bytes_done
+        self.job_queue.update_bytes(self.job_id, bytes_done)
+
+    def remove_task(self, task) -> None:
+        self.progress.remove_task(task)
+        self.job_queue.update_bytes(self.job_id, self._bytes_done)
+
+
+class JobMoves:
+    """
+    Übergibt die fertigen Dateien eines Jobs an den BackgroundMover und meldet, ob alle verschoben wurden.
+
+    Wird als mover an download_video()/download_episode() übergeben. Nach dem Download ruft
+    close() on_finished auf, sobald die letzte Datei des Jobs verschoben ist (sofort, wenn
+    keine mehr aussteht). Ohne close() (Download fehlgeschlagen) wird on_finished nie aufgerufen.
+    """
+
+    def __init__(self, mover: BackgroundMover, on_finished: Callable[[bool], None]):
+        self.mover = mover
+        self._on_finished = on_finished
+        self._lock = threading.Lock()
+        self._open = 0
+        self._failed = False
+        self._closed = False
+
+    def submit(self, source_path: Path, media_server_path: Union[str, Path]) -> None:
+        with self._lock:
+            self._open += 1
+        self.mover.submit(source_path, media_server_path, on_done=self._moved)
+
+    def pending(self) -> int:
+        return self.mover.pending()
+
+    def _moved(self, success: bool) -> None:
+        with self._lock:
+            self._open -= 1
+            self._failed = self._failed or not success
+            finished = self._closed and not self._open
+        if finished:
+            self._on_finished(not self._failed)
+
+    def close(self) -> None:
+        """Meldet, dass der Job keine weiteren Dateien mehr übergibt."""
+        with self._lock:
+            self._closed = True
+            finished = not self._open
+        if finished:
+            self._on_finished(not self._failed)
+
+
+def _run_job(job: sqlite3.Row, job_queue: JobQueue, plex, download_dir: Path,
+             media_server_path: Optional[Union[str, Path]], delivered: Dict[str, DestinationIndex],
+             mover: Optional[JobMoves] = None) -> bool:
+    """
+    Lädt das Element eines Jobs herunter.
+
+    Bereits vorhandene Dateien (lokal oder auf dem Medienserver) werden nicht erneut geladen,
+    auch einzelne Teile mehrteiliger Filme. Lokal vorhandene Dateien, die auf dem Medienserver
+    fehlen, werden dorthin gebracht. Jedes Zielverzeichnis auf dem Medienserver wird pro Lauf
+    nur einmal gelistet (Cache in delivered).
+    Fertige Dateien werden über den mover gebündelt zum Medienserver verschoben.
+    """
+    item = plex.fetchItem(job["rating_key"])
+
+    if job["kind"] == "movie":
+        target_dir = download_dir
+        files = video_files(item)
+    else:
+        show = item.show()
+        target_dir = download_dir / sanitize_filename(show.title)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        files = episode_files(item, show)
+    if not files:
+        raise ValueError(f"Keine Mediendatei gefunden für {item.title}")
+    names = ", ".join(filename for filename, _ in files)
+
+    if not media_server_path and all(local_file(target_dir, filename) for filename, _ in files):
+        console.print(f"[yellow]Bereits vorhanden, überspringe: {names}[/yellow]")
+        return True
+
+    index = None
+    if media_server_path:
+        # Filme liegen direkt im Medienserver-Verzeichnis, Episoden im Show-Verzeichnis
+        is_movie = job["kind"] == "movie"
+        destination = media_server_path if is_movie else show_media_path(media_server_path, show)
+        if str(destination) not in delivered:
+            delivered[str(destination)] = build_destination_index(destination, recursive=not is_movie)
+        index = delivered[str(destination)]
+        if all(index.contains(filename, delivered_size(part)) for filename, part in files):
+            console.print(f"[yellow]Bereits auf dem Medienserver, überspringe: {names}[/yellow]")
+            return True
+
+    with progress_display(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TransferSpeedColumn(),
+        TimeRemainingColumn(),
+    ) as progress:
+        job_progress = JobProgress(progress, job_queue, job["id"])
+        if job["kind"] == "movie":
+            return download_video(item, plex, target_dir, media_server_path,
+                                  skip_existing_check=True, progress=job_progress, mover=mover, delivered=index)
+        return download_episode(item, show, plex, target_dir, skip_existing_check=True,
+                                media_server_path=media_server_path, progress=job_progress, mover=mover,
+                                delivered=index)
+
+
+def run_queue(job_queue: JobQueue, plex, download_dir: Path,
+              media_server_path: Optional[Union[str, Path]] = None) -> Tuple[int, int]:
+    """
+    Arbeitet die Warteschlange ab, bis keine wartenden Jobs mehr übrig sind.
+
+    Fehlgeschlagene Jobs werden mit exponentiell wachsender Wartezeit erneut versucht.
+    Bei Ctrl+C geht der laufende Job zurück in die Warteschlange. Fertige Dateien werden
+    im Hintergrund gebündelt verschoben, am Ende wird auf alle Verschiebungen gewartet.
+
+    Args:
+        job_queue: Die Warteschlange
+        plex: Die Plex Server-Verbindung
+        download_dir: Das Download-Verzeichnis
+        media_server_path: Optionaler Pfad zum Medienserver für automatisches Verschieben
+
+    Returns:
+        Tuple (erledigt, endgültig fehlgeschlagen)
+    """
+    recovered = job_queue.recover()
+    if recovered:
+        console.print(f"[yellow]{recovered} unterbrochene(r) Job(s) wieder in die Warteschlange gestellt.[/yellow]")
+
+    mover = BackgroundMover() if media_server_path else None
+    try:
+        done_count, failed_count = _process_jobs(job_queue, plex, download_dir, media_server_path, mover)
+    except BaseException:
+        if mover is not None:
+            mover.stop()
+        raise
+
+    if mover is not None:
+        if mover.pending():
+            with console.status(f"[cyan]Warte auf {mover.pending()} ausstehende Verschiebung(en) zum Medienserver..."):
+                failures = mover.drain()
+        else:
+            failures = mover.drain()
+        report_move_failures(failures)
+
+    return done_count, failed_count
+
+
+def _finish_job(job_queue: JobQueue, job: sqlite3.Row, success: bool, error: Optional[str],
+                delivered: Dict[str, DestinationIndex], counts: dict) -> None:
+    """Verbucht das Ergebnis eines Jobs (auch aus dem Mover-Thread, sobald seine Dateien verschoben sind)."""
+    if success:
+        job_queue.mark_done(job["id"])
+        with counts["lock"]:
+            counts["done"] += 1
+        return
+    # Teile dieses Versuchs sind evtl. schon geliefert, vor dem nächsten Versuch neu listen
+    delivered.clear()
+    if job_queue.mark_failed(job["id"], error):
+        console.print(f"[yellow]Job wird später erneut versucht: {job['title']}[/yellow]")
+    else:
+        console.print(f"[red]Job endgültig fehlgeschlagen: {job['title']}[/red]")
+        with counts["lock"]:
+            counts["failed"] += 1
+
+
+def _process_jobs(job_queue: JobQueue, plex, download_dir: Path, media_server_path: Optional[Union[str, Path]],
+                  mover: Optional[BackgroundMover]) -> Tuple[int, int]:
+    """
+    Holt Jobs aus der Warteschlange und lädt sie nacheinander herunter.
+
+    Mit Medienserver gilt ein Job erst als erledigt, wenn alle seine Dateien verschoben sind.
+    Schlägt das Verschieben fehl, wird der Job wie ein fehlgeschlagener Download wiederholt.
+    """
+    counts = {"done": 0, "failed": 0, "moving": set(), "lock": threading.Lock()}
+    delivered: Dict[str, DestinationIndex] = {}
+
+    def on_moved(job: sqlite3.Row) -> Callable[[bool], None]:
+        def finished(success: bool) -> None:
+            with counts["lock"]:
+                counts["moving"].discard(job["id"])
+            _finish_job(job_queue, job, success, None if success else "Verschieben zum Medienserver fehlgeschlagen",
+                        delivered, counts)
+        return finished
+
+    while True:
+        job = job_queue.claim_next()
+        if job is None:
+            due = job_queue.next_retry_at()
+            if due is None:
+                with counts["lock"]:
+                    moving = len(counts["moving"])
+                if not moving:
+                    break
+                # Ein fehlgeschlagenes Verschieben stellt den Job erneut in die Warteschlange
+                time_module.sleep(MOVE_WAIT_INTERVAL)
+                continue
+            wait_seconds = max(0.0, due - time_module.time())
+            console.print(f"[dim]Nächster Wiederholungsversuch in {int(wait_seconds)} Sekunden...[/dim]")
+            time_module.sleep(wait_seconds)
+            continue
+
+        console.print(
+            f"\n[bold cyan]Job {job['id']}: {job['title']}[/bold cyan] "
+            f"(Versuch {job['attempts'] + 1}/{job['max_attempts']})"
+        )
+        job_moves = JobMoves(mover, on_moved(job)) if mover is not None else None
+        with phase("job", job=job["id"], title=job["title"]) as record:
+            # Frühere Versuche dieses Jobs zählen als Wiederholungen
+            record.retries = job["attempts"]
+            try:
+                success = _run_job(job, job_queue, plex, download_dir, media_server_path, delivered, job_moves)
+                error = None if success else "Download fehlgeschlagen"
+            except KeyboardInterrupt:
+                job_queue.release(job["id"])
+                raise
+            except Exception as e:
+                console.print(f"[bold red]Fehler:[/bold red] {e}")
+                success = False
+                error = str(e)
+            record.ok = success
+            record.error = error
+
+        if success and job_moves is not None:
+            with counts["lock"]:
+                counts["moving"].add(job["id"])
+            job_moves.close()
+        else:
+            _finish_job(job_queue, job, success, error, delivered, counts)
+
+    return counts["done"], counts["failed"]
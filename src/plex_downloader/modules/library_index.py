@@ -0,0 +1,268 @@
+"""Lokaler Volltext-Index der Plex-Bibliotheken für schnelle Offline-Suche."""
+
+import sqlite3
+import time as time_module
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from rich.console import Console
+
+from plex_downloader.modules.metrics import phase
+
+console = Console()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    rating_key INTEGER PRIMARY KEY,
+    library_key TEXT NOT NULL,
+    type TEXT NOT NULL,
+    title TEXT NOT NULL,
+    year INTEGER,
+    parent_key INTEGER,
+    grandparent_key INTEGER,
+    show_title TEXT,
+    season_index INTEGER,
+    episode_index INTEGER,
+    child_count INTEGER,
+    resolution TEXT,
+    container TEXT,
+    size INTEGER,
+    updated_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS items_library ON items (library_key, type);
+CREATE INDEX IF NOT EXISTS items_parent ON items (parent_key);
+CREATE INDEX IF NOT EXISTS items_grandparent ON items (grandparent_key);
+CREATE TABLE IF NOT EXISTS libraries (
+    key TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    type TEXT NOT NULL,
+    watermark INTEGER NOT NULL DEFAULT 0,
+    refreshed_at REAL
+);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+    title, show_title, content='items', content_rowid='rating_key'
+);
+CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts(rowid, title, show_title) VALUES (new.rating_key, new.title, new.show_title);
+END;
+CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts(items_fts, rowid, title, show_title)
+    VALUES ('delete', old.rating_key, old.title, old.show_title);
+END;
+CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE ON items BEGIN
+    INSERT INTO items_fts(items_fts, rowid, title, show_title)
+    VALUES ('delete', old.rating_key, old.title, old.show_title);
+    INSERT INTO items_fts(rowid, title, show_title) VALUES (new.rating_key, new.title, new.show_title);
+END;
+"""
+
+_COLUMNS = (
+    "rating_key", "library_key", "type", "title", "year", "parent_key", "grandparent_key", "show_title",
+    "season_index", "episode_index", "child_count", "resolution", "container", "size", "updated_at",
+)
+
+# Je Bibliothekstyp die indexierten Elementtypen
+LIBRARY_TYPES = {
+    "movie": ("movie",),
+    "show": ("show", "season", "episode"),
+}
+
+
+class LibraryIndex:
+    """
+    SQLite-Index mit Filmen, Serien, Staffeln und Episoden.
+
+    Für die Titelsuche wird FTS5 verwendet, falls die SQLite-Version es unterstützt,
+    sonst eine einfache LIKE-Suche.
+    """
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path))
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def is_empty(self) -> bool:
+        return self._conn.execute("SELECT 1 FROM items LIMIT 1").fetchone() is None
+
+    def watermark(self, library_key: str) -> int:
+        row = self._conn.execute("SELECT watermark FROM libraries WHERE key = ?", (library_key,)).fetchone()
+        return row["watermark"] if row else 0
+
+    def save_library(self, library_key: str, title: str, library_type: str, watermark: int) -> None:
+        self._conn.execute(
+            "INSERT INTO libraries (key, title, type, watermark, refreshed_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET title = excluded.title, type = excluded.type, "
+            "watermark = excluded.watermark, refreshed_at = excluded.refreshed_at",
+            (library_key, title, library_type, watermark, time_module.time()),
+        )
+        self._conn.commit()
+
+    def upsert(self, rows: List[dict]) -> None:
+        """Fügt Elemente ein oder aktualisiert sie (in einer Transaktion)."""
+        if not rows:
+            return
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in _COLUMNS[1:])
+        self._conn.executemany(
+            f"INSERT INTO items ({', '.join(_COLUMNS)}) VALUES ({placeholders}) "
+            f"ON CONFLICT(rating_key) DO UPDATE SET {updates}",
+            [tuple(row.get(column) for column in _COLUMNS) for row in rows],
+        )
+        self._conn.commit()
+
+    def count(self, library_key: str, item_type: str) -> int:
+        row = self._conn.execute(
+            "SELECT COUNT(*) AS n FROM items WHERE library_key = ? AND type = ?", (library_key, item_type)
+        ).fetchone()
+        return row["n"]
+
+    def keys(self, library_key: str, item_type: str) -> set:
+        rows = self._conn.execute(
+            "SELECT rating_key FROM items WHERE library_key = ? AND type = ?", (library_key, item_type)
+        ).fetchall()
+        return {row["rating_key"] for row in rows}
+
+    def delete(self, rating_keys) -> None:
+        self._conn.executemany("DELETE FROM items WHERE rating_key = ?", [(key,) for key in rating_keys])
+        self._conn.commit()
+
+    def search(self, query: str, types=("movie", "show"), limit: int = 50) -> List[sqlite3.Row]:
+        """
+        Sucht Elemente nach Titel (Präfixsuche pro Wort).
+
+        Args:
+            query: Der Suchbegriff
+            types: Die gesuchten Elementtypen
+            limit: Maximale Anzahl Treffer
+
+        Returns:
+            Die passenden Zeilen, Filme vor Serien
+        """
+        words = [word for word in query.replace('"', " ").split() if word]
+        if not words:
+            return []
+        type_filter = ", ".join("?" for _ in types)
+        if self.fts:
+            match = " ".join(f'"{word}"*' for word in words)
+            sql = (
+                f"SELECT items.* FROM items_fts JOIN items ON items.rating_key = items_fts.rowid "
+                f"WHERE items_fts MATCH ? AND items.type IN ({type_filter}) "
+                f"ORDER BY items.type = 'show', bm25(items_fts) LIMIT ?"
+            )
+            params = (match, *types, limit)
+        else:
+            conditions = " AND ".join("title LIKE ?" for _ in words)
+            sql = (
+                f"SELECT * FROM items WHERE {conditions} AND type IN ({type_filter}) "
+                f"ORDER BY type = 'show', title LIMIT ?"
+            )
+            params = (*[f"%{word}%" for word in words], *types, limit)
+        return self._conn.execute(sql, params).fetchall()
+
+
+def _item_row(item, library_key: str) -> dict:
+    """Liest die indexierten Felder eines Plex-Elements (ohne Nachladen vom Server)."""
+    # Listen-Antworten enthalten alle benötigten Felder, Nachladen pro Element wäre ein Request je Eintrag
+    item._autoReload = False
+    row = {
+        "rating_key": int(item.ratingKey),
+        "library_key": str(library_key),
+        "type": item.type,
+        "title": item.title,
+        "year": getattr(item, "year", None),
+        "updated_at": _timestamp(getattr(item, "updatedAt", None) or getattr(item, "addedAt", None)),
+    }
+    if item.type == "show":
+        row["child_count"] = getattr(item, "childCount", None)
+    elif item.type == "season":
+        row["parent_key"] = _int_or_none(getattr(item, "parentRatingKey", None))
+        row["show_title"] = getattr(item, "parentTitle", None)
+        row["season_index"] = getattr(item, "index", None)
+        row["child_count"] = getattr(item, "leafCount", None)
+    elif item.type == "episode":
+        row["parent_key"] = _int_or_none(getattr(item, "parentRatingKey", None))
+        row["grandparent_key"] = _int_or_none(getattr(item, "grandparentRatingKey", None))
+        row["show_title"] = getattr(item, "grandparentTitle", None)
+        row["season_index"] = getattr(item, "parentIndex", None)
+        row["episode_index"] = getattr(item, "index", None)
+
+    media = getattr(item, "media", None)
+    if media:
+        row["resolution"] = media[0].videoResolution
+        if media[0].parts:
+            row["container"] = media[0].parts[0].container
+            row["size"] = media[0].parts[0].size
+    return row
+
+
+def _timestamp(value) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return int(value)
+
+
+def _int_or_none(value) -> Optional[int]:
+    return int(value) if value is not None else None
+
+
+def refresh_index(plex, index: LibraryIndex, full: bool = False) -> dict:
+    """
+    Aktualisiert den Index inkrementell.
+
+    Pro Bibliothek und Elementtyp werden nur Elemente geladen, die seit dem letzten Lauf
+    geändert wurden (updatedAt). Weicht die Anzahl danach von der Bibliothek ab, wurden
+    Elemente gelöscht; dann wird für diesen Typ ein Abgleich der Schlüssel gemacht.
+
+    Args:
+        plex: Die Plex Server-Verbindung
+        index: Der lokale Index
+        full: Alle Elemente neu laden statt nur die geänderten
+
+    Returns:
+        Statistik mit 'updated' und 'deleted' Elementen
+    """
+    stats = {"updated": 0, "deleted": 0}
+    for section in plex.library.sections():
+        if section.type not in LIBRARY_TYPES:
+            continue
+        watermark = 0 if full else index.watermark(section.key)
+        new_watermark = watermark
+
+        for item_type in LIBRARY_TYPES[section.type]:
+            with phase("metadata", kind="index", library=section.title, libtype=item_type):
+                if watermark:
+                    # Eine Sekunde Überlappung, damit gleichzeitig geänderte Elemente nicht verloren gehen
+                    since = datetime.fromtimestamp(watermark - 1)
+                    items = section.search(libtype=item_type, filters={"updatedAt>>": since})
+                else:
+                    items = section.search(libtype=item_type)
+            rows = [_item_row(item, section.key) for item in items]
+            index.upsert(rows)
+            stats["updated"] += len(rows)
+            new_watermark = max([new_watermark] + [row["updated_at"] or 0 for row in rows])
+
+            # Gelöschte Elemente erkennen
+            server_count = section.totalViewSize(libtype=item_type, includeCollections=False)
+            if server_count is not None and server_count != index.count(section.key, item_type):
+                server_keys = {int(item.ratingKey) for item in section.search(libtype=item_type)}
+                stale_keys = index.keys(section.key, item_type) - server_keys
+                index.delete(stale_keys)
+                stats["deleted"] += len(stale_keys)
+
+        index.save_library(section.key, section.title, section.type, new_watermark)
+    return stats
@@ -0,0 +1,219 @@
+"""Auswahl der Version (Media) und der Teile (Parts), die von einem Film oder einer Episode geladen werden."""
+
+import re
+from typing import Dict, List, Optional
+
+PREFERENCES = ("first", "smallest", "largest")
+POLICY_KEYS = ("prefer", "optimized", "min_resolution", "max_bitrate", "container")
+
+# Plex-Bezeichnungen in videoResolution, die keine Zeilenzahl sind
+_RESOLUTION_NAMES = {"sd": 480, "hd": 720, "fhd": 1080, "2k": 1440, "4k": 2160, "8k": 4320}
+_RESOLUTION_PATTERN = re.compile(r"^(\d+)\s*[pi]?$", re.IGNORECASE)
+
+# Laufzeit-Einstellungen, werden über configure_selection() aus der Konfiguration gesetzt
+_settings = {
+    "policy": {"prefer": PREFERENCES[0]},
+    "libraries": {},
+}
+_section_titles: Dict[int, Optional[str]] = {}
+
+
+def parse_resolution(value) -> int:
+    """
+    Wandelt eine Auflösung wie 1080, '1080p', '4k' oder 'sd' in die Zeilenzahl um.
+
+    Raises:
+        ValueError: Wenn die Auflösung nicht gelesen werden kann
+    """
+    if isinstance(value, int):
+        return value
+    text = str(value).strip().lower()
+    if text in _RESOLUTION_NAMES:
+        return _RESOLUTION_NAMES[text]
+    match = _RESOLUTION_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Unbekannte Auflösung '{value}'")
+    return int(match.group(1))
+
+
+def _parse_policy(policy: dict, base: Optional[dict] = None) -> dict:
+    """Prüft eine Auswahlregel und ergänzt fehlende Angaben aus base."""
+    parsed = dict(base or {})
+    for key in POLICY_KEYS:
+        if key in policy:
+            parsed[key] = policy[key]
+    if parsed.get("prefer", PREFERENCES[0]) not in PREFERENCES:
+        raise ValueError(f"Unbekannte Vorgabe '{parsed['prefer']}' (erlaubt: {', '.join(PREFERENCES)})")
+    if parsed.get("min_resolution") is not None:
+        parsed["min_resolution"] = parse_resolution(parsed["min_resolution"])
+    if parsed.get("max_bitrate") is not None:
+        parsed["max_bitrate"] = int(parsed["max_bitrate"])
+    if parsed.get("container"):
+        parsed["container"] = str(parsed["container"]).lower().lstrip(".")
+    return parsed
+
+
+def configure_selection(config_data: dict) -> None:
+    """
+    Übernimmt die Auswahlregeln für Versionen aus der Konfiguration.
+
+    Args:
+        config_data: Die geladene Konfiguration mit optional 'media_policy': {'prefer': 'first',
+            'smallest' oder 'largest', 'optimized': true/false, 'min_resolution': z.B. 1080 oder '4k',
+            'max_bitrate': kbit/s, 'container': z.B. 'mkv', 'libraries': {Bibliothek: abweichende Regeln}}
+
+    Raises:
+        ValueError: Wenn eine Regel ungültige Werte enthält
+    """
+    policy = config_data.get("media_policy") or {}
+    default = _parse_policy(policy, {"prefer": PREFERENCES[0]})
+    libraries = {}
+    for library, library_policy in (policy.get("libraries") or {}).items():
+        libraries[str(library).lower()] = _parse_policy(library_policy or {}, default)
+    _settings["policy"] = default
+    _settings["libraries"] = libraries
+
+
+def _library_title(item) -> Optional[str]:
+    """Gibt den Namen der Bibliothek eines Elements zurück (einmal pro Bibliothek nachgeladen, falls nötig)."""
+    title = getattr(item, "librarySectionTitle", None)
+    section_id = getattr(item, "librarySectionID", None)
+    if title or not section_id:
+        return title
+    if section_id not in _section_titles:
+        try:
+            _section_titles[section_id] = item.section().title
+        except Exception:
+            _section_titles[section_id] = None
+    return _section_titles[section_id]
+
+
+def policy_for(item) -> dict:
+    """Gibt die Auswahlregel für die Bibliothek eines Elements zurück (Name oder ID der Bibliothek)."""
+    libraries = _settings["libraries"]
+    if libraries:
+        section_id = getattr(item, "librarySectionID", None)
+        if section_id is not None and str(section_id) in libraries:
+            return libraries[str(section_id)]
+        title = _library_title(item)
+        if title and title.lower() in libraries:
+            return libraries[title.lower()]
+    return _settings["policy"]
+
+
+def media_size(media) -> int:
+    """Gibt die Größe aller Teile einer Version in Bytes zurück (0 für unbekannte Teile)."""
+    return sum(int(getattr(part, "size", 0) or 0) for part in media.parts)
+
+
+def media_resolution(media) -> int:
+    """Gibt die Zeilenzahl einer Version zurück (0 wenn unbekannt)."""
+    # videoResolution ist robuster als height: ein 1080p-Film im Kinoformat hat z.B. nur 800 Zeilen
+    try:
+        return parse_resolution(media.videoResolution)
+    except (AttributeError, ValueError, TypeError):
+        return int(getattr(media, "height", 0) or 0)
+
+
+def _narrow(candidates: list, keep) -> list:
+    """Behält die Versionen, die keep erfüllen. Erfüllt keine die Bedingung, bleiben alle übrig."""
+    kept = [media for media in candidates if keep(media)]
+    return kept or candidates
+
+
+def select_media(item, policy: Optional[dict] = None):
+    """
+    Wählt die zu ladende Version eines Films oder einer Episode.
+
+    Die Bedingungen der Regel werden nacheinander angewendet: optimierte Versionen des
+    Servers ("Optimize"), Mindestauflösung, höchste Bitrate, bevorzugter Container. Erfüllt
+    keine Version eine Bedingung, wird sie übergangen, statt gar nichts zu laden. Aus den
+    verbleibenden Versionen entscheidet 'prefer': die erste (wie Plex sie sortiert), die
+    kleinste oder die größte.
+
+    Args:
+        item: Das Plex Video- oder Episode-Objekt
+        policy: Die Auswahlregel (Standard: die Regel der Bibliothek des Elements)
+
+    Returns:
+        Die gewählte Version oder None, wenn das Element keine Mediendatei hat
+    """
+    candidates = [media for media in (item.media or []) if media.parts]
+    if not candidates:
+        return None
+    if policy is None:
+        policy = policy_for(item)
+
+    if policy.get("optimized"):
+        candidates = _narrow(candidates, lambda media: bool(getattr(media, "isOptimizedVersion", False)))
+    if policy.get("min_resolution"):
+        candidates = _narrow(candidates, lambda media: media_resolution(media) >= policy["min_resolution"])
+    if policy.get("max_bitrate"):
+        candidates = _narrow(candidates, lambda media: 0 < int(getattr(media, "bitrate", 0) or 0) <= policy["max_bitrate"])
+    if policy.get("container"):
+        candidates = _narrow(candidates, lambda media: (media.container or "").lower() == policy["container"])
+
+    prefer = policy.get("prefer", PREFERENCES[0])
+    if prefer == "smallest":
+        # Versionen ohne bekannte Größe nicht versehentlich als kleinste wählen
+        return min(candidates, key=lambda media: media_size(media) or float("inf"))
+    if prefer == "largest":
+        return max(candidates, key=media_size)
+    return candidates[0]
+
+
+def selected_parts(item) -> List:
+    """Gibt alle Teile der gewählten Version zurück (mehrteilige Filme haben mehrere)."""
+    media = select_media(item)
+    return list(media.parts) if media is not None else []
+
+
+def download_size(item) -> int:
+    """Gibt die Größe aller zu ladenden Teile eines Elements zurück (0 wenn unbekannt)."""
+    media = select_media(item)
+    return media_size(media) if media is not None else 0
+
+
+def default_size(item) -> int:
+    """Gibt die Größe zurück, die ohne Auswahlregel geladen würde (erster Teil der ersten Version)."""
+    try:
+        return int(item.media[0].parts[0].size or 0)
+    except (AttributeError, IndexError, TypeError, ValueError):
+        return 0
+
+
+def describe_media(media) -> str:
+    """Beschreibt eine Version kurz, z.B. '1080p mkv 8.2 Mbit/s, 2 Teile'."""
+    resolution = getattr(media, "videoResolution", None) or "?"
+    if str(resolution).isdigit():
+        resolution = f"{resolution}p"
+    text = f"{resolution} {media.container or '?'}"
+    bitrate = int(getattr(media, "bitrate", 0) or 0)
+    if bitrate:
+        text += f" {bitrate / 1000:.1f} Mbit/s"
+    if len(media.parts) > 1:
+        text += f", {len(media.parts)} Teile"
+    return text
+
+
+def selection_plan(item) -> Optional[dict]:
+    """
+    Vergleicht die gewählte Version eines Elements mit dem bisherigen Verhalten (erster Teil der ersten Version).
+
+    Die Ersparnis ('saved') vergleicht alle Teile der ersten Version mit allen Teilen der gewählten,
+    damit zusätzliche Teile mehrteiliger Filme nicht als Mehrverbrauch zählen. Sie ist nie negativ.
+
+    Returns:
+        Dict mit 'version', 'parts', 'current', 'selected' und 'saved' Bytes oder None ohne Mediendatei
+    """
+    media = select_media(item)
+    if media is None:
+        return None
+    first = next(candidate for candidate in item.media if candidate.parts)
+    return {
+        "version": describe_media(media),
+        "parts": len(media.parts),
+        "current": default_size(item),
+        "selected": media_size(media),
+        "saved": max(0, media_size(first) - media_size(media)),
+    }
@@ -0,0 +1,208 @@
+"""Messwerte pro Phase (Verbinden, Suche, Metadaten, Download, Verschieben) für unbeaufsichtigte Läufe."""
+
+import json
+import os
+import threading
+import time as time_module
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+METRIC_PREFIX = "plex_dl"
+TEXTFILE_INTERVAL = 10  # Sekunden zwischen zwei Aktualisierungen der Prometheus-Datei
+
+# Laufzeit-Einstellungen, werden über configure_metrics() aus der Konfiguration gesetzt
+_settings = {
+    "textfile": None,
+    "events": None,
+    "server": "",
+}
+_state = {
+    "last_write": 0.0,
+}
+# Summen pro (Phase, Ergebnis)
+_totals: Dict[Tuple[str, str], Dict[str, float]] = {}
+# Letzter Durchsatz pro Phase in Bytes/s
+_last_throughput: Dict[str, float] = {}
+_lock = threading.Lock()
+_write_lock = threading.Lock()
+
+
+class PhaseRecord:
+    """Messwerte einer laufenden Phase. Der Aufrufer ergänzt Bytes, Time-to-first-Byte und Wiederholungen."""
+
+    def __init__(self, name: str, **details):
+        self.name = name
+        self.details = details
+        self.ok = True
+        self.error: Optional[str] = None
+        self.bytes = 0
+        self.ttfb: Optional[float] = None
+        self.retries = 0
+        self.started = time_module.monotonic()
+
+
+def configure_metrics(config_data: dict) -> None:
+    """
+    Übernimmt die Metrik-Ziele aus der Konfiguration.
+
+    Args:
+        config_data: Die geladene Konfiguration mit optional 'metrics_textfile' (Prometheus
+            textfile collector) und 'metrics_events' (JSON-Lines Ereignisprotokoll)
+    """
+    _settings["textfile"] = Path(config_data["metrics_textfile"]).expanduser() \
+        if config_data.get("metrics_textfile") else None
+    _settings["events"] = Path(config_data["metrics_events"]).expanduser() \
+        if config_data.get("metrics_events") else None
+    _settings["server"] = config_data.get("server_name") or ""
+
+
+def enabled() -> bool:
+    """Gibt zurück, ob Messwerte exportiert werden."""
+    return bool(_settings["textfile"] or _settings["events"])
+
+
+@contextmanager
+def phase(name: str, **details) -> Iterator[PhaseRecord]:
+    """
+    Misst eine Phase. Eine Exception oder record.ok = False zählt als Fehlschlag.
+
+    Args:
+        name: Die Phase, z.B. 'connect', 'search', 'metadata', 'download', 'move'
+        details: Zusätzliche Angaben nur für das Ereignisprotokoll (z.B. Dateiname)
+    """
+    record = PhaseRecord(name, **details)
+    try:
+        yield record
+    except BaseException as e:
+        record.ok = False
+        record.error = record.error or (str(e) or type(e).__name__)
+        raise
+    finally:
+        finish(record)
+
+
+def finish(record: PhaseRecord) -> None:
+    """Bucht eine beendete Phase in die Summen und das Ereignisprotokoll."""
+    if not enabled():
+        return
+    duration = time_module.monotonic() - record.started
+    result = "ok" if record.ok else "error"
+    throughput = record.bytes / duration if record.bytes and duration > 0 else None
+    with _lock:
+        totals = _totals.setdefault((record.name, result), {
+            "count": 0, "duration": 0.0, "bytes": 0, "retries": 0, "ttfb": 0.0, "ttfb_count": 0,
+        })
+        totals["count"] += 1
+        totals["duration"] += duration
+        totals["bytes"] += record.bytes
+        totals["retries"] += record.retries
+        if record.ttfb is not None:
+            totals["ttfb"] += record.ttfb
+            totals["ttfb_count"] += 1
+        if throughput is not None and record.ok:
+            _last_throughput[record.name] = throughput
+        if _settings["events"] is not None:
+            _append_event(record, result, duration, throughput)
+    _write_textfile()
+
+
+def _append_event(record: PhaseRecord, result: str, duration: float, throughput: Optional[float]) -> None:
+    """Hängt eine Phase als JSON-Zeile an das Ereignisprotokoll an. Muss mit _lock aufgerufen werden."""
+    event = {
+        "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "phase": record.name,
+        "server": _settings["server"],
+        "result": result,
+        "duration": round(duration, 3),
+    }
+    if record.bytes:
+        event["bytes"] = record.bytes
+    if throughput is not None:
+        event["throughput"] = round(throughput)
+    if record.ttfb is not None:
+        event["ttfb"] = round(record.ttfb, 3)
+    if record.retries:
+        event["retries"] = record.retries
+    if record.error:
+        event["error"] = record.error
+    event.update(record.details)
+    try:
+        _settings["events"].parent.mkdir(parents=True, exist_ok=True)
+        with open(_settings["events"], "a") as f:
+            f.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+    except OSError:
+        # Messwerte dürfen den Download nie stören
+        pass
+
+
+def _escape(value) -> str:
+    """Maskiert einen Label-Wert für das Prometheus-Textformat."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    """Formatiert Prometheus-Labels, z.B. {phase="download",server="NAS"}."""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    """Formatiert einen Wert ohne Genauigkeitsverlust bei großen Bytezahlen."""
+    return str(int(value)) if float(value).is_integer() else f"{value:.6f}"
+
+
+def render_textfile() -> str:
+    """Gibt alle Summen im Prometheus-Textformat zurück."""
+    server = _settings["server"]
+    lines = []
+    metrics = (
+        ("phase_total", "counter", "Beendete Phasen nach Ergebnis", "count"),
+        ("phase_duration_seconds_total", "counter", "Gesamtdauer der Phasen in Sekunden", "duration"),
+        ("bytes_total", "counter", "Übertragene Bytes", "bytes"),
+        ("retries_total", "counter", "Wiederholungsversuche", "retries"),
+        ("ttfb_seconds_total", "counter", "Summe der Zeit bis zum ersten Byte in Sekunden", "ttfb"),
+        ("ttfb_measurements_total", "counter", "Anzahl gemessener Zeiten bis zum ersten Byte", "ttfb_count"),
+    )
+    with _lock:
+        for name, kind, help_text, key in metrics:
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+            for (phase_name, result), totals in sorted(_totals.items()):
+                labels = _labels(phase=phase_name, result=result, server=server)
+                lines.append(f"{METRIC_PREFIX}_{name}{labels} {_number(totals[key])}")
+        lines.append(f"# HELP {METRIC_PREFIX}_throughput_bytes_per_second Durchsatz der letzten erfolgreichen Phase")
+        lines.append(f"# TYPE {METRIC_PREFIX}_throughput_bytes_per_second gauge")
+        for phase_name, throughput in sorted(_last_throughput.items()):
+            lines.append(f"{METRIC_PREFIX}_throughput_bytes_per_second{_labels(phase=phase_name, server=server)} "
+                         f"{throughput:.0f}")
+    lines.append(f"# HELP {METRIC_PREFIX}_last_update_timestamp_seconds Zeitpunkt der letzten Aktualisierung")
+    lines.append(f"# TYPE {METRIC_PREFIX}_last_update_timestamp_seconds gauge")
+    lines.append(f"{METRIC_PREFIX}_last_update_timestamp_seconds{_labels(server=server)} {time_module.time():.0f}")
+    return "\n".join(lines) + "\n"
+
+
+def _write_textfile(force: bool = False) -> None:
+    """Schreibt die Prometheus-Datei atomisch (höchstens alle TEXTFILE_INTERVAL Sekunden)."""
+    path = _settings["textfile"]
+    if path is None:
+        return
+    with _write_lock:
+        now = time_module.monotonic()
+        if not force and now - _state["last_write"] < TEXTFILE_INTERVAL:
+            return
+        _state["last_write"] = now
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Der textfile collector darf nie eine halb geschriebene Datei lesen
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(render_textfile())
+            tmp_path.replace(path)
+        except OSError:
+            pass
+
+
+def flush_metrics() -> None:
+    """Schreibt die Prometheus-Datei am Ende des Laufs mit dem endgültigen Stand."""
+    if _totals:
+        _write_textfile(force=True)
@@ -0,0 +1,221 @@
+"""Inkrementelles Spiegeln von Bibliotheken und Serien über die Download-Warteschlange."""
+
+import sqlite3
+import time as time_module
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, List, Optional, Tuple, Union
+from rich.console import Console
+
+from plex_downloader.modules.destination_index import DestinationIndex, build_destination_index
+from plex_downloader.modules.downloader import sanitize_filename, video_files, episode_files, delivered_size, local_file
+from plex_downloader.modules.job_queue import JobQueue
+from plex_downloader.modules.metrics import phase
+from plex_downloader.modules.show_catalog import show_episodes
+
+console = Console()
+
+KIND_LIBRARY = "library"
+KIND_SHOW = "show"
+PAGE_SIZE = 1000  # Elemente pro Request beim ersten, vollständigen Lauf
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mirrors (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    plex_key TEXT NOT NULL,
+    title TEXT NOT NULL,
+    watermark INTEGER NOT NULL DEFAULT 0,
+    last_run REAL
+);
+"""
+
+
+class MirrorState:
+    """Gespiegelte Bibliotheken und Serien mit ihrem Wasserstand (letzte gesehene Änderung)."""
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path))
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def targets(self) -> List[sqlite3.Row]:
+        return self._conn.execute("SELECT * FROM mirrors ORDER BY title").fetchall()
+
+    def get(self, key: str) -> Optional[sqlite3.Row]:
+        return self._conn.execute("SELECT * FROM mirrors WHERE key = ?", (key,)).fetchone()
+
+    def add(self, kind: str, plex_key: str, title: str) -> str:
+        """Registriert ein Spiegel-Ziel (ohne Wasserstand) und gibt seinen Schlüssel zurück."""
+        key = f"{kind}:{plex_key}"
+        self._conn.execute(
+            "INSERT INTO mirrors (key, kind, plex_key, title) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET title = excluded.title",
+            (key, kind, str(plex_key), title),
+        )
+        self._conn.commit()
+        return key
+
+    def save_watermark(self, key: str, watermark: int) -> None:
+        self._conn.execute(
+            "UPDATE mirrors SET watermark = ?, last_run = ? WHERE key = ?",
+            (watermark, time_module.time(), key),
+        )
+        self._conn.commit()
+
+    def remove(self, key: str) -> bool:
+        cursor = self._conn.execute("DELETE FROM mirrors WHERE key = ?", (key,))
+        self._conn.commit()
+        return cursor.rowcount > 0
+
+
+def resolve_target(plex, name: str) -> Tuple[str, str, str]:
+    """
+    Sucht eine Bibliothek (nach Name) oder Serie (nach Titel) für das Spiegeln.
+
+    Returns:
+        Tuple (Art, Plex-Schlüssel, Titel)
+
+    Raises:
+        ValueError: Wenn nichts oder mehrere Serien mit dem Titel gefunden werden
+    """
+    for section in plex.library.sections():
+        if section.type in ("movie", "show") and section.title.lower() == name.lower():
+            return KIND_LIBRARY, str(section.key), section.title
+
+    shows = plex.library.search(name, libtype="show")
+    exact = [show for show in shows if show.title.lower() == name.lower()]
+    candidates = exact or shows
+    if not candidates:
+        raise ValueError(f"Keine Bibliothek oder Serie '{name}' gefunden")
+    if len(candidates) > 1:
+        titles = ", ".join(f"{show.title} ({show.year})" for show in candidates[:10])
+        raise ValueError(f"'{name}' ist nicht eindeutig: {titles}")
+    return KIND_SHOW, str(candidates[0].ratingKey), candidates[0].title
+
+
+def _timestamp(item) -> int:
+    """Gibt den letzten Änderungszeitpunkt eines Elements zurück (updatedAt, sonst addedAt)."""
+    changed = [value for value in (getattr(item, "updatedAt", None), getattr(item, "addedAt", None)) if value]
+    return int(max(changed).timestamp()) if changed else 0
+
+
+def _changed_items(plex, target: sqlite3.Row) -> List:
+    """
+    Lädt die seit dem Wasserstand hinzugefügten oder geänderten Filme bzw. Episoden.
+
+    Bei Bibliotheken filtert der Server (updatedAt), ein Lauf ohne Änderungen kostet
+    damit einen einzigen Request. Bei Serien werden alle Episoden mit einem Request
+    geladen und lokal gefiltert.
+    """
+    # Eine Sekunde Überlappung, damit gleichzeitig geänderte Elemente nicht verloren gehen
+    since = target["watermark"] - 1
+    if target["kind"] == KIND_LIBRARY:
+        with phase("metadata", kind="mirror", target=target["title"]):
+            section = plex.library.sectionByID(int(target["plex_key"]))
+            libtype = "movie" if section.type == "movie" else "episode"
+            filters = {"updatedAt>>": datetime.fromtimestamp(since)} if target["watermark"] else {}
+            items = section.search(libtype=libtype, filters=filters, container_size=PAGE_SIZE)
+    else:
+        show = plex.fetchItem(int(target["plex_key"]))
+        items = [episode for episode in show_episodes(show) if _timestamp(episode) >= since]
+    for item in items:
+        # Listen-Antworten enthalten die nötigen Felder, Nachladen pro Element vermeiden
+        item._autoReload = False
+    return items
+
+
+def _target_files(item) -> Tuple[List[Tuple[str, object]], Optional[str]]:
+    """Gibt ([(Dateiname, Teil)], Serientitel) eines Films oder einer Episode zurück."""
+    if item.type == "movie":
+        return video_files(item), None
+    show = SimpleNamespace(title=item.grandparentTitle)
+    return episode_files(item, show), item.grandparentTitle
+
+
+def mirror_target(plex, state: MirrorState, job_queue: JobQueue, target: sqlite3.Row, download_dir: Path,
+                  delivered: Callable[[], Optional[DestinationIndex]]) -> dict:
+    """
+    Stellt die neuen oder geänderten Elemente eines Spiegel-Ziels in die Warteschlange.
+
+    Elemente, die bereits in der Warteschlange stehen, erledigt sind oder schon auf dem
+    Medienserver bzw. im Download-Verzeichnis liegen, werden übersprungen.
+
+    Args:
+        plex: Die Plex Server-Verbindung
+        state: Die Spiegel-Ziele mit Wasserständen
+        job_queue: Die Download-Warteschlange
+        target: Das Spiegel-Ziel
+        download_dir: Das Download-Verzeichnis
+        delivered: Liefert den Index des Medienservers (wird erst bei Bedarf erstellt) oder None
+
+    Returns:
+        Statistik mit 'changed', 'enqueued' und 'skipped' Elementen
+    """
+    items = _changed_items(plex, target)
+    stats = {"changed": len(items), "enqueued": 0, "skipped": 0}
+    if not items:
+        state.save_watermark(target["key"], target["watermark"])
+        return stats
+
+    known_keys = job_queue.rating_keys()
+    index = delivered()
+    jobs = []
+    for item in items:
+        if int(item.ratingKey) in known_keys:
+            stats["skipped"] += 1
+            continue
+        files, show_title = _target_files(item)
+        if not files:
+            stats["skipped"] += 1
+            continue
+        local_dir = download_dir / sanitize_filename(show_title) if show_title else download_dir
+        if all(local_file(local_dir, filename)
+               or (index is not None and index.contains(filename, delivered_size(part)))
+               for filename, part in files):
+            stats["skipped"] += 1
+            continue
+
+        bytes_total = sum(int(part.size or 0) for _, part in files)
+        if item.type == "movie":
+            jobs.append({"kind": "movie", "rating_key": item.ratingKey, "title": f"{item.title} ({item.year})",
+                         "bytes_total": bytes_total})
+        else:
+            episode_num = f"S{item.seasonNumber:02d}E{item.index:02d}"
+            jobs.append({"kind": "episode", "rating_key": item.ratingKey,
+                         "title": f"{show_title} - {episode_num} - {item.title}",
+                         "show_title": show_title, "bytes_total": bytes_total})
+
+    # Eine Transaktion für alle Jobs statt eines Commits pro Element (erster Lauf über große Bibliotheken)
+    added = job_queue.add_many(jobs)
+    stats["enqueued"] += added
+    stats["skipped"] += len(jobs) - added
+
+    # Wasserstand erst nach dem Einreihen speichern, sonst gingen Elemente bei einem Absturz verloren
+    state.save_watermark(target["key"], max([target["watermark"]] + [_timestamp(item) for item in items]))
+    return stats
+
+
+def delivered_lookup(media_server_path: Optional[Union[str, Path]]) -> Callable[[], Optional[DestinationIndex]]:
+    """
+    Gibt eine Funktion zurück, die den Medienserver beim ersten Aufruf einmal rekursiv listet.
+
+    Läufe ohne Änderungen listen den Medienserver damit gar nicht.
+    """
+    cache = {}
+
+    def lookup() -> Optional[DestinationIndex]:
+        if not media_server_path:
+            return None
+        if "index" not in cache:
+            with console.status("[cyan]Liste bereits gelieferte Dateien auf dem Medienserver..."):
+                cache["index"] = build_destination_index(media_server_path)
+        return cache["index"]
+
+    return lookup
@@ -0,0 +1,207 @@
+"""Bandbreitenbegrenzung (Token-Bucket) mit Zeitplan nach Tageszeit."""
+
+import re
+import threading
+import time as time_module
+from datetime import datetime, time
+from typing import List, Optional, Tuple, Union
+from rich.console import Console
+
+console = Console()
+
+BURST_SECONDS = 1.0  # Maximal angesparte Bytes = Rate * BURST_SECONDS
+MAX_SLEEP = 1.0  # Längeres Warten in Schritten, damit Zeitplanwechsel sofort greifen
+
+_UNITS = {
+    "": 1, "b": 1,
+    "k": 1000, "kb": 1000, "m": 1000 ** 2, "mb": 1000 ** 2, "g": 1000 ** 3, "gb": 1000 ** 3,
+    "kib": 1024, "mib": 1024 ** 2, "gib": 1024 ** 3,
+}
+_RATE_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)\s*([kmg]?i?b?)(?:/s)?$", re.IGNORECASE)
+_WINDOW_PATTERN = re.compile(r"^(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s+(.+)$")
+_DEFAULT_PATTERN = re.compile(r"^(?:otherwise|sonst|default)\s+(.+)$", re.IGNORECASE)
+
+
+def parse_rate(value: str) -> Optional[float]:
+    """
+    Wandelt eine Rate wie '20 MB/s' oder '500KB' in Bytes pro Sekunde um.
+
+    Args:
+        value: Die Rate als Text ('unlimited'/'unbegrenzt' oder eine Rate von 0 für keine Begrenzung)
+
+    Returns:
+        Bytes pro Sekunde oder None für unbegrenzt
+
+    Raises:
+        ValueError: Wenn die Rate nicht gelesen werden kann
+    """
+    value = str(value).strip()
+    if value.lower() in ("unlimited", "unbegrenzt", "none", "0"):
+        return None
+    match = _RATE_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"Unbekannte Rate '{value}'")
+    unit = match.group(2).lower()
+    if unit not in _UNITS:
+        raise ValueError(f"Unbekannte Einheit in '{value}'")
+    rate = float(match.group(1)) * _UNITS[unit]
+    # '0 MB/s' oder '0.0' wie '0' behandeln, eine Rate von 0 würde jeden Transfer anhalten
+    return rate if rate > 0 else None
+
+
+def format_rate(rate: Optional[float]) -> str:
+    """Formatiert eine Rate in Bytes pro Sekunde für die Anzeige."""
+    if rate is None:
+        return "unbegrenzt"
+    return f"{rate / 1000 ** 2:.1f} MB/s"
+
+
+class BandwidthSchedule:
+    """
+    Zeitplan für die Bandbreite, z.B. '08:00-23:00 20 MB/s, otherwise unlimited'.
+
+    Zeitfenster dürfen über Mitternacht gehen (z.B. '23:00-06:00'). Das erste passende
+    Zeitfenster gewinnt, sonst gilt die Standard-Rate.
+    """
+
+    def __init__(self, windows: List[Tuple[time, time, Optional[float]]], default_rate: Optional[float] = None):
+        self.windows = windows
+        self.default_rate = default_rate
+
+    @classmethod
+    def parse(cls, spec: Union[str, List[str], None]) -> "BandwidthSchedule":
+        """
+        Liest einen Zeitplan aus der Konfiguration.
+
+        Args:
+            spec: Text mit durch Kommas getrennten Einträgen oder Liste von Einträgen
+
+        Raises:
+            ValueError: Wenn ein Eintrag nicht gelesen werden kann
+        """
+        if not spec:
+            return cls([])
+        if isinstance(spec, str):
+            entries = spec.split(",")
+        else:
+            entries = [str(entry) for entry in spec]
+
+        windows = []
+        default_rate = None
+        for entry in entries:
+            entry = entry.strip()
+            if not entry:
+                continue
+            window = _WINDOW_PATTERN.match(entry)
+            if window:
+                start = time(int(window.group(1)), int(window.group(2)))
+                end = time(int(window.group(3)) % 24, int(window.group(4)))
+                windows.append((start, end, parse_rate(window.group(5))))
+                continue
+            default = _DEFAULT_PATTERN.match(entry)
+            if default:
+                default_rate = parse_rate(default.group(1))
+                continue
+            # Eintrag ohne Zeitfenster gilt immer
+            default_rate = parse_rate(entry)
+        return cls(windows, default_rate)
+
+    def rate_at(self, moment: datetime) -> Optional[float]:
+        """Gibt die Rate (Bytes/s) zu einem Zeitpunkt zurück, None für unbegrenzt."""
+        now = moment.time()
+        for start, end, rate in self.windows:
+            if start <= end:
+                if start <= now < end:
+                    return rate
+            elif now >= start or now < end:
+                return rate
+        return self.default_rate
+
+    def is_unlimited(self) -> bool:
+        return self.default_rate is None and all(rate is None for _, _, rate in self.windows)
+
+
+class TokenBucket:
+    """
+    Token-Bucket, den alle gleichzeitigen Transfers gemeinsam nutzen.
+
+    Die Rate wird bei jedem Aufruf aus dem Zeitplan gelesen, dadurch greift ein
+    Wechsel (z.B. um 23:00) sofort, ohne laufende Transfers neu zu starten.
+    """
+
+    def __init__(self, schedule: BandwidthSchedule):
+        self.schedule = schedule
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._last = time_module.monotonic()
+        self._current_rate: Optional[float] = None
+        self._rate_announced = False
+
+    def _refill(self) -> Optional[float]:
+        """Füllt den Bucket gemäß der aktuellen Rate auf. Muss mit Lock aufgerufen werden."""
+        rate = self.schedule.rate_at(datetime.now())
+        if rate is not None and rate <= 0:
+            # Ein von Hand gebauter Zeitplan kann 0 enthalten, das gilt wie in parse_rate als unbegrenzt
+            rate = None
+        now = time_module.monotonic()
+        elapsed = now - self._last
+        self._last = now
+
+        if not self._rate_announced or rate != self._current_rate:
+            console.print(f"[dim]Bandbreite: {format_rate(rate)}[/dim]")
+            self._current_rate = rate
+            self._rate_announced = True
+
+        if rate is None:
+            # Unbegrenzt: keine Schulden oder Guthaben in die nächste Begrenzung mitnehmen
+            self._tokens = 0.0
+            return None
+        self._tokens = min(self._tokens + elapsed * rate, rate * BURST_SECONDS)
+        return rate
+
+    def consume(self, amount: int) -> None:
+        """
+        Bucht übertragene Bytes und wartet, bis sie laut Rate erlaubt sind.
+
+        Args:
+            amount: Anzahl übertragener Bytes
+        """
+        with self._lock:
+            self._refill()
+            if self._current_rate is None:
+                return
+            self._tokens -= amount
+
+        while True:
+            with self._lock:
+                rate = self._refill()
+                if rate is None or self._tokens >= 0:
+                    return
+                wait = -self._tokens / rate
+            time_module.sleep(min(wait, MAX_SLEEP))
+
+
+# Gemeinsamer Limiter für alle Transfers, None wenn keine Begrenzung konfiguriert ist
+_state = {"bucket": None}
+
+
+def configure_bandwidth(spec: Union[str, List[str], None]) -> None:
+    """
+    Aktiviert die Bandbreitenbegrenzung gemäß Zeitplan aus der Konfiguration.
+
+    Args:
+        spec: Der Wert von 'bandwidth_schedule' aus der config.yaml
+    """
+    try:
+        schedule = BandwidthSchedule.parse(spec)
+    except ValueError as e:
+        console.print(f"[yellow]Ungültiger Bandbreiten-Zeitplan ({e}), keine Begrenzung aktiv.[/yellow]")
+        schedule = BandwidthSchedule([])
+    _state["bucket"] = None if schedule.is_unlimited() else TokenBucket(schedule)
+
+
+def throttle(amount: int) -> None:
+    """Bremst den aufrufenden Transfer, falls eine Bandbreitenbegrenzung aktiv ist."""
+    bucket = _state["bucket"]
+    if bucket is not None:
+        bucket.consume(amount)
@@ -1,20 +1,57 @@
 """Modul für das Verschieben von Dateien mit rclone."""
 
+import os
+import queue
 import subprocess
+import tempfile
+import threading
+import time as time_module
 from pathlib import Path
-from typing import Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from rich.console import Console
 
+from plex_downloader.modules.integrity import move_manifest_entry
+from plex_downloader.modules.metrics import phase
+
 console = Console()
 
+DEFAULT_MOVER_QUEUE_SIZE = 4  # Maximal wartende Dateien, danach blockiert der Downloader
+DEFAULT_TRANSFERS = 4  # Gleichzeitige Übertragungen pro rclone-Aufruf
+DEFAULT_CHECKERS = 8  # Gleichzeitige Prüfungen pro rclone-Aufruf
+BATCH_WINDOW = 1.0  # Sekunden, die der Hintergrund-Mover auf weitere fertige Dateien wartet
+
+# Laufzeit-Einstellungen, werden über configure_mover() aus der Konfiguration gesetzt
+_settings = {
+    "transfers": DEFAULT_TRANSFERS,
+    "checkers": DEFAULT_CHECKERS,
+}
+
+
+def configure_mover(transfers: int = DEFAULT_TRANSFERS, checkers: int = DEFAULT_CHECKERS) -> None:
+    """
+    Legt die Parallelität gebündelter rclone-Aufrufe fest.
+
+    Args:
+        transfers: Gleichzeitige Übertragungen (rclone --transfers)
+        checkers: Gleichzeitige Prüfungen (rclone --checkers)
+    """
+    _settings["transfers"] = max(1, transfers)
+    _settings["checkers"] = max(1, checkers)
+
+
+def _is_remote(media_server_path: Union[str, Path]) -> bool:
+    """Prüft ob es sich um einen rclone remote path handelt (enthält ":")."""
+    return isinstance(media_server_path, str) and ":" in media_server_path
+
 
-def move_to_media_server(source_path: Path, media_server_path: Union[str, Path]) -> bool:
+def move_to_media_server(source_path: Path, media_server_path: Union[str, Path], quiet: bool = False) -> bool:
     """
     Verschiebt eine Datei oder ein Verzeichnis zum Medienserver mit rclone.
     
     Args:
         source_path: Pfad zur Quelldatei oder zum Quellverzeichnis
         media_server_path: Pfad zum Medienserver-Zielverzeichnis (kann lokaler Pfad oder rclone remote sein)
+        quiet: Keine Fortschrittsausgabe (für das Verschieben im Hintergrund), nur Fehler werden ausgegeben
         
     Returns:
         True wenn das Verschieben erfolgreich war, False sonst
@@ -23,32 +60,53 @@ def move_to_media_server(source_path: Path, media_server_path: Union[str, Path])
         console.print(f"[red]Quelldatei nicht gefunden: {source_path}[/red]")
         return False
     
-    # Prüfe ob es sich um einen rclone remote path handelt (enthält ":")
-    is_remote = isinstance(media_server_path, str) and ":" in media_server_path
+    with phase("move", file=source_path.name) as record:
+        if source_path.is_file():
+            record.bytes = source_path.stat().st_size
+        record.ok = _move_to_media_server(source_path, media_server_path, quiet)
+        return record.ok
+
+
+def _move_to_media_server(source_path: Path, media_server_path: Union[str, Path], quiet: bool) -> bool:
+    """Führt move_to_media_server() für einen vorhandenen Pfad aus."""
+    is_remote = _is_remote(media_server_path)
+    is_file = source_path.is_file()
     
     # Erstelle Zielverzeichnis nur für lokale Pfade
     if not is_remote:
         media_server_path = Path(media_server_path)
-        media_server_path.mkdir(parents=True, exist_ok=True)
+        try:
+            media_server_path.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            console.print(f"[red]Zielverzeichnis kann nicht erstellt werden: {e}[/red]")
+            return False
     
-    console.print(f"[cyan]Verschiebe nach Medienserver...[/cyan]")
-    console.print(f"Quelle: {source_path}")
-    console.print(f"Ziel: {media_server_path}")
+    if not quiet:
+        console.print(f"[cyan]Verschiebe nach Medienserver...[/cyan]")
+        console.print(f"Quelle: {source_path}")
+        console.print(f"Ziel: {media_server_path}")
     
     try:
-        # Nutze rclone move mit --progress für Fortschrittsanzeige
+        # Nutze rclone move mit --progress für Fortschrittsanzeige (im Hintergrund ohne Ausgabe)
+        command = ["rclone", "move", str(source_path), str(media_server_path)]
+        if not quiet:
+            command.insert(2, "--progress")
         subprocess.run(
-            ["rclone", "move", "--progress", str(source_path), str(media_server_path)],
+            command,
             check=True,
-            capture_output=False,  # Zeige Fortschritt in Echtzeit
+            capture_output=quiet,  # Zeige Fortschritt in Echtzeit, außer im Hintergrund
             text=True
         )
+        if is_file:
+            move_manifest_entry(source_path, None if is_remote else media_server_path)
         
-        console.print(f"[green]Erfolgreich zum Medienserver verschoben![/green]")
+        if not quiet:
+            console.print(f"[green]Erfolgreich zum Medienserver verschoben![/green]")
         return True
         
     except FileNotFoundError:
-        console.print("[yellow]rclone nicht gefunden. Verwende normales Verschieben...[/yellow]")
+        if not quiet:
+            console.print("[yellow]rclone nicht gefunden. Verwende normales Verschieben...[/yellow]")
         # Fallback: Nutze Python's shutil für lokale Verschiebung
         if is_remote:
             console.print("[red]Kann nicht zu Remote-Ziel verschieben ohne rclone.[/red]")
@@ -61,12 +119,14 @@ def move_to_media_server(source_path: Path, media_server_path: Union[str, Path])
                 # Verschiebe Datei
                 dest_file = media_server_path / source_path.name
                 shutil.move(str(source_path), str(dest_file))
+                move_manifest_entry(source_path, media_server_path)
             else:
                 # Verschiebe Verzeichnis
                 dest_dir = media_server_path / source_path.name
                 shutil.move(str(source_path), str(dest_dir))
             
-            console.print(f"[green]Erfolgreich zum Medienserver verschoben![/green]")
+            if not quiet:
+                console.print(f"[green]Erfolgreich zum Medienserver verschoben![/green]")
             return True
         except Exception as e:
             console.print(f"[red]Fehler beim Verschieben: {e}[/red]")
@@ -78,3 +138,227 @@ def move_to_media_server(source_path: Path, media_server_path: Union[str, Path])
     except Exception as e:
         console.print(f"[red]Unerwarteter Fehler beim Verschieben: {e}[/red]")
         return False
+
+
+def move_files_to_media_server(files: List[Path], media_server_path: Union[str, Path]) -> Dict[Path, bool]:
+    """
+    Verschiebt mehrere Dateien mit einem rclone-Aufruf pro Quellverzeichnis zum Medienserver.
+
+    rclone liest Konfiguration und Anmeldung damit nur einmal pro Batch und überträgt
+    die Dateien parallel (--transfers/--checkers aus configure_mover()). Eine Datei gilt
+    als verschoben, wenn sie danach nicht mehr im Quellverzeichnis liegt; so wird auch
+    bei einem teilweise fehlgeschlagenen Aufruf jede Datei einzeln gemeldet.
+
+    Args:
+        files: Die fertigen Dateien
+        media_server_path: Das Zielverzeichnis (lokaler Pfad oder rclone remote)
+
+    Returns:
+        Ergebnis pro Datei (True wenn verschoben)
+    """
+    results = {source_path: False for source_path in files}
+    existing = [source_path for source_path in files if source_path.is_file()]
+    for source_path in set(files) - set(existing):
+        console.print(f"[red]Quelldatei nicht gefunden: {source_path}[/red]")
+    if len(existing) == 1:
+        # Einzelne Dateien ohne Dateiliste verschieben
+        results[existing[0]] = move_to_media_server(existing[0], media_server_path, quiet=True)
+        return results
+
+    is_remote = _is_remote(media_server_path)
+    if not is_remote:
+        Path(media_server_path).mkdir(parents=True, exist_ok=True)
+
+    by_directory: Dict[Path, List[Path]] = {}
+    for source_path in existing:
+        by_directory.setdefault(source_path.parent, []).append(source_path)
+
+    for directory, batch in by_directory.items():
+        # Dateiliste relativ zum Quellverzeichnis, eine Datei pro Zeile (ohne Filter-Syntax)
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as list_file:
+            list_file.write("".join(f"{source_path.name}\n" for source_path in batch))
+        command = [
+            "rclone", "move", str(directory), str(media_server_path),
+            "--files-from-raw", list_file.name, "--no-traverse",
+            "--transfers", str(_settings["transfers"]), "--checkers", str(_settings["checkers"]),
+        ]
+        sizes = {source_path: source_path.stat().st_size for source_path in batch}
+        try:
+            with phase("move", files=len(batch)) as record:
+                result = subprocess.run(command, capture_output=True, text=True)
+                if result.returncode != 0:
+                    record.error = result.stderr.strip() or f"Exit-Code {result.returncode}"
+                    console.print(f"[red]rclone Fehler beim Verschieben: {record.error}[/red]")
+                for source_path in batch:
+                    moved = not source_path.exists()
+                    if moved:
+                        move_manifest_entry(source_path, None if is_remote else Path(media_server_path))
+                        record.bytes += sizes[source_path]
+                    results[source_path] = moved
+                record.ok = all(results[source_path] for source_path in batch)
+        except FileNotFoundError:
+            # Ohne rclone wie bisher einzeln verschieben (nur lokale Ziele)
+            for source_path in batch:
+                results[source_path] = move_to_media_server(source_path, media_server_path, quiet=True)
+        finally:
+            os.unlink(list_file.name)
+    return results
+
+
+class BackgroundMover:
+    """
+    Verschiebt fertige Downloads im Hintergrund zum Medienserver.
+    
+    Dateien werden über eine begrenzte Warteschlange übergeben. Ist sie voll, blockiert
+    submit(), bis wieder Platz ist, damit der Downloader dem Verschieben nicht davonläuft.
+    Alle Dateien, die bereitliegen (oder innerhalb von batch_window dazukommen), werden
+    pro Zielverzeichnis mit einem rclone-Aufruf verschoben. Am Ende des Batches wartet
+    drain() auf alle ausstehenden Verschiebungen.
+    """
+    
+    def __init__(self, queue_size: int = DEFAULT_MOVER_QUEUE_SIZE, batch_window: float = BATCH_WINDOW):
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._batch_window = batch_window
+        self._failures: List[Tuple[Path, Union[str, Path]]] = []
+        self._moved_count = 0
+        # Wartende Dateien mit den Rückmeldungen, die nach ihrer Verschiebung aufgerufen werden
+        self._callbacks: Dict[Path, List[Callable[[bool], None]]] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="media-mover", daemon=True)
+        self._thread.start()
+    
+    def _next_batch(self) -> Tuple[List[Tuple[Path, Union[str, Path]]], bool]:
+        """
+        Wartet auf die nächste Datei und sammelt alle, die bis zum Ende des Zeitfensters dazukommen.
+
+        Returns:
+            Tuple (Dateien als (Quelle, Ziel), True wenn das End-Signal empfangen wurde)
+        """
+        batch = []
+        item = self._queue.get()
+        deadline = time_module.monotonic() + self._batch_window
+        while item is not None:
+            batch.append(item)
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time_module.monotonic()))
+            except queue.Empty:
+                return batch, False
+        return batch, True
+    
+    def _run(self) -> None:
+        finished = False
+        while not finished:
+            batch, finished = self._next_batch()
+            reported = set()
+            try:
+                self._move_batch(batch, reported)
+            except Exception as e:
+                # Der Thread darf nicht sterben, sonst blockieren submit() und drain() für immer
+                console.print(f"[red]Unerwarteter Fehler beim Verschieben: {e}[/red]")
+                for source_path, media_server_path in batch:
+                    if source_path not in reported:
+                        self._record(source_path, media_server_path, False)
+            finally:
+                for _ in range(len(batch) + (1 if finished else 0)):
+                    self._queue.task_done()
+    
+    def _move_batch(self, batch: List[Tuple[Path, Union[str, Path]]], reported: set) -> None:
+        """Verschiebt die gesammelten Dateien, ein rclone-Aufruf pro Zielverzeichnis. Erledigte Quellen kommen in reported."""
+        by_destination: Dict[str, Tuple[Union[str, Path], List[Path]]] = {}
+        for source_path, media_server_path in batch:
+            by_destination.setdefault(str(media_server_path), (media_server_path, []))[1].append(source_path)
+        for media_server_path, files in by_destination.values():
+            if self._stopped.is_set():
+                # Nach einem Abbruch nichts mehr verschieben, Dateien bleiben im Download-Verzeichnis
+                results = {source_path: False for source_path in files}
+            else:
+                try:
+                    results = move_files_to_media_server(files, media_server_path)
+                except Exception as e:
+                    # Nur diese Gruppe gilt als fehlgeschlagen, die übrigen Ziele werden trotzdem verschoben
+                    console.print(f"[red]Fehler beim Verschieben nach {media_server_path}: {e}[/red]")
+                    results = {source_path: False for source_path in files}
+            for source_path, success in results.items():
+                if success:
+                    console.print(f"[green]Zum Medienserver verschoben: {source_path.name}[/green]")
+                reported.add(source_path)
+                self._record(source_path, media_server_path, success)
+    
+    def _record(self, source_path: Path, media_server_path: Union[str, Path], success: bool) -> None:
+        """Verbucht das Ergebnis einer Verschiebung und ruft die Rückmeldungen der Datei auf."""
+        with self._lock:
+            if success:
+                self._moved_count += 1
+            else:
+                self._failures.append((source_path, media_server_path))
+            callbacks = self._callbacks.pop(source_path, [])
+        for callback in callbacks:
+            try:
+                callback(success)
+            except Exception as e:
+                console.print(f"[red]Fehler nach dem Verschieben von {source_path.name}: {e}[/red]")
+    
+    def submit(self, source_path: Path, media_server_path: Union[str, Path],
+               on_done: Optional[Callable[[bool], None]] = None) -> None:
+        """
+        Übergibt eine fertige Datei zum Verschieben (blockiert, wenn die Warteschlange voll ist).
+
+        Eine Datei, die schon auf ihre Verschiebung wartet (z.B. nach einem erneuten Versuch), wird
+        nicht noch einmal eingereiht, on_done wird trotzdem nach ihrer Verschiebung aufgerufen.
+
+        Args:
+            source_path: Die fertige Datei im Download-Verzeichnis
+            media_server_path: Das Zielverzeichnis (lokaler Pfad oder rclone remote)
+            on_done: Wird mit True/False aufgerufen, sobald die Datei verschoben ist bzw. nicht verschoben werden konnte
+        """
+        with self._lock:
+            queued = source_path in self._callbacks
+            callbacks = self._callbacks.setdefault(source_path, [])
+            if on_done is not None:
+                callbacks.append(on_done)
+        if not queued:
+            self._queue.put((source_path, media_server_path))
+    
+    def pending(self) -> int:
+        """Gibt die Anzahl noch nicht verschobener Dateien in der Warteschlange zurück."""
+        return self._queue.unfinished_tasks
+    
+    def drain(self) -> List[Tuple[Path, Union[str, Path]]]:
+        """
+        Wartet, bis alle übergebenen Dateien verschoben sind, und beendet den Hintergrund-Thread.
+        
+        Returns:
+            Liste der fehlgeschlagenen Verschiebungen als (Quelle, Ziel)
+        """
+        self._queue.put(None)
+        self._thread.join()
+        return list(self._failures)
+    
+    def stop(self) -> None:
+        """Bricht ausstehende Verschiebungen ab (z.B. bei Ctrl+C). Die laufende wird noch beendet."""
+        self._stopped.set()
+        # Wartende Dateien verwerfen, damit das End-Signal nicht an einer vollen Warteschlange hängt
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self._record(*item, False)
+            self._queue.task_done()
+        self._queue.put(None)
+    
+    @property
+    def moved_count(self) -> int:
+        return self._moved_count
+
+
+def report_move_failures(failures: List[Tuple[Path, Union[str, Path]]]) -> None:
+    """Gibt eine Zusammenfassung der fehlgeschlagenen Verschiebungen aus."""
+    if not failures:
+        return
+    console.print(f"\n[bold yellow]{len(failures)} Datei(en) konnten nicht zum Medienserver verschoben werden:[/bold yellow]")
+    for source_path, media_server_path in failures:
+        console.print(f"  - {source_path} → {media_server_path}")
+    console.print("[yellow]Die Dateien verbleiben im Download-Verzeichnis.[/yellow]")
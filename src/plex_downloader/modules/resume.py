@@ -0,0 +1,78 @@
+"""Modul für fortsetzbare Downloads (Sidecar-Dateien neben den .temp Dateien)."""
+
+import json
+from pathlib import Path
+from typing import Optional
+
+SIDECAR_SUFFIX = ".resume"
+
+
+def sidecar_path(temp_filepath: Path) -> Path:
+    """Gibt den Pfad der Sidecar-Datei zu einer .temp Datei zurück."""
+    return temp_filepath.with_name(temp_filepath.name + SIDECAR_SUFFIX)
+
+
+def load_resume_state(temp_filepath: Path) -> Optional[dict]:
+    """
+    Lädt den gespeicherten Fortsetzungs-Zustand einer .temp Datei.
+
+    Args:
+        temp_filepath: Der Pfad zur .temp Datei
+
+    Returns:
+        Den Zustand als Dict oder None, wenn keine gültige Sidecar-Datei existiert
+    """
+    path = sidecar_path(temp_filepath)
+    if not path.exists() or not temp_filepath.exists():
+        return None
+    try:
+        with open(path, "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or not state.get("part_key") or not state.get("size"):
+        return None
+    return state
+
+
+def save_resume_state(temp_filepath: Path, state: dict) -> None:
+    """Speichert den Fortsetzungs-Zustand atomisch neben die .temp Datei."""
+    path = sidecar_path(temp_filepath)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    tmp_path.replace(path)
+
+
+def remove_resume_state(temp_filepath: Path) -> None:
+    """Entfernt die Sidecar-Datei einer .temp Datei, falls vorhanden."""
+    path = sidecar_path(temp_filepath)
+    if path.exists():
+        path.unlink()
+
+
+def resumed_bytes(temp_filepath: Path, state: dict) -> int:
+    """Gibt zurück, wie viele Bytes laut Zustand bereits heruntergeladen sind."""
+    if state.get("segments"):
+        return sum(written for _, _, written in state["segments"])
+    return temp_filepath.stat().st_size
+
+
+def is_resumable(temp_filepath: Path) -> bool:
+    """
+    Prüft, ob eine .temp Datei beim nächsten Download fortgesetzt werden kann.
+
+    Args:
+        temp_filepath: Der Pfad zur .temp Datei
+
+    Returns:
+        True wenn eine passende Sidecar-Datei existiert und die Dateigröße plausibel ist
+    """
+    state = load_resume_state(temp_filepath)
+    if not state:
+        return False
+    file_size = temp_filepath.stat().st_size
+    if state.get("segments"):
+        # Segmentierte Downloads sind auf die Endgröße vorbelegt
+        return file_size == state["size"]
+    return file_size <= state["size"]
@@ -0,0 +1,215 @@
+"""Zeitlimits, Erkennung hängender Transfers und Wiederholungen mit exponentiellem Backoff."""
+
+import random
+import socket
+import threading
+import time as time_module
+from contextlib import contextmanager
+from typing import Iterator, Optional, Set, Tuple
+
+import requests
+
+DEFAULT_CONNECT_TIMEOUT = 10  # Sekunden für den Verbindungsaufbau
+DEFAULT_READ_TIMEOUT = 60  # Sekunden ohne ein einziges empfangenes Byte
+DEFAULT_STALL_WINDOW = 60  # Sekunden, in denen mindestens stall_min_bytes ankommen müssen
+DEFAULT_STALL_MIN_BYTES = 1024 * 1024
+DEFAULT_RETRIES = 5  # Wiederholungen pro Datei bei vorübergehenden Fehlern
+DEFAULT_RETRY_BACKOFF = 2.0  # Wartezeit vor der ersten Wiederholung, verdoppelt sich danach
+MAX_RETRY_DELAY = 120.0
+MONITOR_INTERVAL = 1.0  # Sekunden zwischen zwei Prüfungen der laufenden Transfers
+
+# Laufzeit-Einstellungen, werden über configure_retries() aus der Konfiguration gesetzt
+_settings = {
+    "connect_timeout": DEFAULT_CONNECT_TIMEOUT,
+    "read_timeout": DEFAULT_READ_TIMEOUT,
+    "stall_window": DEFAULT_STALL_WINDOW,
+    "stall_min_bytes": DEFAULT_STALL_MIN_BYTES,
+    "retries": DEFAULT_RETRIES,
+    "retry_backoff": DEFAULT_RETRY_BACKOFF,
+}
+
+
+class StalledTransferError(requests.exceptions.ConnectionError):
+    """Im Prüffenster kamen zu wenige Bytes an (z.B. ein Server, der nur noch tröpfelt)."""
+
+
+class IncompleteTransferError(IOError):
+    """Die Antwort endete vor der erwarteten Dateigröße."""
+
+
+class RetryableError(Exception):
+    """Ein vorübergehender Fehler, nach dem der Transfer wiederholt werden kann (Ursache in __cause__)."""
+
+
+def configure_retries(config_data: dict) -> None:
+    """
+    Übernimmt Zeitlimits und Wiederholungen aus der Konfiguration.
+
+    Args:
+        config_data: Die geladene Konfiguration mit optional 'connect_timeout', 'read_timeout',
+            'stall_window', 'stall_min_bytes', 'download_retries' und 'retry_backoff'
+    """
+    from plex_downloader.modules.transfer import parse_size
+
+    _settings["connect_timeout"] = float(config_data.get("connect_timeout", DEFAULT_CONNECT_TIMEOUT))
+    _settings["read_timeout"] = float(config_data.get("read_timeout", DEFAULT_READ_TIMEOUT))
+    _settings["stall_window"] = max(0.0, float(config_data.get("stall_window", DEFAULT_STALL_WINDOW)))
+    _settings["stall_min_bytes"] = parse_size(config_data.get("stall_min_bytes", DEFAULT_STALL_MIN_BYTES))
+    _settings["retries"] = max(0, int(config_data.get("download_retries", DEFAULT_RETRIES)))
+    _settings["retry_backoff"] = max(0.0, float(config_data.get("retry_backoff", DEFAULT_RETRY_BACKOFF)))
+
+
+def retry_setting(key: str):
+    """Gibt eine über configure_retries() gesetzte Einstellung zurück."""
+    return _settings[key]
+
+
+def timeouts() -> Tuple[float, float]:
+    """Gibt (Verbindungsaufbau, Lesen) für requests zurück."""
+    return _settings["connect_timeout"], _settings["read_timeout"]
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Prüft, ob ein Fehler vorübergehend ist und ein neuer Versuch helfen kann.
+
+    Dazu zählen abgebrochene Verbindungen, Zeitüberschreitungen, hängende und abgeschnittene
+    Antworten sowie 5xx- und 429-Antworten. Andere HTTP-Fehler (z.B. 401, 404) sind endgültig.
+    """
+    if isinstance(error, requests.exceptions.HTTPError):
+        status = error.response.status_code if error.response is not None else 0
+        return status >= 500 or status == 429
+    return isinstance(error, (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+        IncompleteTransferError,
+    ))
+
+
+def backoff_delay(attempt: int) -> float:
+    """Gibt die Wartezeit vor Wiederholung Nummer attempt (ab 0) zurück: exponentiell mit Zufallsanteil."""
+    delay = min(MAX_RETRY_DELAY, _settings["retry_backoff"] * 2 ** attempt)
+    # Zufallsanteil, damit parallele Segmente und Episoden nicht im Gleichschritt wiederkommen
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _socket(response) -> Optional[socket.socket]:
+    """Gibt den Socket einer gestreamten Antwort zurück (urllib3 Verbindung oder http.client)."""
+    raw = response.raw
+    sock = getattr(getattr(raw, "_connection", None), "sock", None)
+    if sock is None:
+        reader = getattr(getattr(raw, "_fp", None), "fp", None)
+        sock = getattr(getattr(reader, "raw", None), "_sock", None)
+    return sock
+
+
+class StallGuard:
+    """
+    Überwacht den Datenfluss einer Antwort.
+
+    Kommen in einem Fenster von stall_window Sekunden weniger als stall_min_bytes an, wird
+    der Socket geschlossen. Ein blockierter Lesevorgang endet damit sofort, auch wenn der
+    Server alle paar Sekunden ein Byte schickt und der Read-Timeout deshalb nie greift.
+    Gezählt wird pro gelesenem Puffer. Zeit, die der Transfer in paused() wartet (z.B. auf
+    die Bandbreitenbegrenzung), zählt nicht zum Fenster.
+    """
+
+    def __init__(self, response, window: float, min_bytes: int):
+        self.response = response
+        self.window = window
+        self.min_bytes = min_bytes
+        self.stalled = False
+        self._window_start = time_module.monotonic()
+        self._window_bytes = 0
+        self._paused = 0
+        self._lock = threading.Lock()
+
+    def update(self, size: int) -> None:
+        """Zählt empfangene Bytes (aus dem lesenden Thread)."""
+        with self._lock:
+            self._window_bytes += size
+        if self.stalled:
+            raise StalledTransferError(self.describe())
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """Hält das Fenster an, solange der Transfer absichtlich wartet."""
+        started = time_module.monotonic()
+        with self._lock:
+            self._paused += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._paused -= 1
+                # Das Fenster um die Wartezeit verschieben, statt es neu zu beginnen: ein Server,
+                # der nur tröpfelt, fiele sonst nie mehr auf
+                self._window_start += time_module.monotonic() - started
+
+    def check(self, now: float) -> None:
+        """Schließt das Fenster ab, wenn es abgelaufen ist (aus dem Überwachungs-Thread)."""
+        with self._lock:
+            if self._paused or now - self._window_start < self.window:
+                return
+            if self._window_bytes >= self.min_bytes:
+                self._window_start = now
+                self._window_bytes = 0
+                return
+            self.stalled = True
+        sock = _socket(self.response)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def describe(self) -> str:
+        return f"Transfer hängt: weniger als {self.min_bytes // 1024} KB in {self.window:.0f} Sekunden"
+
+
+_guards: Set[StallGuard] = set()
+_guards_lock = threading.Lock()
+_monitor = {"thread": None}
+
+
+def _monitor_loop() -> None:
+    """Prüft alle laufenden Transfers, solange es welche gibt."""
+    while True:
+        time_module.sleep(MONITOR_INTERVAL)
+        with _guards_lock:
+            if not _guards:
+                _monitor["thread"] = None
+                return
+            guards = list(_guards)
+        now = time_module.monotonic()
+        for guard in guards:
+            guard.check(now)
+
+
+@contextmanager
+def watch(response) -> Iterator[StallGuard]:
+    """
+    Überwacht eine gestreamte Antwort auf hängende Transfers (siehe StallGuard).
+
+    Der Aufrufer meldet empfangene Bytes mit guard.update(). Bricht der Lesevorgang ab,
+    weil der Transfer hing, wird StalledTransferError geworfen.
+    """
+    guard = StallGuard(response, _settings["stall_window"], _settings["stall_min_bytes"])
+    if not guard.window:
+        yield guard
+        return
+    with _guards_lock:
+        _guards.add(guard)
+        if _monitor["thread"] is None:
+            _monitor["thread"] = threading.Thread(target=_monitor_loop, name="stall-monitor", daemon=True)
+            _monitor["thread"].start()
+    try:
+        yield guard
+    except (requests.exceptions.RequestException, OSError) as e:
+        if guard.stalled and not isinstance(e, StalledTransferError):
+            raise StalledTransferError(guard.describe()) from e
+        raise
+    finally:
+        with _guards_lock:
+            _guards.discard(guard)
@@ -0,0 +1,78 @@
+"""Gebündelte Abfrage von Staffeln und Episoden einer Serie (ein Request pro Serie statt pro Staffel)."""
+
+import threading
+from typing import Dict, List
+
+from plex_downloader.modules.metrics import phase
+
+# Zwischenspeicher für diesen Lauf, Schlüssel ist der ratingKey der Serie
+_cache: Dict[str, Dict[int, List]] = {
+    "seasons": {},
+    "episodes": {},
+}
+_lock = threading.Lock()
+
+
+def _memoized(kind: str, show, load) -> List:
+    """Gibt den gespeicherten Wert zurück oder lädt ihn einmalig vom Server."""
+    key = int(show.ratingKey)
+    with _lock:
+        if key in _cache[kind]:
+            return _cache[kind][key]
+    with phase("metadata", kind=kind, show=show.title):
+        value = load()
+    with _lock:
+        return _cache[kind].setdefault(key, value)
+
+
+def show_seasons(show) -> List:
+    """Gibt die Staffeln einer Serie zurück (ein Request pro Serie und Lauf)."""
+    return _memoized("seasons", show, show.seasons)
+
+
+def show_episodes(show) -> List:
+    """
+    Gibt alle Episoden einer Serie mit einem einzigen Request zurück.
+
+    Die Liste enthält bereits Medien- und Part-Informationen. Nachladen pro Episode
+    wird deaktiviert, sonst würde z.B. eine Episode ohne Mediendatei einen Request auslösen.
+    """
+    def load():
+        episodes = show.episodes()
+        for episode in episodes:
+            episode._autoReload = False
+        return episodes
+
+    return _memoized("episodes", show, load)
+
+
+def season_episodes(show, season) -> List:
+    """Gibt die Episoden einer Staffel aus der gebündelten Episodenliste der Serie zurück."""
+    season_key = int(season.ratingKey)
+    return [
+        episode for episode in show_episodes(show)
+        if episode.parentRatingKey is not None and int(episode.parentRatingKey) == season_key
+    ]
+
+
+def season_count(show) -> int:
+    """Gibt die Anzahl Staffeln zurück, ohne die Staffeln zu laden (childCount aus den Suchergebnissen)."""
+    count = getattr(show, "childCount", None)
+    if count is not None:
+        return int(count)
+    return len(show_seasons(show))
+
+
+def episode_count(season) -> int:
+    """Gibt die Anzahl Episoden einer Staffel zurück, ohne die Episoden zu laden (leafCount)."""
+    count = getattr(season, "leafCount", None)
+    if count is not None:
+        return int(count)
+    return len(season.episodes())
+
+
+def clear_catalog() -> None:
+    """Verwirft alle zwischengespeicherten Staffeln und Episoden."""
+    with _lock:
+        for entries in _cache.values():
+            entries.clear()
@@ -0,0 +1,163 @@
+"""Speicherplatz-Reservierung vor jedem Download und Verteilung auf mehrere Staging-Verzeichnisse."""
+
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+from rich.console import Console
+
+console = Console()
+
+DEFAULT_MIN_FREE_SPACE = 1024 ** 3  # 1GB bleiben auf jedem Laufwerk frei
+WAIT_INTERVAL = 5  # Sekunden zwischen zwei Prüfungen, wenn kein Platz frei ist
+
+
+class InsufficientSpaceError(IOError):
+    """Auf keinem Staging-Verzeichnis ist genug Platz, und es wird auch keiner mehr frei."""
+
+
+class StagingArea:
+    """
+    Vergibt Speicherplatz für Downloads auf einem oder mehreren Staging-Verzeichnissen.
+
+    Vor jedem Download wird die Größe laut Plex reserviert. Reserviert ist jeweils nur der
+    noch nicht belegte Teil (Größe minus belegte Blöcke der temp Datei), damit wachsende
+    oder vorbelegte Dateien nicht doppelt zählen. Verzeichnisse auf demselben Laufwerk
+    teilen sich den freien Platz.
+    """
+
+    def __init__(self, directories: Optional[List[Path]] = None, min_free_space: int = DEFAULT_MIN_FREE_SPACE):
+        self.directories = [Path(directory) for directory in directories or []]
+        self.min_free_space = min_free_space
+        self._reservations: Dict[int, dict] = {}
+        self._next_id = 0
+        self._cond = threading.Condition()
+
+    def _roots_for(self, download_dir: Path) -> List[tuple]:
+        """
+        Gibt die möglichen Zielverzeichnisse als (Wurzel, Zielverzeichnis) zurück.
+
+        Liegt download_dir unter dem ersten Staging-Verzeichnis (z.B. ein Show-Verzeichnis),
+        wird derselbe Unterpfad auf allen Staging-Verzeichnissen verwendet.
+        """
+        download_dir = Path(download_dir)
+        if self.directories:
+            try:
+                relative = download_dir.relative_to(self.directories[0])
+            except ValueError:
+                relative = None
+            if relative is not None:
+                return [(root, root / relative) for root in self.directories]
+        return [(download_dir, download_dir)]
+
+    def locate(self, download_dir: Path, filename: str) -> Optional[Path]:
+        """
+        Sucht eine fertig geladene Datei auf allen Staging-Verzeichnissen.
+
+        Returns:
+            Der Pfad der Datei oder None, wenn sie auf keinem Staging-Verzeichnis liegt
+        """
+        for _, target_dir in self._roots_for(download_dir):
+            path = target_dir / filename
+            if path.exists():
+                return path
+        return None
+
+    def _outstanding(self, reservation: dict) -> int:
+        """Gibt den noch nicht auf der Festplatte belegten Teil einer Reservierung zurück."""
+        try:
+            allocated = reservation["temp"].stat().st_blocks * 512
+        except (FileNotFoundError, AttributeError):
+            allocated = 0
+        return max(0, reservation["size"] - allocated)
+
+    def _available(self, root: Path, device: int) -> int:
+        """Gibt den freien Platz eines Laufwerks abzüglich Reservierungen und Mindestreserve zurück."""
+        reserved = sum(
+            self._outstanding(reservation) for reservation in self._reservations.values()
+            if reservation["device"] == device
+        )
+        return shutil.disk_usage(root).free - reserved - self.min_free_space
+
+    def _writers(self, device: int) -> int:
+        """Gibt die Anzahl laufender Downloads auf einem Laufwerk zurück."""
+        return sum(1 for reservation in self._reservations.values() if reservation["device"] == device)
+
+    def _choose(self, candidates: List[tuple], filename: str, size: int) -> Optional[tuple]:
+        """Wählt unter den Verzeichnissen mit genug Platz das mit der geringsten Schreiblast."""
+        fitting = []
+        for root, target_dir in candidates:
+            root.mkdir(parents=True, exist_ok=True)
+            device = os.stat(root).st_dev
+            # Die temp Datei zählt bereits zum belegten Platz, nur der Rest muss frei sein
+            pending = self._outstanding({"size": size, "temp": target_dir / f"{filename}.temp"})
+            available = self._available(root, device)
+            if available >= pending:
+                fitting.append((self._writers(device), -available, str(root), target_dir, device))
+        if not fitting:
+            return None
+        _, _, _, target_dir, device = min(fitting)
+        return target_dir, device
+
+    @contextmanager
+    def reserve(self, download_dir: Path, filename: str, size: int,
+                pending_moves: Optional[Callable[[], int]] = None) -> Iterator[Path]:
+        """
+        Reserviert Platz für eine Datei und gibt das Verzeichnis zurück, in das geladen wird.
+
+        Ist nirgends genug Platz, wird gewartet, bis laufende Downloads fertig sind oder der
+        Mover Dateien zum Medienserver verschoben hat. Eine angefangene temp Datei wird auf
+        ihrem Laufwerk fortgesetzt.
+
+        Args:
+            download_dir: Das gewünschte Download-Verzeichnis (z.B. das Show-Verzeichnis)
+            filename: Der Dateiname
+            size: Die Dateigröße laut Plex (0 wenn unbekannt, dann wird nur verteilt)
+            pending_moves: Gibt die Anzahl noch nicht verschobener Dateien zurück; None, wenn
+                fertige Dateien im Staging-Verzeichnis bleiben (dann wird nicht gewartet)
+
+        Raises:
+            InsufficientSpaceError: Wenn kein Platz frei ist und auch keiner frei werden kann
+        """
+        candidates = self._roots_for(download_dir)
+        resumable = [
+            (root, target_dir) for root, target_dir in candidates if (target_dir / f"{filename}.temp").exists()
+        ]
+        candidates = resumable[:1] or candidates
+        size = max(0, size or 0)
+
+        announced = False
+        with self._cond:
+            while True:
+                choice = self._choose(candidates, filename, size)
+                if choice is not None:
+                    break
+                # Platz wird nur frei, wenn der Mover Dateien wegschafft: bereits wartende oder
+                # die der laufenden Downloads. Ohne Mover würde das Warten nie enden.
+                if pending_moves is None or not (self._reservations or pending_moves()):
+                    directories = ", ".join(str(root) for root, _ in candidates)
+                    raise InsufficientSpaceError(
+                        f"Nicht genug Speicherplatz für {filename} ({size / (1024 * 1024):.0f} MB) in {directories}"
+                    )
+                if not announced:
+                    console.print(
+                        f"[yellow]Nicht genug Speicherplatz für {filename}, warte auf laufende Downloads "
+                        f"und das Verschieben zum Medienserver...[/yellow]"
+                    )
+                    announced = True
+                self._cond.wait(WAIT_INTERVAL)
+
+            target_dir, device = choice
+            reservation_id = self._next_id
+            self._next_id += 1
+            self._reservations[reservation_id] = {
+                "device": device, "size": size, "temp": target_dir / f"{filename}.temp",
+            }
+        try:
+            yield target_dir
+        finally:
+            with self._cond:
+                del self._reservations[reservation_id]
+                self._cond.notify_all()
@@ -0,0 +1,145 @@
+"""Transkodierte Downloads über den Plex Transcoder für langsame Verbindungen."""
+
+import uuid
+from urllib.parse import urlencode
+
+DEFAULT_VIDEO_BITRATE = 4000  # kbit/s
+DEFAULT_RESOLUTION = 720  # Zeilen, die Breite ergibt sich aus 16:9
+AUDIO_BITRATE = 384  # kbit/s, großzügige Annahme für die transkodierte Tonspur (nur für die Schätzung)
+SIZE_MARGIN = 1.1  # Aufschlag auf die geschätzte Größe, der Transcoder hält die Bitrate nicht exakt ein
+TRANSCODE_CONTAINER = "mkv"
+TRANSCODE_PATH = "/video/:/transcode/universal"
+
+# Laufzeit-Einstellungen, werden über configure_transcode() aus der Konfiguration gesetzt
+_settings = {
+    "enabled": False,
+    "video_bitrate": DEFAULT_VIDEO_BITRATE,
+    "resolution": DEFAULT_RESOLUTION,
+}
+
+
+def configure_transcode(config_data: dict) -> None:
+    """
+    Übernimmt die Einstellungen für transkodierte Downloads aus der Konfiguration.
+
+    Bei ungültigen Werten bleibt das bisherige Zielprofil erhalten, der Modus wird trotzdem übernommen.
+
+    Args:
+        config_data: Die geladene Konfiguration mit optional 'transcode' (true/false),
+            'transcode_bitrate' (kbit/s für das Video) und 'transcode_resolution' (z.B. 720 oder '1080p')
+
+    Raises:
+        ValueError: Wenn Bitrate oder Auflösung nicht gelesen werden können
+    """
+    from plex_downloader.modules.media_selection import parse_resolution
+
+    _settings["enabled"] = bool(config_data.get("transcode", False))
+    video_bitrate = max(64, int(config_data.get("transcode_bitrate", DEFAULT_VIDEO_BITRATE)))
+    resolution = parse_resolution(config_data.get("transcode_resolution", DEFAULT_RESOLUTION))
+    _settings["video_bitrate"] = video_bitrate
+    _settings["resolution"] = resolution
+
+
+def set_transcoding(enabled: bool) -> None:
+    """Schaltet transkodierte Downloads ein oder aus (z.B. per --transcode auf der Kommandozeile)."""
+    _settings["enabled"] = enabled
+
+
+def transcoding() -> bool:
+    """Gibt zurück, ob Downloads über den Transcoder statt als Originaldatei geladen werden."""
+    return _settings["enabled"]
+
+
+def describe_profile() -> str:
+    """Beschreibt das Zielprofil, z.B. '720p, 4.0 Mbit/s'."""
+    return f"{_settings['resolution']}p, {_settings['video_bitrate'] / 1000:.1f} Mbit/s"
+
+
+def _frame_size(lines: int) -> str:
+    """Gibt die Bildgröße im 16:9-Format für den Transcoder zurück, z.B. 720 → '1280x720'."""
+    width = round(lines * 16 / 9 / 2) * 2
+    return f"{width}x{lines}"
+
+
+def _indexes(item, part) -> tuple:
+    """Gibt (Index der Version, Index des Teils) eines Teils innerhalb des Elements zurück."""
+    for media_index, media in enumerate(item.media):
+        for part_index, candidate in enumerate(media.parts):
+            if candidate is part or candidate.key == part.key:
+                return media_index, part_index
+    return 0, 0
+
+
+def new_session() -> str:
+    """Gibt eine neue Sitzungs-ID für den Transcoder zurück."""
+    return uuid.uuid4().hex
+
+
+def transcode_url(plex, item, part, session: str) -> str:
+    """
+    Gibt die URL eines transkodierten Datenstroms für einen Teil zurück.
+
+    Der Transcoder liefert über HTTP einen fortlaufenden Matroska-Datenstrom ohne
+    Content-Length. Ein Video, das das Profil schon einhält, wird nur neu verpackt.
+    Die Tonspur wird immer transkodiert, da z.B. TrueHD sonst allein mehrere Mbit/s kostet.
+
+    Args:
+        plex: Die Plex Server-Verbindung
+        item: Das Plex Video- oder Episode-Objekt
+        part: Der zu ladende Teil (aus item.media)
+        session: Die Sitzungs-ID, mit der der Transcoder danach beendet wird (siehe stop_transcode)
+    """
+    from plexapi import X_PLEX_IDENTIFIER
+
+    media_index, part_index = _indexes(item, part)
+    params = {
+        "path": item.key,
+        "mediaIndex": media_index,
+        "partIndex": part_index,
+        "protocol": "http",
+        "offset": 0,
+        "fastSeek": 1,
+        "copyts": 1,
+        "directPlay": 0,
+        "directStream": 1,
+        "directStreamAudio": 0,
+        "videoQuality": 100,
+        "maxVideoBitrate": _settings["video_bitrate"],
+        "videoResolution": _frame_size(_settings["resolution"]),
+        "subtitles": "none",
+        "session": session,
+        "X-Plex-Session-Identifier": session,
+        "X-Plex-Client-Identifier": X_PLEX_IDENTIFIER,
+        "X-Plex-Platform": "Chrome",
+        "X-Plex-Token": plex._token,
+    }
+    return plex.url(f"{TRANSCODE_PATH}/start.{TRANSCODE_CONTAINER}?{urlencode(params)}")
+
+
+def stop_transcode(plex, session: str) -> None:
+    """Beendet eine Transcoder-Sitzung auf dem Server. Fehler werden ignoriert."""
+    import requests
+
+    from plex_downloader.modules.http_session import get_session
+    from plex_downloader.modules.retry import timeouts
+
+    url = plex.url(f"{TRANSCODE_PATH}/stop?{urlencode({'session': session, 'X-Plex-Token': plex._token})}")
+    try:
+        get_session().get(url, timeout=timeouts()).close()
+    except requests.exceptions.RequestException:
+        pass
+
+
+def estimated_size(part) -> int:
+    """
+    Schätzt die Größe eines transkodierten Teils aus Laufzeit und Zielbitrate.
+
+    Höchstens die Größe des Originals, da der Transcoder ein Video, das das Profil
+    einhält, nur neu verpackt. Ohne bekannte Laufzeit wird die Originalgröße angenommen.
+    """
+    original = int(getattr(part, "size", 0) or 0)
+    duration = int(getattr(part, "duration", 0) or 0)  # Millisekunden
+    if not duration:
+        return original
+    estimate = int(duration / 1000 * (_settings["video_bitrate"] + AUDIO_BITRATE) * 1000 / 8 * SIZE_MARGIN)
+    return min(estimate, original) if original else estimate
@@ -0,0 +1,180 @@
+"""Schneller Schreibpfad: Netzwerk-Leser und Schreib-Thread mit wiederverwendeten Puffern."""
+
+import ctypes
+import ctypes.util
+import http.client
+import queue
+import re
+import threading
+from typing import Callable, Optional
+
+import requests
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024  # 1MB pro Puffer
+DEFAULT_BUFFER_COUNT = 8  # Maximal gepufferte Daten = Puffergröße * Anzahl
+TRANSFER_MODES = ("simple", "threaded")  # Der erste Modus ist der Standard, "threaded" muss eingeschaltet werden
+
+_SIZE_PATTERN = re.compile(r"^(\d+)\s*([kmg]?i?b?)$", re.IGNORECASE)
+_SIZE_UNITS = {
+    "": 1, "b": 1,
+    "k": 1024, "kb": 1024, "kib": 1024,
+    "m": 1024 ** 2, "mb": 1024 ** 2, "mib": 1024 ** 2,
+    "g": 1024 ** 3, "gb": 1024 ** 3, "gib": 1024 ** 3,
+}
+
+FALLOC_FL_KEEP_SIZE = 0x01
+_fallocate = {"func": None, "loaded": False}
+
+
+def parse_size(value) -> int:
+    """
+    Wandelt eine Puffergröße wie '4MB', '512 KiB' oder 1048576 in Bytes um.
+
+    Raises:
+        ValueError: Wenn die Größe nicht gelesen werden kann
+    """
+    if isinstance(value, int):
+        return value
+    match = _SIZE_PATTERN.match(str(value).strip())
+    if not match or match.group(2).lower() not in _SIZE_UNITS:
+        raise ValueError(f"Unbekannte Größe '{value}'")
+    return int(match.group(1)) * _SIZE_UNITS[match.group(2).lower()]
+
+
+def _load_fallocate():
+    """Lädt fallocate() aus der libc (nur Linux), sonst None."""
+    if not _fallocate["loaded"]:
+        _fallocate["loaded"] = True
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+            func = libc.fallocate
+            func.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_longlong, ctypes.c_longlong]
+            func.restype = ctypes.c_int
+            _fallocate["func"] = func
+        except (AttributeError, OSError):
+            _fallocate["func"] = None
+    return _fallocate["func"]
+
+
+def preallocate(file, offset: int, length: int) -> bool:
+    """
+    Reserviert Speicherplatz für den Rest der Datei am Stück, damit sie nicht fragmentiert.
+
+    Die sichtbare Dateigröße bleibt unverändert (FALLOC_FL_KEEP_SIZE). Dadurch zeigt die
+    Größe der temp Datei weiterhin die geladenen Bytes, was das Fortsetzen voraussetzt.
+
+    Args:
+        file: Die geöffnete Datei
+        offset: Ab welchem Byte reserviert wird
+        length: Anzahl zu reservierender Bytes
+
+    Returns:
+        True wenn reserviert wurde, False wenn das System es nicht unterstützt
+    """
+    func = _load_fallocate()
+    if func is None or length <= 0:
+        return False
+    return func(file.fileno(), FALLOC_FL_KEEP_SIZE, offset, length) == 0
+
+
+def _reader(response) -> Callable:
+    """
+    Gibt eine readinto-Funktion für den Body einer gestreamten Antwort zurück.
+
+    Ohne Content-Encoding wird direkt aus der http.client-Antwort in den Puffer gelesen
+    (ohne Zwischenkopie), sonst über urllib3, das die Daten dekodiert.
+    """
+    raw = response.raw
+    fp = getattr(raw, "_fp", None)
+    if fp is not None and hasattr(fp, "readinto") and not response.headers.get("content-encoding"):
+        return fp.readinto
+    return raw.readinto
+
+
+def _release(response) -> None:
+    """Gibt die Verbindung in den Pool zurück, wenn der Body vollständig gelesen wurde."""
+    raw = response.raw
+    fp = getattr(raw, "_fp", None)
+    if fp is not None and getattr(fp, "isclosed", lambda: False)():
+        raw.release_conn()
+
+
+def stream_to_file(response, file, on_read: Optional[Callable[[int], None]] = None,
+                   on_written: Optional[Callable[[memoryview], None]] = None,
+                   buffer_size: int = DEFAULT_BUFFER_SIZE, buffer_count: int = DEFAULT_BUFFER_COUNT) -> int:
+    """
+    Überträgt den Body einer Antwort in eine Datei, Lesen und Schreiben in getrennten Threads.
+
+    Der aufrufende Thread liest per readinto in wiederverwendete Puffer, ein Schreib-Thread
+    leert sie in die Datei. Sind alle Puffer belegt (Festplatte zu langsam), wartet der Leser.
+    Ein kurzer Hänger der Festplatte blockiert damit nicht sofort den Socket.
+
+    Args:
+        response: Die gestreamte requests-Antwort
+        file: Die ab der richtigen Position geöffnete Datei (am besten ungepuffert)
+        on_read: Callback(bytes) im Leser-Thread nach jedem gelesenen Puffer (z.B. Abbruch, Drosselung)
+        on_written: Callback(daten) im Schreib-Thread nach jedem geschriebenen Puffer (z.B. Prüfsumme)
+        buffer_size: Größe eines Puffers in Bytes
+        buffer_count: Anzahl Puffer (begrenzt die ungeschriebenen Daten)
+
+    Returns:
+        Anzahl übertragener Bytes
+
+    Raises:
+        requests.exceptions.ConnectionError: Wenn die Verbindung beim Lesen abbricht
+        IOError: Wenn das Schreiben fehlschlägt
+    """
+    free = queue.Queue()
+    for _ in range(max(2, buffer_count)):
+        free.put(bytearray(max(64 * 1024, buffer_size)))
+    # Unbegrenzt, die Anzahl Puffer begrenzt die Warteschlange bereits
+    filled = queue.Queue()
+    errors = []
+
+    def write_loop() -> None:
+        while True:
+            item = filled.get()
+            if item is None:
+                return
+            buffer, length = item
+            if not errors:
+                try:
+                    view = memoryview(buffer)[:length]
+                    while view:
+                        # Ungepufferte Dateien schreiben evtl. nur einen Teil
+                        written = file.write(view)
+                        view = view[written:]
+                    if on_written is not None:
+                        on_written(memoryview(buffer)[:length])
+                except BaseException as e:
+                    errors.append(e)
+            free.put(buffer)
+
+    writer = threading.Thread(target=write_loop, name="download-writer", daemon=True)
+    writer.start()
+    readinto = _reader(response)
+    total = 0
+    try:
+        while True:
+            buffer = free.get()
+            if errors:
+                break
+            try:
+                length = readinto(memoryview(buffer))
+            except (http.client.HTTPException, OSError) as e:
+                # Wie bei iter_content als Netzwerkfehler melden, nicht als Dateisystem-Fehler
+                raise requests.exceptions.ConnectionError(e) from e
+            if not length:
+                free.put(buffer)
+                break
+            filled.put((buffer, length))
+            total += length
+            if on_read is not None:
+                on_read(length)
+    finally:
+        filled.put(None)
+        writer.join()
+    if errors:
+        raise errors[0]
+    _release(response)
+    return total
@@ -0,0 +1,177 @@
+"""Modul für parallele Episoden-Downloads mit begrenzter Anzahl Worker."""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+from rich.console import Console
+from rich.progress import (
+    Progress, SpinnerColumn, BarColumn, TextColumn, DownloadColumn, TransferSpeedColumn, TimeRemainingColumn
+)
+
+from plex_downloader.modules.destination_index import DestinationIndex
+from plex_downloader.modules.headless import progress_display
+from plex_downloader.modules.downloader import download_episode, download_setting, cancel_downloads, reset_cancel
+from plex_downloader.modules.media_selection import download_size, selected_parts
+from plex_downloader.modules.transcode import estimated_size, transcoding
+from plex_downloader.modules.rclone_mover import BackgroundMover, report_move_failures
+
+console = Console()
+
+
+class BatchProgress:
+    """
+    Gemeinsame Fortschrittsanzeige für mehrere gleichzeitige Downloads.
+
+    Jede Datei erhält eine eigene Zeile. Jeder Fortschritt wird zusätzlich auf die
+    Gesamtzeile (Bytes und Restzeit des ganzen Batches) gebucht.
+    """
+
+    def __init__(self, progress: Progress, overall_task):
+        self.progress = progress
+        self.overall_task = overall_task
+
+    def add_task(self, description: str, total: Optional[int] = None, completed: int = 0):
+        if completed:
+            self.progress.update(self.overall_task, advance=completed)
+        return self.progress.add_task(description, total=total, completed=completed)
+
+    def update(self, task, advance: int = 0) -> None:
+        self.progress.update(task, advance=advance)
+        self.progress.update(self.overall_task, advance=advance)
+
+    def remove_task(self, task) -> None:
+        self.progress.remove_task(task)
+
+
+def _episode_size(episode) -> int:
+    """Gibt die Größe der zu ladenden Teile einer Episode laut Plex zurück (0 wenn unbekannt)."""
+    try:
+        if transcoding():
+            # Transkodierte Größe ist erst nach dem Download bekannt
+            return sum(estimated_size(part) for part in selected_parts(episode))
+        return download_size(episode)
+    except (AttributeError, TypeError, ValueError):
+        return 0
+
+
+def _download_job(number: int, total: int, episode, show, plex, download_dir: Path,
+                  media_server_path, progress: BatchProgress, mover: Optional[BackgroundMover],
+                  delivered: Optional[DestinationIndex]) -> bool:
+    """Lädt eine Episode als Job des Worker-Pools."""
+    episode_num = f"S{episode.seasonNumber:02d}E{episode.index:02d}"
+    console.print(f"\n[cyan]Episode {number}/{total}: {episode_num}[/cyan]")
+    return download_episode(
+        episode, show, plex, download_dir,
+        skip_existing_check=True, media_server_path=media_server_path, progress=progress, mover=mover,
+        delivered=delivered
+    )
+
+
+def download_episodes(episodes: List, show, plex, download_dir: Path,
+                      media_server_path: Optional[Union[str, Path]] = None,
+                      concurrency: Optional[int] = None,
+                      delivered: Optional[DestinationIndex] = None) -> Tuple[int, int]:
+    """
+    Lädt mehrere Episoden mit begrenzter Parallelität herunter.
+
+    Ist ein Medienserver konfiguriert, werden fertige Episoden im Hintergrund verschoben,
+    während die nächsten Downloads laufen. Am Ende wird auf alle Verschiebungen gewartet.
+
+    Args:
+        episodes: Die zu ladenden Plex Episode-Objekte (bereits existierende sind ausgefiltert)
+        show: Das Plex Show-Objekt
+        plex: Die Plex Server-Verbindung
+        download_dir: Das Zielverzeichnis
+        media_server_path: Optionaler Pfad zum Medienserver für automatisches Verschieben
+        concurrency: Maximale Anzahl gleichzeitiger Downloads (Standard: Wert aus der Konfiguration)
+        delivered: Optionaler Index des Show-Verzeichnisses auf dem Medienserver; gelieferte Teile werden übersprungen
+
+    Returns:
+        Tuple (heruntergeladen, fehlgeschlagen)
+    """
+    if not episodes:
+        return 0, 0
+    if concurrency is None:
+        concurrency = download_setting("concurrency")
+    concurrency = max(1, min(concurrency, len(episodes)))
+
+    if concurrency > 1:
+        console.print(f"[cyan]Lade {len(episodes)} Episode(n) mit {concurrency} parallelen Downloads...[/cyan]")
+
+    reset_cancel()
+    mover = BackgroundMover() if media_server_path else None
+    try:
+        downloaded_count, failed_count = _run_pool(
+            episodes, show, plex, download_dir, media_server_path, concurrency, mover, delivered
+        )
+    except BaseException:
+        if mover is not None:
+            mover.stop()
+        raise
+
+    if mover is not None:
+        if mover.pending():
+            with console.status(f"[cyan]Warte auf {mover.pending()} ausstehende Verschiebung(en) zum Medienserver..."):
+                failures = mover.drain()
+        else:
+            failures = mover.drain()
+        report_move_failures(failures)
+
+    return downloaded_count, failed_count
+
+
+def _run_pool(episodes: List, show, plex, download_dir: Path, media_server_path,
+              concurrency: int, mover: Optional[BackgroundMover],
+              delivered: Optional[DestinationIndex]) -> Tuple[int, int]:
+    """Führt die Download-Jobs im Thread-Pool aus und zählt Erfolge und Fehler."""
+    total_bytes = sum(_episode_size(episode) for episode in episodes)
+    downloaded_count = 0
+    failed_count = 0
+
+    with progress_display(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TimeRemainingColumn(),
+    ) as progress:
+        overall_task = progress.add_task(
+            f"[bold]Gesamt ({len(episodes)} Episoden)", total=total_bytes or None, kind="batch"
+        )
+        batch_progress = BatchProgress(progress, overall_task)
+
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        futures = {}
+        try:
+            for number, episode in enumerate(episodes, 1):
+                future = executor.submit(
+                    _download_job, number, len(episodes), episode, show, plex, download_dir,
+                    media_server_path, batch_progress, mover, delivered
+                )
+                futures[future] = episode
+
+            for future in as_completed(futures):
+                episode = futures[future]
+                try:
+                    success = future.result()
+                except KeyboardInterrupt:
+                    raise
+                except Exception as e:
+                    console.print(f"[bold red]Fehler bei {episode.title}:[/bold red] {e}")
+                    success = False
+
+                if success:
+                    downloaded_count += 1
+                else:
+                    failed_count += 1
+        except BaseException:
+            # Noch nicht gestartete Episoden verwerfen und laufende Downloads stoppen
+            for future in futures:
+                future.cancel()
+            cancel_downloads()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+
+    return downloaded_count, failed_count